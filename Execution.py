@@ -1,30 +1,61 @@
 import pandas as pd
 from binance.client import Client
 import time
-import talib
+import profiling
+from indicator_cache import default_cache, indicator
+from streaming_indicators import SymbolState
+from async_fetch import fetch_chunked, fetch_many
+from kline_fetch import configure_client, interval_to_ms
+from kline_stream import LiveRanking, run_live
+from kline_store import KlineStore
+from ohlcv import OHLCV
+from panel_scoring import score_panel
+from tail_refresh import TailRefresher
+from universe import TickerIndex, cached_exchange_info, perpetual_symbols, store_volumes, top_by_volume
+from functools import partial
 
 # Binance API erişim anahtarları
 api_key = 'YOUR_API_KEY'
 api_secret = 'YOUR_API_SECRET'
 
-# Binance istemci nesnesi oluşturma
-client = Client(api_key, api_secret)
-
-# USDT ile eşleşen ve kontrat türü PERPETUAL olanları seçer.
-top_symbols = [s for s in client.futures_exchange_info()['symbols'] if
-               'USDT' in s['pair'] and s['contractType'] == 'PERPETUAL']
-
-
-
-daily_volumes = []
-
-for s in top_symbols:
-    daily_volume = client.futures_historical_klines(s['symbol'], Client.KLINE_INTERVAL_1MONTH, '1 month ago UTC')[0][7]
-    daily_volumes.append((s['symbol'], float(daily_volume)))
-
-
-# Günlük hacmi en yüksek 50 coin/usdt çifti.
-top_symbols = [pair[0] for pair in sorted(daily_volumes, key=lambda x: x[1], reverse=True)[:50]] # analiz etmek istenilen coin sayısı. Bu örnekte 50
+# Binance istemci nesnesi oluşturma. CRYANAL_BINANCE_URL ortam değişkeni ayarlıysa istekler o adrese (örneğin yerel
+# mock_binance sunucusuna) gider.
+client = configure_client(Client)(api_key, api_secret)
+
+# Aynı anda açık olabilecek maksimum istek sayısı
+concurrency = 20
+# Hacim sıralaması kaynağı. 'ticker': tek bir toplu 24 saatlik ticker isteği.
+# 'store': yerel depodaki günlük mumlardan son 30 günün hacmi (depo güncel tutulursa sadece yeni mumlar çekilir).
+volume_source = 'ticker'
+
+# True ise tüm semboller (sembol × zaman) dizilerine dizilip tek vektörel geçişte puanlanır (panel_scoring). False ise
+# her sembol için ayrı canlı indikatör durumu (SymbolState) tutulur ve semboller tek tek puanlanır.
+panel_scoring = True
+
+# True ise ilk puanlamadan sonra seçilen sembollerin kline akışları websocket üzerinden dinlenir; kapanan her mumda sadece
+# o sembol yeniden puanlanır ve sıralı tablo bellekte güncel tutulur. CRYANAL_BINANCE_WS_URL ayarlıysa akış o adresten
+# (örneğin mock_binance akışı) alınır.
+live = False
+
+# True ise ilk puanlamadan sonra program açık kalır ve her interval sınırında sadece yeni kapanan mumlar REST API'den
+# çekilir (sembol başına tek, düşük ağırlıklı istek); yalnızca yeni mumu gelen semboller yeniden puanlanır. live ile
+# birlikte kullanılmaz.
+schedule = False
+
+# Sıralamaya girmek için minimum listelenme süresi (gün). Filtre istemiyorsanız None yapın.
+min_age_days = None
+
+# Karşı varlığı USDT olan ve kontrat türü PERPETUAL olanları seçer. Exchange info bir saat boyunca önbellekte tutulur.
+exchange_info = cached_exchange_info(client, ttl=3600, cache_file='futures_exchange_info.json')
+perpetuals = perpetual_symbols(exchange_info)
+
+# Hacmi en yüksek 50 coin/usdt çifti.
+if volume_source == 'store':
+    futures_store = KlineStore('klines_futures', fetcher=partial(fetch_chunked, market='futures'))
+    top_symbols = top_by_volume(store_volumes(futures_store, perpetuals, days=30, concurrency=concurrency), 50)
+else:
+    ticker_index = TickerIndex(client.futures_ticker(), exchange_info=exchange_info)
+    top_symbols = ticker_index.top(50, symbols=perpetuals, min_age_days=min_age_days) # analiz etmek istenilen coin sayısı. Bu örnekte 50
 
 print("İlk 50 kripto para sembolü:")
 print(top_symbols)
@@ -36,32 +67,30 @@ candles = {}
 
 # OHLC ve hacim verilerini çekme
 end_time = int(time.time() * 1000)
+if live or schedule:
+    # Canlı ve zamanlayıcı modlarında sadece kapanmış mumlar çekilir; açık mum kapandığında ayrıca işlenir.
+    end_time -= end_time % interval_to_ms(interval) + 1
 start_time = end_time - (365 * 24 * 60 * 60 * 1000)
 
-def get_historical_data(symbol, interval, start_time, end_time):
-    klines = client.futures_historical_klines(symbol, interval, start_time, end_time)
-    df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-                                       'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
-                                       'taker_buy_quote_asset_volume', 'ignore'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df.set_index('timestamp', inplace=True)
-    df.drop(['close_time', 'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
-             'taker_buy_quote_asset_volume', 'ignore'], axis=1, inplace=True)
-    df.columns = ['open', 'high', 'low', 'close', 'volume']
-    return df
+def klines_to_frame(klines):
+    # Satırlar bir kez tipli sütunlara ayrıştırılır; puanlamada fiyatlar tekrar dönüştürülmez.
+    return OHLCV.from_klines(klines, columns=['open', 'high', 'low', 'close', 'volume']).to_frame()
+
 
 
+# Tüm sembollerin tarihsel verileri ortak bir bağlantı havuzu üzerinden eşzamanlı çekilir.
+klines_by_symbol = fetch_many(top_symbols, interval, start_time, end_time, concurrency=concurrency)
 
 candles = {}
 for symbol in top_symbols:
-    df = get_historical_data(symbol, interval, start_time, end_time)
+    df = klines_to_frame(klines_by_symbol[symbol])
     candles[symbol] = df
     print(f"{symbol} için tarihsel veriler alındı")
 
 
 def calculate_fibonacci_levels(df):
-    high = max(df['high'].astype(float))
-    low = min(df['low'].astype(float))
+    high = df['high'].max()
+    low = df['low'].min()
     diff = high - low
 
     levels = {
@@ -74,7 +103,11 @@ def calculate_fibonacci_levels(df):
 
     return levels
 
-def analyze_and_score(symbol, df):
+def analyze_and_score(symbol, df, state=None):
+    # Canlı durum verilmişse indikatörler baştan hesaplanmaz, son mumlar üzerinden puanlanır.
+    if state is not None:
+        return state.score()
+
     if df.isnull().all().all():
         return {
             'symbol': symbol,
@@ -90,15 +123,16 @@ def analyze_and_score(symbol, df):
 
 
     points = 1
-    open_ = df['open'].astype(float)
-    close = df['close'].astype(float)
-    high = df['high'].astype(float)
-    low = df['low'].astype(float)
-    ema5 = talib.EMA(close, timeperiod=5)
-    ema10 = talib.EMA(close, timeperiod=10)
+    open_ = df['open'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    # İndikatörler önbellek üzerinden hesaplanır; aynı mumlar tekrar puanlandığında yeniden hesaplanmaz.
+    ema5 = indicator('EMA', close, symbol=symbol, interval=interval, timeperiod=5)
+    ema10 = indicator('EMA', close, symbol=symbol, interval=interval, timeperiod=10)
     fib_levels = calculate_fibonacci_levels(df[-50:])  # Son 50 veri anoktasını kullanarak hesapla
-    pdx = talib.PLUS_DI(high, low, close, timeperiod=14)
-    mdx = talib.MINUS_DI(high, low, close, timeperiod=14)
+    pdx = indicator('PLUS_DI', high, low, close, symbol=symbol, interval=interval, timeperiod=14)
+    mdx = indicator('MINUS_DI', high, low, close, symbol=symbol, interval=interval, timeperiod=14)
 
     # RSI
     for i in range(-3, 0):
@@ -145,28 +179,97 @@ def analyze_and_score(symbol, df):
     }
 
 
-# Tüm kripto paraları analiz et ve puanlamaları sakla
-crypto_scores = []
-for symbol, df in candles.items():
-    score = analyze_and_score(symbol, df)
-    crypto_scores.append(score)
+# Her sembol için canlı indikatör durumu. Yeni kapanan mumlar on_candle_close ile işlenir. Panel modunda durumlar ilk
+# kapanan mumda oluşturulur.
+symbol_states = {} if panel_scoring else {symbol: SymbolState.from_dataframe(symbol, df)
+                                          for symbol, df in candles.items()}
+
+
+def on_candle_close(symbol, kline):
+    """
+    Kapanan yeni bir mumu sembolün durumuna ekler ve sadece o sembolü yeniden puanlar. Geçmiş veriler yeniden çekilmez ve
+    indikatörler baştan hesaplanmaz.
+
+    Parameters
+    ----------
+    symbol : str
+        Sembol adı. Örneğin: 'BTCUSDT'.
+
+    kline : list
+        Binance kline satırı: [open_time, open, high, low, close, volume, ...].
+
+    Returns
+    -------
+    dict
+        analyze_and_score ile aynı formatta puanlama sonucu.
+    """
+    if symbol not in symbol_states:
+        symbol_states[symbol] = SymbolState.from_dataframe(symbol, candles[symbol])
+    state = symbol_states[symbol]
+    state.update(pd.to_datetime(kline[0], unit='ms'), float(kline[2]), float(kline[3]), float(kline[4]))
+    return analyze_and_score(symbol, None, state=state)
 
-# En yüksek puanlı ve en düşük puanlı 10 kripto parayı al
-top_10_symbols = sorted([score for score in crypto_scores if 'points' in score], key=lambda x: x['points'], reverse=True)
 
 # Puanları DataFrame'e dönüştürme
 def scores_to_dataframe(symbols):
     return pd.DataFrame(symbols).set_index('symbol')
 
+
+# Tüm kripto paraları analiz et ve puanlamaları sakla
+if panel_scoring:
+    # Puan tablosu doğrudan puana göre sıralı gelir; puanlanamayan semboller 'error' sütunuyla sondadır.
+    score_table = score_panel(candles)
+    # analyze_and_score ile aynı formatta: puanlanamayan sembollerde sadece 'symbol' ve 'error' bulunur.
+    crypto_scores = [{key: value for key, value in score.items() if pd.notna(value)}
+                     for score in score_table.reset_index().to_dict('records')]
+    top_10_df = score_table[score_table['error'].isnull()].drop(columns='error')
+else:
+    crypto_scores = []
+    for symbol, df in candles.items():
+        score = analyze_and_score(symbol, df, state=symbol_states[symbol])
+        crypto_scores.append(score)
+
+    # En yüksek puanlı ve en düşük puanlı 10 kripto parayı al
+    top_10_symbols = sorted([score for score in crypto_scores if 'points' in score], key=lambda x: x['points'],
+                            reverse=True)
+    top_10_df = scores_to_dataframe(top_10_symbols)
+
 pd.set_option('display.max_columns', None)  # Bütün sütunları göster
 pd.set_option('display.width', 1000)        # Ekran genişliğini artır (sütunlar arasında yatay kaydırma olmaması için)
 pd.set_option('display.max_rows', None)
 
 # En yüksek puanlı 10 kripto para ve indikatör puanlarını DataFrame'de göster
-top_10_df = scores_to_dataframe(top_10_symbols)
 print("En yüksek puanlı 10 kripto para ve indikatör puanları:")
 print(top_10_df)
 
 print(crypto_scores)
 
-
+# Ölçüm açıksa (CRYANAL_PROFILE=1) indikatör önbelleğinin isabet sayıları
+if profiling.enabled:
+    print(default_cache.stats())
+
+if live or schedule:
+    # Durumlar baştan kurulur; böylece ilk kapanan mumda geçmiş yeniden işlenmez.
+    for symbol, df in candles.items():
+        if symbol not in symbol_states:
+            symbol_states[symbol] = SymbolState.from_dataframe(symbol, df)
+    ranking = LiveRanking(on_candle_close, crypto_scores)
+    last_open_times = {symbol: int(df.index[-1].value // 10 ** 6) for symbol, df in candles.items() if len(df)}
+
+if live:
+    def report(ranking):
+        print(ranking.table(10))
+        print(ranking.latency_stats())
+
+    print(f"{len(candles)} sembolün {interval} kline akışı dinleniyor. Durdurmak için Ctrl+C.")
+    run_live(list(candles), interval, ranking, last_open_times=last_open_times, report=report)
+elif schedule:
+    refresher = TailRefresher(interval, ranking.on_close, last_open_times, concurrency=concurrency)
+
+    def report_changes(changed):
+        print(f"{len(changed)} sembol için {sum(changed.values())} yeni mum işlendi.")
+        print(ranking.table(10))
+        print(refresher.counters)
+
+    print(f"{len(candles)} sembol her {interval} sınırında güncellenecek. Durdurmak için Ctrl+C.")
+    refresher.run(report=report_changes)
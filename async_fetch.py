@@ -0,0 +1,275 @@
+import asyncio
+import time
+
+import aiohttp
+
+from kline_fetch import INTERVAL_MS, api_url, merge_klines, split_range
+
+# Piyasa -> (kline yolu, tek istekte maksimum kline, dakikalık istek ağırlığı sınırı)
+MARKETS = {
+    'spot': ('/api/v3/klines', 1000, 6000),
+    'futures': ('/fapi/v1/klines', 1500, 2400),
+}
+
+
+def kline_weight(market, limit):
+    """
+    Bir kline isteğinin Binance istek ağırlığı. Vadeli işlemlerde ağırlık limit değerine göre değişir.
+    """
+    if market == 'spot':
+        return 2
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightLimiter:
+    """
+    Dakikalık istek ağırlığı bütçesi. Bütçe dolduğunda yeni istekler bir sonraki dakikaya kadar bekletilir. Sunucunun
+    döndürdüğü X-MBX-USED-WEIGHT-1M başlığı ile harcanan ağırlık senkronize edilir.
+
+    Parameters
+    ----------
+    budget : int
+        Dakikada harcanabilecek toplam ağırlık. Sunucu sınırının biraz altında tutulması önerilir.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.used = 0
+        self.window = int(time.time() // 60)
+        self.lock = asyncio.Lock()
+
+    def _roll(self):
+        window = int(time.time() // 60)
+        if window != self.window:
+            self.window = window
+            self.used = 0
+
+    async def acquire(self, weight):
+        async with self.lock:
+            self._roll()
+            while self.used + weight > self.budget:
+                await asyncio.sleep(60 - time.time() % 60 + 0.05)
+                self._roll()
+            self.used += weight
+
+    def observe(self, headers):
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('X-MBX-USED-WEIGHT-1m')
+        if used is not None:
+            self._roll()
+            self.used = max(self.used, int(used))
+
+
+# 429 (rate limit) ve 418 (rate limit aşımı sonrası IP yasağı) dışında sunucu hataları (5xx) da tekrar denenir.
+RETRY_STATUS = (418, 429)
+MAX_BACKOFF = 30.0
+
+
+def _backoff(attempt):
+    return min(MAX_BACKOFF, 0.5 * 2 ** attempt)
+
+
+async def _get_json(session, url, params, limiter, weight, max_retries=5):
+    """
+    Ağırlık bütçesine uyarak tek bir GET isteği yapar. 429, 418 ve 5xx yanıtlarında ve bağlantı hatalarında tekrar
+    dener: Retry-After başlığı varsa o kadar, yoksa üstel artan (en fazla MAX_BACKOFF saniye) bir süre beklenir. Hata
+    ancak max_retries tekrar denemeden sonra yükseltilir; diğer 4xx yanıtları (örneğin geçersiz sembol) hemen
+    yükseltilir.
+    """
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(weight)
+        try:
+            async with session.get(url, params=params) as response:
+                limiter.observe(response.headers)
+                if attempt < max_retries and (response.status in RETRY_STATUS or response.status >= 500):
+                    retry_after = response.headers.get('Retry-After')
+                    wait = float(retry_after) if retry_after is not None else _backoff(attempt)
+                else:
+                    response.raise_for_status()
+                    return await response.json()
+        except aiohttp.ClientResponseError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == max_retries:
+                raise
+            wait = _backoff(attempt)
+        await asyncio.sleep(wait)
+
+
+async def fetch_symbol_klines(session, symbol, interval, start_time, end_time, limiter, market='futures',
+                              base_url=None, limit=None):
+    """
+    Bir sembolün [start_time, end_time] aralığındaki tüm kline verilerini sayfa sayfa çeker.
+
+    Returns
+    -------
+    list
+        API'nin döndürdüğü formatta kline satırları.
+    """
+    path, max_limit, _ = MARKETS[market]
+    if limit is None:
+        # Aralığı kapsayan en küçük limit seçilir; vadeli işlemlerde küçük limit daha düşük istek ağırlığı demektir.
+        limit = max_limit
+        if interval in INTERVAL_MS:
+            limit = max(1, min(max_limit, (end_time - start_time) // INTERVAL_MS[interval] + 1))
+    base_url = base_url or api_url(market)
+    weight = kline_weight(market, limit)
+
+    data = []
+    while start_time <= end_time:
+        params = {'symbol': symbol, 'interval': interval, 'startTime': start_time, 'endTime': end_time,
+                  'limit': limit}
+        temp_data = await _get_json(session, base_url + path, params, limiter, weight)
+        data.extend(temp_data)
+        if len(temp_data) < limit:
+            break
+        # Aralığın son mumu geldiyse boş bir sayfa için tekrar istek atılmaz.
+        if interval in INTERVAL_MS and temp_data[-1][0] + INTERVAL_MS[interval] > end_time:
+            break
+        start_time = temp_data[-1][0] + 1
+    return data
+
+
+async def fetch_many_async(symbols, interval, start_time, end_time, market='futures', concurrency=10,
+                           weight_budget=None, base_url=None, limit=None):
+    """
+    Birden fazla sembolün kline verilerini ortak bir bağlantı havuzu üzerinden eşzamanlı çeker. Aynı anda en fazla
+    `concurrency` istek açık olur ve toplam istek ağırlığı dakikalık bütçeyi aşmaz. start_time bir sözlükse her sembol
+    kendi başlangıç zamanından itibaren çekilir.
+
+    Returns
+    -------
+    dict
+        Sembol -> kline satırları. Sıra symbols listesindeki sıradır.
+    """
+    _, _, server_budget = MARKETS[market]
+    # Sunucu sınırının %80'i varsayılan bütçe olarak kullanılır.
+    limiter = WeightLimiter(weight_budget or int(server_budget * 0.8))
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def worker(symbol):
+            async with semaphore:
+                start = start_time[symbol] if isinstance(start_time, dict) else start_time
+                return await fetch_symbol_klines(session, symbol, interval, start, end_time, limiter,
+                                                 market=market, base_url=base_url, limit=limit)
+
+        results = await asyncio.gather(*(worker(symbol) for symbol in symbols))
+    return dict(zip(symbols, results))
+
+
+def fetch_many(symbols, interval, start_time, end_time, market='futures', concurrency=10, weight_budget=None,
+               base_url=None, limit=None):
+    """
+    fetch_many_async fonksiyonunun senkron kodda kullanılabilen hali.
+
+    Parameters
+    ----------
+    symbols : list
+        Sembol listesi. Örneğin: ['BTCUSDT', 'ETHUSDT'].
+
+    interval : str
+        Candlestick intervali. Örneğin: '1h', '1d', '1M'.
+
+    start_time : int or dict
+        Milisaniye cinsinden başlangıç zamanı (dahil) ya da sembol -> başlangıç zamanı sözlüğü.
+
+    end_time : int
+        Milisaniye cinsinden bitiş zamanı (dahil).
+
+    market : str, optional
+        'futures' (USDT-M vadeli) ya da 'spot'. Varsayılan değer 'futures'.
+
+    concurrency : int, optional
+        Aynı anda açık olabilecek maksimum istek sayısı. Varsayılan değer 10.
+
+    weight_budget : int, optional
+        Dakikalık istek ağırlığı bütçesi. Verilmezse sunucu sınırının %80'i kullanılır.
+
+    base_url : str, optional
+        API adresi. Yerel bir test sunucusuna yönlendirmek için kullanılabilir.
+
+    limit : int, optional
+        Tek istekte çekilecek kline sayısı. Verilmezse aralığı kapsayan en küçük değer (en fazla piyasanın maksimumu)
+        kullanılır.
+
+    Returns
+    -------
+    dict
+        Sembol -> API'nin döndürdüğü formatta kline satırları.
+    """
+    return asyncio.run(fetch_many_async(symbols, interval, start_time, end_time, market=market,
+                                        concurrency=concurrency, weight_budget=weight_budget, base_url=base_url,
+                                        limit=limit))
+
+
+async def fetch_chunked_async(symbol, interval, start_time, end_time, market='spot', concurrency=10,
+                              weight_budget=None, base_url=None):
+    """
+    Tek bir sembolün uzun bir aralığını mum sınırlarına hizalı pencerelere bölüp pencereleri eşzamanlı çeker ve tek,
+    kesintisiz bir listede birleştirir.
+
+    Returns
+    -------
+    list
+        Sıralı ve tekrarsız kline satırları.
+    """
+    _, max_limit, server_budget = MARKETS[market]
+    limit = 1000 if market == 'futures' else max_limit
+    limiter = WeightLimiter(weight_budget or int(server_budget * 0.8))
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def worker(window_start, window_end):
+            async with semaphore:
+                return await fetch_symbol_klines(session, symbol, interval, window_start, window_end, limiter,
+                                                 market=market, base_url=base_url, limit=limit)
+
+        chunks = await asyncio.gather(*(worker(*window)
+                                        for window in split_range(start_time, end_time, interval, limit)))
+    return merge_klines(chunks)
+
+
+def fetch_chunked(symbol, interval, start_time, end_time, market='spot', concurrency=10, weight_budget=None,
+                  base_url=None):
+    """
+    fetch_chunked_async fonksiyonunun senkron kodda kullanılabilen hali. Satır sınırı yoktur; çok yıllık 1m verisi gibi
+    istenen uzunlukta aralıklar çekilebilir. KlineStore için fetcher olarak da kullanılabilir.
+
+    Parameters
+    ----------
+    symbol : str
+        Sembol. Örneğin: 'BTCUSDT'.
+
+    interval : str
+        Candlestick intervali. Aylık ('1M') interval desteklenmez.
+
+    start_time, end_time : int
+        Milisaniye cinsinden başlangıç ve bitiş zamanı (dahil).
+
+    market : str, optional
+        'spot' ya da 'futures'. Varsayılan değer 'spot'.
+
+    concurrency : int, optional
+        Aynı anda açık olabilecek maksimum istek sayısı. Varsayılan değer 10.
+
+    weight_budget : int, optional
+        Dakikalık istek ağırlığı bütçesi. Verilmezse sunucu sınırının %80'i kullanılır.
+
+    base_url : str, optional
+        API adresi.
+
+    Returns
+    -------
+    list
+        Sıralı ve tekrarsız kline satırları.
+    """
+    return asyncio.run(fetch_chunked_async(symbol, interval, start_time, end_time, market=market,
+                                           concurrency=concurrency, weight_budget=weight_budget, base_url=base_url))
@@ -0,0 +1,251 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import indicator_cache
+import mock_binance
+import signal_engine
+import trade_kernel
+from async_fetch import fetch_many
+from kline_fetch import INTERVAL_MS
+from streaming_indicators import SymbolState
+from synthetic_data import synthetic_universe
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Hiperparametre taramasındaki örnek ızgara: (higher_than, rsip, macdp)
+GRID = [(higher_than, rsip, macdp) for higher_than in (1.2, 1.8) for rsip in (1.8, 1.2) for macdp in (1.8, 1.2)]
+
+
+def _signals(df):
+    points = signal_engine.calculate_points_series(df['close'].to_numpy(dtype=float))
+    return signal_engine.apply_signals(df.copy(), points)
+
+
+def stage_indicators(frames):
+    for df in frames.values():
+        signal_engine.compute_indicators(df['close'].to_numpy(dtype=float))
+
+
+def stage_trading_signal(frames):
+    for df in frames.values():
+        _signals(df)
+
+
+def stage_graph_points(frames):
+    for df in frames.values():
+        signal_engine.graph_points_series(df['close'].to_numpy(dtype=float))
+
+
+def stage_simulate_trades(signals):
+    for df in signals.values():
+        trade_kernel.simulate_trades(df, 1)
+
+
+def stage_calculate_scores(frames):
+    higher_thans, rsips, macdps = np.array(GRID).T
+    for df in frames.values():
+        close = df['close'].to_numpy(dtype=float)
+        points, long_signal, short_signal = signal_engine.batch_signals(close, higher_thans, rsips, macdps)
+        for k in range(len(GRID)):
+            trade_kernel.simulate_arrays(close, points[k], long_signal[k], short_signal[k], 1)
+
+
+def _fetch_setup(frames):
+    first = next(iter(frames.values()))
+    step = int(first.index[1].value - first.index[0].value) // 10 ** 6
+    interval = next(name for name, ms in INTERVAL_MS.items() if ms == step)
+    open_times = [df.index.asi8 // 10 ** 6 for df in frames.values()]
+    start_time = int(min(times[0] for times in open_times))
+    end_time = int(max(times[-1] for times in open_times))
+    return mock_binance.ReplaySource.from_frames(frames, interval), interval, start_time, end_time
+
+
+def stage_fetch(data):
+    # Yerel mock sunucudan eşzamanlı indirme. Ağırlık sınırları kapatılır; ölçülen istemci ve sunucu işlem hızıdır.
+    source, interval, start_time, end_time = data
+    with mock_binance.serve(source, weight_limits={'spot': 10 ** 9}):
+        fetch_many(source.symbols(), interval, start_time, end_time, market='spot', weight_budget=10 ** 9)
+
+
+def stage_analyze_and_score(frames):
+    for symbol, df in frames.items():
+        SymbolState.from_dataframe(symbol, df).score()
+
+
+# Aşama adı -> (hazırlık, ölçülen fonksiyon). Hazırlık süresi ölçüme dahil değildir.
+STAGES = {
+    'indicators': (None, stage_indicators),
+    'trading_signal': (None, stage_trading_signal),
+    'graph_points': (None, stage_graph_points),
+    'simulate_trades': (lambda frames: {s: _signals(df) for s, df in frames.items()}, stage_simulate_trades),
+    'calculate_scores': (None, stage_calculate_scores),
+    'analyze_and_score': (None, stage_analyze_and_score),
+    'fetch': (_fetch_setup, stage_fetch),
+}
+
+
+def measure(function, data, repeat=3):
+    """
+    Bir aşamanın en iyi (minimum) süresini ve tepe bellek kullanımını ölçer. Ölçümden önce aşama bir kez ısınma için
+    çalıştırılır (numba derlemesi ve önbellekten yükleme süreye katılmaz). Tepe bellek, süre ölçümünü etkilememesi için
+    tracemalloc ile ayrı bir çalıştırmada ölçülür. İndikatör önbelleği her çalıştırmadan önce temizlenir.
+
+    Returns
+    -------
+    float
+        Saniye cinsinden en iyi süre.
+    int
+        Bayt cinsinden tepe bellek kullanımı.
+    """
+    function(data)
+    best = float('inf')
+    for _ in range(repeat):
+        indicator_cache.default_cache.clear()
+        start = time.perf_counter()
+        function(data)
+        best = min(best, time.perf_counter() - start)
+
+    indicator_cache.default_cache.clear()
+    tracemalloc.start()
+    function(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes=DEFAULT_SIZES, n_symbols=1, stages=None, repeat=3, seed=0, interval='1h', max_seconds=None):
+    """
+    Seçilen aşamaları her boyutta sentetik veri üzerinde ölçer.
+
+    Parameters
+    ----------
+    sizes : list, optional
+        Sembol başına mum sayıları. Varsayılan değer [1k, 10k, 100k, 1M].
+
+    n_symbols : int, optional
+        Sembol sayısı. Varsayılan değer 1.
+
+    stages : list, optional
+        Ölçülecek aşamalar. Verilmezse STAGES içindeki tüm aşamalar.
+
+    repeat : int, optional
+        Süre ölçümü tekrar sayısı. Varsayılan değer 3.
+
+    seed : int, optional
+        Sentetik veri tohumu. Varsayılan değer 0.
+
+    interval : str, optional
+        Sentetik verinin intervali. Varsayılan değer '1h'.
+
+    max_seconds : float, optional
+        Bir aşamanın tek çalıştırması bu süreyi aşarsa o aşama daha büyük boyutlarda atlanır.
+
+    Returns
+    -------
+    list
+        Her (aşama, boyut) için 'stage', 'bars', 'symbols', 'seconds', 'bars_per_sec' ve 'peak_mb' alanlı sözlükler.
+    """
+    stages = stages or list(STAGES)
+    skipped = set()
+    results = []
+    for n_bars in sizes:
+        frames = synthetic_universe(n_symbols, n_bars, seed=seed, interval=interval)
+        for name in stages:
+            if name in skipped:
+                continue
+            setup, function = STAGES[name]
+            data = setup(frames) if setup is not None else frames
+            seconds, peak = measure(function, data, repeat=repeat)
+            total_bars = n_bars * n_symbols
+            results.append({
+                'stage': name,
+                'bars': n_bars,
+                'symbols': n_symbols,
+                'seconds': seconds,
+                'bars_per_sec': total_bars / seconds if seconds > 0 else float('inf'),
+                'peak_mb': peak / 2 ** 20,
+            })
+            print(f"{name:<20} {n_bars:>10} bar x {n_symbols} sembol: {seconds:10.4f} s, "
+                  f"{results[-1]['bars_per_sec']:14,.0f} bar/s, tepe bellek {results[-1]['peak_mb']:9.1f} MB")
+            if max_seconds is not None and seconds > max_seconds:
+                skipped.add(name)
+    return results
+
+
+def environment():
+    """Sonuçların hangi ortamda üretildiğini kaydetmek için sürüm bilgileri."""
+    try:
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+    return {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': numba_version,
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Sonuçları önceki bir JSON çıktısıyla karşılaştırır ve bar/s değeri threshold oranından fazla düşen aşamaları
+    listeler.
+
+    Returns
+    -------
+    list
+        (aşama, mum sayısı, eski bar/s, yeni bar/s) tuple'ları.
+    """
+    previous = {(r['stage'], r['bars'], r['symbols']): r['bars_per_sec'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get((r['stage'], r['bars'], r['symbols']))
+        if old is None:
+            continue
+        change = r['bars_per_sec'] / old - 1
+        print(f"{r['stage']:<20} {r['bars']:>10} bar: {change:+.1%}")
+        if change < -threshold:
+            regressions.append((r['stage'], r['bars'], old, r['bars_per_sec']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik veri üzerinde çevrimdışı performans ölçümü.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Sembol başına mum sayıları.")
+    parser.add_argument('--symbols', type=int, default=1, help="Sembol sayısı.")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), help="Ölçülecek aşamalar.")
+    parser.add_argument('--repeat', type=int, default=3, help="Süre ölçümü tekrar sayısı.")
+    parser.add_argument('--seed', type=int, default=0, help="Sentetik veri tohumu.")
+    parser.add_argument('--max-seconds', type=float, help="Bu süreyi aşan aşamalar büyük boyutlarda atlanır.")
+    parser.add_argument('--output', default='benchmark_results.json', help="Sonuçların yazılacağı JSON dosyası.")
+    parser.add_argument('--compare', help="Karşılaştırılacak önceki JSON çıktısı.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Gerileme sayılacak hız düşüşü oranı.")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, n_symbols=args.symbols, stages=args.stages, repeat=args.repeat, seed=args.seed,
+                  max_seconds=args.max_seconds)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"Sonuçlar {args.output} dosyasına yazıldı.")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), threshold=args.threshold)
+        for stage, bars, old, new in regressions:
+            print(f"GERİLEME: {stage} ({bars} bar) {old:,.0f} -> {new:,.0f} bar/s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,22 +1,26 @@
 from binance.client import Client
+from binance.helpers import date_to_milliseconds
 import talib
 import numpy as np
 import pandas as pd
 import time
+from async_fetch import fetch_chunked
+from columnar_dataset import ColumnarDataset
+from kline_fetch import configure_client
+from kline_store import STORE_COLUMNS, KlineStore
+from ohlcv import OHLCV
+from resample import ResampledStore
+from universe import TickerIndex
 
-client = Client()
+client = configure_client(Client)()
 
 
-def get_top_volume_symbols(limit=10):
-    # Binance vadeli işlemler borsasındaki tüm USDT çiftlerini al
-    tickers = client.get_ticker()
-    usdt_pairs = [ticker['symbol'] for ticker in tickers if 'USDT' in ticker['symbol']]
+def get_top_volume_symbols(limit=10, min_volume=0, min_age_days=None, listing_times=None):
+    # Binance borsasındaki tüm çiftlerin ticker verisini tek istekle al ve sembol bazında indeksle
+    ticker_index = TickerIndex(client.get_ticker(), listing_times=listing_times)
 
-    # En yüksek hacimli USDT çiftlerini sırala (Son 12 saat)
-    sorted_pairs = sorted(usdt_pairs, key=lambda pair: float(
-        [ticker for ticker in tickers if ticker['symbol'] == pair][0]['volume']), reverse=True)
-
-    return sorted_pairs[:limit]
+    # Karşı varlığı tam olarak USDT olan çiftler arasından en yüksek hacimlileri seç (Son 24 saat)
+    return ticker_index.top(limit, quote_asset='USDT', by='volume', min_volume=min_volume, min_age_days=min_age_days)
 
 
 top_symbols = get_top_volume_symbols(2) # Verisetini oluşturmak istediğiniz coin sayısını girin.
@@ -30,21 +34,43 @@ CONFIG = {
     'start_date': "1 Jan, 2023",
     'end_date': "15 Aug, 2023",
     'add_indicators': True,  # Veri setinizde indikatör değerlerinin bulunmasını istemiyorsanız : False
-    'output_file': 'deneme.csv' # veri setine isim veriniz.
+    'output_file': 'deneme.csv', # veri setine isim veriniz.
+    # 'csv': tüm veri tek bir csv dosyasına yazılır. 'npy': her sembol tamamlandıkça output_dir altında sembol ve
+    # interval bazında tipli sütun dosyalarına (.npy) yazılır; tüm veri bellekte tutulmaz.
+    'output_format': 'csv',
+    'output_dir': 'dataset',
+    'append': True,  # 'npy' formatında mevcut bölümlere sadece yeni mumları ekler. False ise bölümler baştan yazılır.
+    'store_dir': 'klines',  # Yerel kline deposu. Depoyu kullanmamak için None yapın.
+    'offline': False,  # True ise API'ye istek atılmaz, sadece depodaki veri kullanılır.
+    # Verilirse (örneğin '1h') 'interval' mumları depodaki bu intervalin mumlarından yerel olarak türetilir; interval
+    # değiştirmek yeni bir indirme gerektirmez. Her intervali ayrı çekmek için None yapın.
+    'base_interval': None,
 }
 
+# Eksik aralıklar fetch_chunked ile çekilir: pencereler eşzamanlı çekilir ve istek ağırlığı sınırı aşılmaz.
+kline_store = (KlineStore(CONFIG['store_dir'], fetcher=fetch_chunked, offline=CONFIG['offline'])
+               if CONFIG['store_dir'] else None)
+if kline_store is not None and CONFIG['base_interval']:
+    kline_store = ResampledStore(kline_store, CONFIG['base_interval'])
+
 
 def get_historical_data(symbol, interval, start_date, end_date):
-    """Fetch historical klines data from Binance."""
-    return client.get_historical_klines(symbol, interval, start_date, end_date)
+    """
+    Fetch historical klines data from Binance. Yerel depo varsa sadece depoda eksik olan aralıklar çekilir. Sonuç tipli
+    sütunlardan oluşan bir ohlcv.OHLCV kabıdır; API satırları bir kez ayrıştırılır.
+    """
+    if kline_store is not None:
+        return OHLCV(kline_store.load(symbol, interval, date_to_milliseconds(start_date),
+                                      date_to_milliseconds(end_date)))
+    return OHLCV.from_klines(client.get_historical_klines(symbol, interval, start_date, end_date))
 
 
 def calculate_technical_indicators(data):
-    """TA-Lib kütüphanesi ile indikatör değerlerinin hesaplanması."""
-    close = np.array([float(x[4]) for x in data])
-    high = np.array([float(x[2]) for x in data])
-    low = np.array([float(x[3]) for x in data])
-    volume = np.array([float(x[5]) for x in data])
+    """TA-Lib kütüphanesi ile indikatör değerlerinin hesaplanması. data bir ohlcv.OHLCV kabıdır."""
+    close = data['close'].astype(np.float64, copy=False)
+    high = data['high'].astype(np.float64, copy=False)
+    low = data['low'].astype(np.float64, copy=False)
+    volume = data['volume'].astype(np.float64, copy=False)
 
     indicators = {
         'RSI': talib.RSI(close, timeperiod=14),
@@ -69,30 +95,43 @@ def calculate_technical_indicators(data):
 
 
 def fetch_and_save_data():
+    if CONFIG['output_format'] == 'npy':
+        dataset = ColumnarDataset(CONFIG['output_dir'])
     all_data = []
 
     for symbol in CONFIG['symbols']:
-        klines = get_historical_data(symbol, CONFIG['interval'], CONFIG['start_date'], CONFIG["end_date"])
+        candles = get_historical_data(symbol, CONFIG['interval'], CONFIG['start_date'], CONFIG["end_date"])
 
-        if klines:
-            df = pd.DataFrame(klines, columns=[
-                'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-                'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
-                'taker_buy_quote_asset_volume', 'ignore'
-            ])
-
-            # Adding symbol and date columns
-            df['symbol'] = symbol
-            df['date'] = pd.to_datetime(df['open_time'], unit='ms')
+        if len(candles):
+            df = candles.to_frame(index=False)
 
             if CONFIG['add_indicators']:
-                indicators = calculate_technical_indicators(klines)
+                indicators = calculate_technical_indicators(candles)
                 for key, values in indicators.items():
                     df[key] = values
 
-            all_data.append(df)
-
-            time.sleep(1)  # To respect Binance API rate limits
+            if CONFIG['output_format'] == 'npy':
+                # İndikatörler tüm geçmiş üzerinden hesaplanır, bölüme sadece son mumdan itibaren olan satırlar eklenir.
+                last_open_time = dataset.last_open_time(symbol, CONFIG['interval'])
+                if CONFIG['append'] and last_open_time is not None:
+                    dataset.append(symbol, CONFIG['interval'], df[df['open_time'] >= last_open_time])
+                else:
+                    dataset.write(symbol, CONFIG['interval'], df)
+            else:
+                # Adding symbol and date columns
+                df.insert(len(STORE_COLUMNS), 'symbol', symbol)
+                df.insert(len(STORE_COLUMNS) + 1, 'date', pd.to_datetime(df['open_time'], unit='ms'))
+                all_data.append(df)
+
+            if kline_store is None:
+                # To respect Binance API rate limits. Depo kullanılırken önbellekteki semboller için istek atılmaz; eksik
+                # aralıkları çeken fetch_chunked sayfalamayı ve istek ağırlığı sınırını kendisi yönetir.
+                time.sleep(1)
+
+    if CONFIG['output_format'] == 'npy':
+        # Veri seti bölüm bölüm diske yazıldı. Mum dönmeyen semboller için bölüm oluşmaz; bölümler
+        # dataset.read(symbol, interval) ile memory-map olarak okunur.
+        return dataset
 
     # Saving all data to a CSV file
     all_data_df = pd.concat(all_data)
@@ -103,4 +142,7 @@ def fetch_and_save_data():
 
 # Fetching and saving the data
 data_df = fetch_and_save_data()
-data_df.head()  # Displaying the head of the data
+if isinstance(data_df, ColumnarDataset):
+    print(f"Yazılan bölümler: {data_df.symbols(CONFIG['interval'])}")
+else:
+    data_df.head()  # Displaying the head of the data
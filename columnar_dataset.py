@@ -0,0 +1,178 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from kline_store import STORE_COLUMNS, append_columns, read_columns, read_meta, write_columns
+
+
+class ColumnarDataset:
+    """
+    binance_historical_data veri setinin sütun bazlı, tipli ve bölümlenmiş hali. Her sembol ve interval
+    `root/SYMBOL/INTERVAL/` klasöründe sütun başına bir `.npy` dosyası ve sütun listesini tutan bir `meta.json` dosyası
+    olarak saklanır. Bölümler birbirinden bağımsız yazıldığı için veri seti tek seferde bellekte tutulmadan sembol sembol
+    oluşturulabilir; okuma memory-map ile yapılır, metin ayrıştırma yoktur. Bölümler kline_store ile aynı yöntemle
+    yazılır (write_columns, append_columns): yarım kalan yazmalar bölümü bozmaz ve yeni mumlar dosyaların sonuna
+    eklenir.
+
+    Parameters
+    ----------
+    root : str
+        Veri setinin kök klasörü.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def partition_path(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def columns(self, symbol, interval):
+        """
+        Bir bölümdeki sütunların adlarını döndürür. Bölüm yoksa boş liste döner.
+        """
+        meta = read_meta(self.partition_path(symbol, interval))
+        return [] if meta is None else meta['columns']
+
+    def symbols(self, interval):
+        """
+        Verilen interval için bölümü bulunan sembolleri döndürür.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(symbol for symbol in os.listdir(self.root) if self.columns(symbol, interval))
+
+    def write(self, symbol, interval, df):
+        """
+        Bir bölümü verilen DataFrame ile baştan yazar. Kline sütunları kline_store.STORE_COLUMNS tiplerine, diğer sayısal
+        sütunlar (indikatörler) float64 tipine çevrilir. 'symbol', 'date' ve 'ignore' gibi bölümden ya da open_time'dan
+        türetilebilen sütunlar saklanmaz. Sütunlar yeni bir alt klasöre yazılıp meta.json tek adımda değiştirildiği için
+        yarım kalan bir yazma bölümü bozmaz (kline_store.write_columns).
+
+        Parameters
+        ----------
+        symbol : str
+            Sembol. Örneğin: 'BTCUSDT'.
+
+        interval : str
+            Candlestick intervali. Örneğin: '4h'.
+
+        df : pandas.DataFrame
+            'open_time' sütunu milisaniye cinsinden olan, fetch_and_save_data formatındaki veri.
+
+        Returns
+        -------
+        int
+            Yazılan satır sayısı.
+        """
+        arrays = self._arrays(df)
+        order = np.argsort(arrays['open_time'], kind='stable')
+        if np.any(order != np.arange(len(order))):
+            arrays = {column: values[order] for column, values in arrays.items()}
+        write_columns(self.partition_path(symbol, interval), arrays, {'columns': list(arrays)})
+        return len(arrays['open_time'])
+
+    @staticmethod
+    def _arrays(df, columns=None):
+        columns = columns or [column for column in df.columns if column not in ('symbol', 'date', 'ignore')]
+        return {column: df[column].to_numpy(dtype=STORE_COLUMNS.get(column, np.float64)) for column in columns}
+
+    def append(self, symbol, interval, df):
+        """
+        Bölüme yeni mumları ekler; bölüm yoksa write ile aynıdır. Bölümde zaten bulunan open_time değerlerine sahip
+        satırlar yeni gelenlerle değiştirilir. Yeni veri bölümün son mumundan sonra başlıyorsa ya da bölümle çakışan
+        satırları bölümdekilerle aynıysa (olağan durum) sadece yeni satırlar sütun dosyalarının sonuna yazılır ve maliyet
+        bölümün uzunluğuna bağlı değildir; aksi halde bölüm birleştirilip baştan yazılır. Bölümdeki ve yeni verideki
+        sütunlar aynı olmalıdır.
+
+        Returns
+        -------
+        int
+            Bölüme eklenen yeni satır sayısı.
+        """
+        columns = self.columns(symbol, interval)
+        if not columns:
+            return self.write(symbol, interval, df)
+        new_columns = [column for column in df.columns if column not in ('symbol', 'date', 'ignore')]
+        if sorted(new_columns) != sorted(columns):
+            raise ValueError(f"{symbol} {interval} bölümünün sütunları eklenen veriyle uyuşmuyor.")
+        if not len(df):
+            return 0
+
+        new = self._arrays(df, columns)
+        open_time, first = np.unique(new['open_time'], return_index=True)
+        if len(open_time) != len(new['open_time']) or np.any(first != np.arange(len(first))):
+            new = {column: values[first] for column, values in new.items()}
+        stored = self.read_arrays(symbol, interval, columns=['open_time'])['open_time']
+
+        # Yeni veri bölümün son satırlarıyla çakışıyorsa ve çakışan satırlar değişmemişse sadece kalanı eklenir. Değişen
+        # satırlar yerinde yazılmaz (meta.json'un saydığı satırlar değiştirilmez); bölüm aşağıda baştan yazılır.
+        at = int(np.searchsorted(stored, open_time[0]))
+        overlap = len(stored) - at
+        if overlap <= len(open_time) and np.array_equal(stored[at:], open_time[:overlap]):
+            tail = self.read_arrays(symbol, interval, columns=columns)
+            if all(np.array_equal(tail[column][at:], new[column][:overlap], equal_nan=True) for column in columns):
+                rest = {column: values[overlap:] for column, values in new.items()}
+                if not len(rest['open_time']):
+                    return 0
+                if append_columns(self.partition_path(symbol, interval), rest, {'columns': columns}):
+                    return len(rest['open_time'])
+
+        existing = self.read_arrays(symbol, interval)
+        # Yeni satırlar önce gelir; np.unique her open_time için ilk satırı seçtiği için tekrar edenlerde yeni veri
+        # kazanır.
+        merged = {column: np.concatenate([new[column], existing[column]]) for column in columns}
+        merged_time, first = np.unique(merged['open_time'], return_index=True)
+        merged = {column: values[first] for column, values in merged.items()}
+        write_columns(self.partition_path(symbol, interval), merged, {'columns': columns})
+        return len(merged_time) - len(stored)
+
+    def last_open_time(self, symbol, interval):
+        """
+        Bölümdeki son mumun milisaniye cinsinden açılış zamanı. Bölüm yoksa None döner.
+        """
+        if not self.columns(symbol, interval):
+            return None
+        open_time = self.read_arrays(symbol, interval, columns=['open_time'])['open_time']
+        return int(open_time[-1]) if len(open_time) else None
+
+    def read_arrays(self, symbol, interval, columns=None, mmap_mode='r'):
+        """
+        Bir bölümün sütunlarını okur. Varsayılan olarak dosyalar memory-map ile açılır, veri kopyalanmaz.
+
+        Returns
+        -------
+        dict
+            Sütun adı -> numpy dizisi.
+        """
+        path = self.partition_path(symbol, interval)
+        meta = read_meta(path)
+        if meta is None:
+            raise FileNotFoundError(f"{symbol} {interval} bölümü bulunamadı: {path}")
+        return read_columns(path, meta, columns or meta['columns'], mmap_mode=mmap_mode)
+
+    def read(self, symbol, interval, columns=None):
+        """
+        Bir bölümü 'open_time' indeksli bir DataFrame olarak döndürür. Sütunlar memory-map edilmiş dizilerin üzerine
+        kopyalanmadan kurulur ve salt okunurdur.
+
+        Parameters
+        ----------
+        symbol : str
+            Sembol.
+
+        interval : str
+            Candlestick intervali.
+
+        columns : list, optional
+            Okunacak sütunlar. Verilmezse tüm sütunlar okunur.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Bölümdeki veri.
+        """
+        arrays = self.read_arrays(symbol, interval, columns=None if columns is None else ['open_time'] + list(columns))
+        index = pd.to_datetime(arrays.pop('open_time'), unit='ms')
+        index.name = 'open_time'
+        return pd.DataFrame(arrays, index=index, copy=False)
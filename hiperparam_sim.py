@@ -1,13 +1,30 @@
+import numpy as np
 import pandas as pd
 import requests
 from datetime import datetime
 import talib
+import param_search
+import profiling
+import signal_engine
+import trade_kernel
+import trade_metrics
+import walk_forward
+from kline_fetch import api_url
+from kline_store import KlineStore
+from ohlcv import OHLCV
+from resample import ResampledStore
+from async_fetch import fetch_chunked
+from shared_data import PortableOHLCV, SharedOHLCV, fingerprint
+from sweep import SweepCoordinator
+from result_store import ResultStore, code_version
 from statistics import median
+from functools import partial
+from contextlib import nullcontext
 from joblib import Parallel, delayed
 import multiprocessing
 
 
-def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
+def get_binance_data(symbol, interval, start_time, end_time, limit=5000, store=None, chunked=False):
     """
     Binance API üzerinden belirli bir zaman aralığı için belirli bir sembolün kline (candlestick) verilerini çeker.
 
@@ -28,38 +45,49 @@ def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
     limit : int, optional
         Tek bir istekte çekilebilecek maksimum kline sayısı. Varsayılan değer 5000.
 
+    store : kline_store.KlineStore, optional
+        Verilirse veri yerel depodan okunur ve sadece depoda eksik olan aralıklar API'den çekilir. Bu durumda 5000 satır
+        sınırı uygulanmaz. Varsayılan değer None.
+
+    chunked : bool, optional
+        True ise aralık mum sınırlarına hizalı pencerelere bölünüp pencereler eşzamanlı çekilir ve birleştirilir. Bu modda
+        5000 satır sınırı yoktur, istenen uzunlukta aralık çekilebilir. Varsayılan değer False.
+
     Returns
     -------
     pandas.DataFrame
         Binance'ten alınan kline verileri. Sütunlar: 'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'.
-        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür.
+        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume'.
+        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür. Fiyat ve
+        hacim sütunları float64, zamanlar ve işlem sayısı int64 tipindedir.
     """
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
-    columns = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume',
-               'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+    if store is not None:
+        return store.load_frame(symbol, interval, start_time, end_time)
+
+    url = f"{api_url()}/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
 
     data = []
-    while start_time < end_time:
-        response = requests.get(url)
-        temp_data = response.json()
-        data.extend(temp_data)
+    if chunked:
+        data = fetch_chunked(symbol, interval, start_time, end_time)
+    else:
+        while start_time < end_time:
+            response = requests.get(url)
+            temp_data = response.json()
+            data.extend(temp_data)
 
-        if len(temp_data) == 0:
-            break
-        else:
-            start_time = temp_data[-1][0] + 1
-            url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
+            if len(temp_data) == 0:
+                break
+            else:
+                start_time = temp_data[-1][0] + 1
+                url = f"{api_url()}/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
 
-        # 5000 k-line verisine ulaştığında döngüyü durdur
-        if len(data) >= 5000:
-            data = data[:5000]
-            break
+            # 5000 k-line verisine ulaştığında döngüyü durdur
+            if len(data) >= 5000:
+                data = data[:5000]
+                break
 
-    df = pd.DataFrame(data, columns=columns)
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-    df.set_index('open_time', inplace=True)
-    return df
+    # Satırlar bir kez tipli sütunlara ayrıştırılır; fiyat sütunları tekrar dönüştürülmeden kullanılır.
+    return OHLCV.from_klines(data).to_frame()
 
 
 interval = "1d"
@@ -67,6 +95,14 @@ start_time = "2018-01-01 00:00:00"
 end_time = "2022-01-01 00:00:00"
 coins = ["BTCUSDT", "ETHUSDT", "XRPUSDT"] # İstenilen coin/usdt çiftleri girilmeli. İlgili coin ilgili tarihte
 # binance borsasında işlem gördüğine emin olunmalı.
+# Yerel kline deposu. Daha önce çekilen aralıklar diskten okunur, sadece eksik kısımlar API'den çekilir.
+# İnternet erişimi yoksa offline=True ile sadece depodaki veri kullanılır. Depoyu kullanmamak için None yapın.
+kline_store = KlineStore('klines', fetcher=fetch_chunked, offline=False)
+# Taban interval. Verilirse (örneğin '1h') `interval` mumları depodaki bu intervalin mumlarından yerel olarak türetilir;
+# interval değiştirmek yeni bir indirme gerektirmez. Her intervali ayrı çekmek için None yapın.
+base_interval = None
+if kline_store is not None and base_interval:
+    kline_store = ResampledStore(kline_store, base_interval)
 
 
 start_time_unix = int(datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
@@ -95,11 +131,11 @@ def calculate_points(df, rsip=1.8, macdp=1.8):
         Hesaplanan toplam puan.
     """
     total_points = 1
-    open_ = df['open'].astype(float)
-    close = df['close'].astype(float)
-    high = df['high'].astype(float)
-    low = df['low'].astype(float)
-    volume = df['volume'].astype(float)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
     rsi = talib.RSI(close, timeperiod=14)
     rsi_ma = talib.SMA(rsi, timeperiod=14)
     macd, macd_signal, macd_hist = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
@@ -129,7 +165,7 @@ def calculate_points(df, rsip=1.8, macdp=1.8):
     return total_points
 
 
-def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8):
+def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8, parity=False):
     """
     Verilen DataFrame'de ticaret sinyallerini belirler ve 'points', 'long_signal' ve 'short_signal' sütunlarını döndürür.
 
@@ -150,18 +186,21 @@ def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8):
     macdp : float, optional
         MACD hesaplamasında kullanılan parametre. Varsayılan değer 1.8.
 
+    parity : bool, optional
+        True ise vektörel puanlar eski expanding().apply yöntemiyle karşılaştırılır ve fark varsa AssertionError
+        fırlatılır. Eski yöntem O(n²) olduğu için sadece doğrulama amacıyla kullanılmalıdır. Varsayılan değer False.
+
     Returns
     -------
     pandas.DataFrame
         Girdi DataFrame'ine 'points', 'long_signal' ve 'short_signal' sütunları eklenmiş hali.
     """
-    df['points'] = df['close'].expanding(min_periods=20).apply(
-        lambda x: calculate_points(df.loc[x.index], rsip=rsip, macdp=macdp))
+    # İndikatörler tüm seri için bir kez hesaplanır, her mumun puanı O(n) sürede bulunur.
+    points = signal_engine.calculate_points_series(df['close'].to_numpy(dtype=float), rsip=rsip, macdp=macdp)
+    if parity:
+        signal_engine.check_parity(df, points, calculate_points, rsip=rsip, macdp=macdp)
 
-    df['long_signal'] = df['points'] > higher_than
-    df['short_signal'] = df['points'] < short_th
-
-    return df
+    return signal_engine.apply_signals(df, points, higher_than=higher_than, short_th=short_th)
 
 
 def simulate_trades(df, leverage):
@@ -190,57 +229,8 @@ def simulate_trades(df, leverage):
     float
         Simülasyon sürecinde yaşanan maksimum düşüş miktarı.
     """
-    trades = []
-    position = 0
-    balance = 100
-    highest_balance = 100
-    max_drawdown = 0
-    entry_time = None
-    entry_points = None
-    margin_call = False
-    for index, row in df.iterrows():
-        if position == 0:
-            if row['long_signal'] and not margin_call:
-                position = 1
-                entry_price = row['close']
-                entry_time = index
-                entry_points = row['points']
-            elif row['short_signal'] and not margin_call:
-                position = -1
-                entry_price = row['close']
-                entry_time = index
-                entry_points = row['points']
-        elif position == 1:
-            points_condition = 0.6 != None and row['points'] < 0.6
-            exit_condition = points_condition or margin_call
-            if exit_condition:
-                exit_price = row['close']
-                pnl = (exit_price - entry_price) / entry_price * leverage
-                new_balance = balance * (1 + pnl)
-                position = 0
-                entry_balance = balance
-                balance = new_balance
-                trades.append({"entry_time": entry_time, "close_time": row['close_time'], "type": "long", "entry_price": entry_price, "exit_price": exit_price, "pnl": pnl, "entry_balance": entry_balance, "exit_balance": balance, "entry_points": entry_points})
-                highest_balance = max(highest_balance, balance)
-                max_drawdown = max(max_drawdown, highest_balance - balance)
-                if balance <= 0:
-                    margin_call = True
-        elif position == -1:
-            points_condition = 0.6 != None and row['points'] > 0.6
-            exit_condition = points_condition or margin_call
-            if exit_condition:
-                exit_price = row['close']
-                pnl = (entry_price - exit_price) / entry_price * leverage
-                new_balance = balance * (1 + pnl)
-                position = 0
-                entry_balance = balance
-                balance = new_balance
-                trades.append({"entry_time": entry_time, "close_time": row['close_time'], "type": "short", "entry_price": entry_price, "exit_price": exit_price, "pnl": pnl, "entry_balance": entry_balance, "exit_balance": balance, "entry_points": entry_points})
-                highest_balance = max(highest_balance, balance)
-                max_drawdown = max(max_drawdown, highest_balance - balance)
-                if balance <= 0:
-                    margin_call = True
-    return trades, balance, max_drawdown
+    # DataFrame.iterrows yerine numpy dizileri üzerinde çalışan (numba kuruluysa derlenmiş) durum makinesi kullanılır.
+    return trade_kernel.simulate_trades(df, leverage)
 
 
 def print_trades(trades):
@@ -284,7 +274,7 @@ macdps = [1.8, 1.2]
 
 
 
-def calculate_score(params):
+def calculate_score(params, data=None):
     """
     Belirli parametreler ile alım satım sinyallerini hesaplar, bu sinyaller üzerinde ticaret simülasyonları yapar ve
     sonuçları skorlar. Hesaplanan skor, normalize edilmiş karlı işlem oranı, normalize edilmiş medyan kar/zarar ve
@@ -292,6 +282,8 @@ def calculate_score(params):
     Eğer belirli parametrelerle hiçbir sinyal oluşturulamazsa, bir mesaj yazdırır ve None döner.
 
     :param params (tuple): Optimize edilecek parametreler.
+    :param data (SharedOHLCV): Ana süreçte bir kez çekilip paylaşılan coin verileri. Verilirse veri tekrar çekilmez,
+    memory-map edilmiş dosyalardan kopyalanmadan okunur. None ise her coin için get_binance_data çağrılır.
     :return: tuple: Hesaplanan skor, parametreler,
     işlem sayıları (medyan, min, max), karlı işlem oranı, işlem başına kar/zarar (medyan, min, max).
     Eğer hiçbir sinyal oluşturulamazsa, None döner.
@@ -300,40 +292,100 @@ def calculate_score(params):
     all_results = []
     num_trades_per_coin = []
     for coin in coins:
-        df = get_binance_data(coin, interval, start_time_unix, end_time_unix)
-        df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype(float)
+        if data is not None:
+            df = data.frame(coin)
+        else:
+            with profiling.stage('fetch', coin=coin) as fetch:
+                df = get_binance_data(coin, interval, start_time_unix, end_time_unix, store=kline_store)
+                fetch.rows = len(df)
 
-        trading_signals = trading_signal(df, higher_than=higher_than, rsip=rsip, macdp=macdp)
+        with profiling.context(coin=coin, params=params):
+            trading_signals = trading_signal(df, higher_than=higher_than, rsip=rsip, macdp=macdp)
 
-        trades, final_balance, max_drawdown = simulate_trades(trading_signals, leverage)
+            trades, final_balance, max_drawdown = simulate_trades(trading_signals, leverage)
         num_trades_per_coin.append(len(trades))
 
         all_results.extend([(trade['pnl'], (pd.to_datetime(trade['close_time'], unit='ms') - trade['entry_time']).days) for trade in trades])
 
-    if len(all_results) == 0:
-        print(
-            f"Verilen parametreler (higher_than={higher_than}, rsip={rsip}, macdp={macdp}) ile hiçbir sinyal oluşmamıştır.")
-        return None
+    return score_trades(params, all_results, num_trades_per_coin)
 
-    if len(all_results) == 0:
-        avg_days_in_trade = 0
+
+def calculate_scores(param_list, data, fraction=1.0):
+    """
+    calculate_score fonksiyonunun bir parametre listesi için toplu (batch) hali. RSI, RSI-SMA ve MACD parametrelerden
+    bağımsız olduğu için her coin için bir kez hesaplanır; tüm kombinasyonların puanları ve sinyalleri
+    signal_engine.batch_signals ile tek geçişte bulunur. Sonuçlar calculate_score ile aynıdır.
+
+    :param param_list (list): (higher_than, rsip, macdp) tuple'larından oluşan liste.
+    :param data (SharedOHLCV): Ana süreçte bir kez çekilip paylaşılan coin verileri.
+    :param fraction (float): Simülasyonda kullanılacak veri oranı. 1'den küçükse her coinin sadece ilk `fraction` kısmı
+    simüle edilir; adaptif aramada ucuz ön değerlendirme için kullanılır. İndikatörler nedensel olduğu için ön ekteki
+    puanlar tam serideki puanlarla aynıdır.
+    :return: list: Her kombinasyon için calculate_score ile aynı formatta sonuç (ya da None).
+    """
+    higher_thans_, rsips_, macdps_ = np.array(param_list, dtype=float).reshape(-1, 3).T
+    pnl_parts = [[] for _ in param_list]
+    day_parts = [[] for _ in param_list]
+    num_trades_per_coin = [[] for _ in param_list]
+    for coin in coins:
+        arrays = data.attach(coin)
+        close = arrays['close']
+        points, long_signal, short_signal = signal_engine.batch_signals(close, higher_thans_, rsips_, macdps_,
+                                                                         symbol=coin, interval=interval)
+        n_bars = max(1, int(np.ceil(len(close) * fraction)))
+
+        for k in range(len(param_list)):
+            with profiling.context(coin=coin, params=param_list[k]):
+                trades, final_balance, max_drawdown = trade_kernel.simulate_arrays(
+                    close[:n_bars], points[k, :n_bars], long_signal[k, :n_bars], short_signal[k, :n_bars], leverage)
+            # İşlem süresi gün cinsinden, calculate_score'daki Timedelta.days gibi aşağı yuvarlanır.
+            days = (arrays['close_time'][trades['exit_idx']] - arrays['open_time'][trades['entry_idx']]) // 86_400_000
+            num_trades_per_coin[k].append(len(trades['pnl']))
+            pnl_parts[k].append(trades['pnl'])
+            day_parts[k].append(days)
+
+    # İşlemler sütun formatında skorlanır; işlem başına Python tuple'ı oluşturulmaz.
+    return [score_trades(p, trade_metrics.columnar_trades(np.concatenate(pnls), days=np.concatenate(days)), n)
+            for p, pnls, days, n in zip(param_list, pnl_parts, day_parts, num_trades_per_coin)]
+
+
+def score_trades(params, all_results, num_trades_per_coin, verbose=True):
+    """
+    Tüm coinlerdeki işlemlerden skoru hesaplar. Skor, normalize edilmiş karlı işlem oranı, normalize edilmiş medyan
+    kar/zarar ve normalize edilmiş işlem sayısı çarpımıdır. Kar/zarar istatistikleri trade_metrics.pnl_summary ile
+    vektörel olarak hesaplanır.
+
+    :param params (tuple): Denenen parametreler (higher_than, rsip, macdp).
+    :param all_results (list | dict): Her işlem için (kar/zarar, gün sayısı) tuple'ları ya da 'pnl' ve 'days' dizilerini
+    içeren sütun sözlüğü (trade_metrics.columnar_trades).
+    :param num_trades_per_coin (list): Her coin için işlem sayısı.
+    :param verbose (bool): False ise sonuçlar yazdırılmaz. Walk-forward gibi çok sayıda skorlama yapılan durumlar için.
+    :return: tuple: calculate_score ile aynı formatta sonuç. Hiçbir sinyal yoksa ya da ortalama işlem süresi
+    max_avg_days_in_trade değerini aşıyorsa None döner.
+    """
+    higher_than, rsip, macdp = params
+    if isinstance(all_results, dict):
+        pnls, days = all_results['pnl'], all_results['days']
     else:
-        avg_days_in_trade = sum([trade[1] for trade in all_results]) / len(all_results)
+        pnls, days = np.array(all_results, dtype=np.float64).reshape(-1, 2).T
+    if len(pnls) == 0:
+        if verbose:
+            print(
+                f"Verilen parametreler (higher_than={higher_than}, rsip={rsip}, macdp={macdp}) ile hiçbir sinyal oluşmamıştır.")
+        return None
+
+    avg_days_in_trade = np.sum(days) / len(days)
 
     if avg_days_in_trade > max_avg_days_in_trade:
         return None
 
-    profitable_trade_ratios = [trade[0] > 0 for trade in all_results]
-
-    median_pnls = [trade[0] for trade in all_results]
+    summary = trade_metrics.pnl_summary(pnls)
+    median_pnl, min_pnl, max_pnl = summary['median_pnl'], summary['min_pnl'], summary['max_pnl']
 
-    if len(profitable_trade_ratios) > 0:
-        normalized_profit_trade_ratio = sum(profitable_trade_ratios) / len(profitable_trade_ratios)
-    else:
-        normalized_profit_trade_ratio = 0
+    normalized_profit_trade_ratio = summary['win_rate']
 
-    if len(median_pnls) > 0 and max(median_pnls) != min(median_pnls):
-        normalized_median_pnl = (median(median_pnls) - min(median_pnls)) / (max(median_pnls) - min(median_pnls))
+    if max_pnl != min_pnl:
+        normalized_median_pnl = (median_pnl - min_pnl) / (max_pnl - min_pnl)
     else:
         normalized_median_pnl = 0
 
@@ -345,31 +397,211 @@ def calculate_score(params):
 
     score = normalized_profit_trade_ratio * normalized_median_pnl * normalized_num_trades
 
-    print(f"Denenen parametreler: higher_than={higher_than}, rsip={rsip}, macdp={macdp}")
-    print(f"Hesaplanan skor: {score}")
-    print(f"İşlem sayısı (medyan, min, max): {median(num_trades_per_coin)}, {min(num_trades_per_coin)}, {max(num_trades_per_coin)}")
-    if len(profitable_trade_ratios) > 0:
-        profit_ratio = sum(profitable_trade_ratios) / len(profitable_trade_ratios)
-    else:
-        profit_ratio = 0
-    print(f"Karlı işlem oranı: {profit_ratio}")
-    print(f"İşlem başına kar/zarar (medyan, min, max): {median(median_pnls)}, {min(median_pnls)}, {max(median_pnls)}\n")
+    if verbose:
+        print(f"Denenen parametreler: higher_than={higher_than}, rsip={rsip}, macdp={macdp}")
+        print(f"Hesaplanan skor: {score}")
+        print(f"İşlem sayısı (medyan, min, max): {median(num_trades_per_coin)}, {min(num_trades_per_coin)}, {max(num_trades_per_coin)}")
+        print(f"Karlı işlem oranı: {summary['win_rate']}")
+        print(f"İşlem başına kar/zarar (medyan, min, max): {median_pnl}, {min_pnl}, {max_pnl}\n")
 
-    return (score, (higher_than, rsip, macdp), (median(num_trades_per_coin), min(num_trades_per_coin), max(num_trades_per_coin)), sum(profitable_trade_ratios) / len(profitable_trade_ratios), (median(median_pnls), min(median_pnls), max(median_pnls)))
+    return (score, (higher_than, rsip, macdp), (median(num_trades_per_coin), min(num_trades_per_coin), max(num_trades_per_coin)), summary['win_rate'], (median_pnl, min_pnl, max_pnl))
 
 
 # Parametre kombinasyonlarını bir listeye alın
 params = [(higher_than, rsip, macdp) for higher_than in higher_thans for rsip in rsips for macdp in macdps]
 
+# Arama yöntemi:
+# 'grid': tüm kombinasyonlar tam veriyle değerlendirilir.
+# 'halving': successive halving. Tüm kombinasyonlar önce verinin min_budget kadarıyla değerlendirilir, her turda en iyi
+# 1/eta kısmı bir üst tura terfi eder ve son tur tam veriyle yapılır. Sinyal üretmeyen kombinasyonlar ilk turda elenir.
+# 'tpe': TPE benzeri Bayesçi arama. calculate_score ile en fazla n_trials kombinasyon değerlendirilir.
+search = 'grid'
+min_budget = 1 / 9
+eta = 3
+n_trials = 30
+
+# Walk-forward doğrulama: True ise her katta train_days günlük pencerede en iyi parametreler seçilir ve ardından gelen
+# test_days günlük pencerede örneklem dışı olarak denenir. Pencereler her katta test_days kadar ileri kayar.
+walk_forward_validation = False
+train_days = 365
+test_days = 60
+
+# Ölçüm: True ise indirme, indikatör, puan ve simülasyon aşamalarının süreleri, çağrı ve satır sayıları (coin ve parametre
+# seti bazında, joblib işçileri dahil) toplanır ve çalışmanın sonunda profile_report dosyasına (.json ya da .csv) yazılır.
+# profile_allocations True ise tepe bellek kullanımı da ölçülür (yavaştır). profile_params bir (higher_than, rsip, macdp)
+# kombinasyonu ise bu kombinasyonun calculate_score değerlendirmesi cProfile ile profillenir (profile_eval.prof).
+profile = False
+profile_allocations = False
+profile_report = 'profile_report.json'
+profile_params = None
+if profile:
+    profiling.enable(allocations=profile_allocations)
+
 # Çekirdek sayısını belirleyin
 num_cores = multiprocessing.cpu_count()
 
-# Paralel hesaplamayı başlatın
-results = Parallel(n_jobs=num_cores)(delayed(calculate_score)(p) for p in params)
+# Dağıtık tarama: True ise 'grid' ve 'halving' aramalarında kombinasyonlar sweep_chunk_size büyüklüğünde birimlere
+# bölünür ve sweep.SweepCoordinator ile TCP üzerinden bağlanan işçilere dağıtılır. Diğer makinelerde aynı
+# CRYANAL_SWEEP_AUTHKEY ortam değişkeniyle `python sweep.py worker --host <bu makine> --port <sweep_port>` çalıştırılır;
+# bu makinede de sweep_local_workers kadar işçi başlatılır. Kaybedilen işçilerin birimleri diğer işçilere verilir.
+distributed = False
+sweep_host = '0.0.0.0'
+sweep_port = 8765
+sweep_local_workers = num_cores
+sweep_chunk_size = 8
+coordinator = None
+
+# Sonuç deposu: her kombinasyonun sonucu tamamlanır tamamlanmaz bu SQLite dosyasına yazılır. Anahtar coinler, interval,
+# tarih aralığı, sonucu etkileyen ayarlar, yüklenen verinin özeti, parametreler, veri oranı ve puanlama/simülasyon
+# kodunun sürümüdür; tarama yarıda kalırsa ya da ızgaraya yeni değerler eklenirse sadece değerlendirilmemiş
+# kombinasyonlar hesaplanır. Depodan okunan sonuçların ayrıntılı çıktısı (score_trades) tekrar yazdırılmaz. Geçmiş
+# taramaların en iyi sonuçları için: python result_store.py sweep_results.sqlite. Kullanmamak için None yapın.
+results_db = 'sweep_results.sqlite'
+# Depo veri yüklendikten sonra açılır (open_result_store).
+result_store = None
+
+
+def open_result_store(data):
+    """
+    results_db deposunu açar. Anahtara yüklenen verinin özeti (shared_data.fingerprint) eklenir; farklı veriyle
+    hesaplanan skorlar birbirinin yerine kullanılmaz.
+
+    :param data (SharedOHLCV): Paylaşılan coin verileri.
+    :return: ResultStore ya da results_db None ise None.
+    """
+    if results_db is None:
+        return None
+    return ResultStore(
+        results_db,
+        settings={'coins': coins, 'interval': interval, 'start_time': start_time_unix, 'end_time': end_time_unix,
+                  'leverage': leverage, 'max_avg_days_in_trade': max_avg_days_in_trade, 'data': fingerprint(data)},
+        code_version=code_version(signal_engine, trade_kernel, trade_metrics, calculate_points, trading_signal,
+                                  simulate_trades, calculate_score, calculate_scores, score_trades))
+
 
-# None olan sonuçları filtreleyin ve en iyi skoru bulun
-results = [r for r in results if r is not None]
-best_score, best_parameters, trade_numbers, profitable_ratio, pnl_per_trade = max(results, key=lambda x: x[0])
+def evaluate_parallel(param_list, data, fraction=1.0):
+    """
+    Parametre listesini çekirdek sayısı kadar parçaya bölüp her parçayı calculate_scores ile paralel değerlendirir.
+    Böylece indikatörler her kombinasyon için değil her parça ve coin için bir kez hesaplanır. Dağıtık taramada
+    (distributed) parçalar sweep_chunk_size büyüklüğündedir ve koordinatöre bağlı işçilerde değerlendirilir. Sonuç deposu
+    (results_db) açıksa daha önce değerlendirilmiş kombinasyonlar tekrar hesaplanmaz ve her parçanın sonuçları parça
+    biter bitmez kaydedilir.
+
+    :param param_list (list): (higher_than, rsip, macdp) tuple'larından oluşan liste.
+    :param data (SharedOHLCV): Paylaşılan coin verileri.
+    :param fraction (float): Simülasyonda kullanılacak veri oranı.
+    :return: list: Her kombinasyon için sonuç (ya da None), param_list sırasıyla.
+    """
+    if result_store is not None:
+        hits = result_store.counters['hits']
+        results = result_store.evaluate(param_list, partial(_evaluate_chunks, data=data, fraction=fraction), fraction)
+        cached = result_store.counters['hits'] - hits
+        if cached:
+            print(f"{cached} / {len(param_list)} kombinasyonun sonucu sonuç deposundan ({results_db}) okundu; bu "
+                  f"kombinasyonların ayrıntılı çıktısı yazdırılmadı.")
+        return results
+    return _evaluate_chunks(param_list, data=data, fraction=fraction)
+
+
+def _evaluate_chunks(param_list, store=None, data=None, fraction=1.0):
+    # store(params, results) verilirse her parçanın sonuçları parça tamamlandığında çağrılır.
+    if coordinator is not None:
+        units = [(param_list[i:i + sweep_chunk_size], fraction) for i in range(0, len(param_list), sweep_chunk_size)]
+        on_result = None if store is None else lambda index, chunk_result: store(units[index][0], chunk_result)
+        chunk_results = coordinator.map(lambda unit, shared: calculate_scores(unit[0], shared, unit[1]), units,
+                                        on_result=on_result)
+        return [r for chunk in chunk_results for r in chunk]
+
+    chunk_size = -(-len(param_list) // num_cores)
+    param_chunks = [param_list[i:i + chunk_size] for i in range(0, len(param_list), chunk_size)]
+    chunk_results = []
+    if profiling.enabled:
+        # İşçilerde toplanan ölçümler sonuçlarla birlikte ana sürece döner.
+        profiled = Parallel(n_jobs=num_cores, return_as='generator')(
+            delayed(profiling.profiled_call)(calculate_scores, chunk, data, fraction) for chunk in param_chunks)
+        for chunk, (chunk_result, records) in zip(param_chunks, profiled):
+            chunk_results.append(chunk_result)
+            profiling.merge(records)
+            if store is not None:
+                store(chunk, chunk_result)
+    else:
+        generator = Parallel(n_jobs=num_cores, return_as='generator')(delayed(calculate_scores)(chunk, data, fraction)
+                                                                      for chunk in param_chunks)
+        for chunk, chunk_result in zip(param_chunks, generator):
+            chunk_results.append(chunk_result)
+            if store is not None:
+                store(chunk, chunk_result)
+    return [r for chunk in chunk_results for r in chunk]
+
+
+def evaluate_one(params, data):
+    """calculate_score fonksiyonunun sonuç deposunu kullanan hali (TPE araması için)."""
+    if result_store is None:
+        return calculate_score(params, data)
+    hits = result_store.counters['hits']
+    result = result_store.evaluate([params], lambda missing, store: [calculate_score(missing[0], data)])[0]
+    if result_store.counters['hits'] > hits:
+        print(f"Denenen parametreler: {params}: sonuç deposundan ({results_db}) okundu, skor: "
+              f"{None if result is None else result[0]}")
+    return result
+
+
+# Her coinin verisi ana süreçte bir kez çekilir ve işçilerle memory-map edilmiş dosyalar üzerinden paylaşılır.
+# Böylece ağ ve bellek maliyeti parametre sayısından bağımsız olur.
+frames = {}
+for coin in coins:
+    with profiling.stage('fetch', coin=coin) as fetch:
+        frames[coin] = get_binance_data(coin, interval, start_time_unix, end_time_unix, store=kline_store)
+        fetch.rows = len(frames[coin])
+
+with SharedOHLCV.publish(frames) as shared_ohlcv, \
+        (SweepCoordinator(PortableOHLCV.from_shared(shared_ohlcv), host=sweep_host, port=sweep_port,
+                          local_workers=sweep_local_workers) if distributed else nullcontext()) as coordinator:
+    del frames
+    result_store = open_result_store(shared_ohlcv)
+    if coordinator is not None:
+        print(f"Dağıtık tarama {coordinator.address} adresinde dinleniyor.")
+    if search == 'halving':
+        best_result, rounds = param_search.successive_halving(
+            params, lambda candidates, budget: evaluate_parallel(candidates, shared_ohlcv, budget),
+            min_budget=min_budget, eta=eta)
+        print(f"Successive halving turları (veri oranı, kombinasyon sayısı): {rounds}")
+    elif search == 'tpe':
+        best_result, history = param_search.tpe_search([higher_thans, rsips, macdps],
+                                                       lambda p: evaluate_one(p, shared_ohlcv), n_trials=n_trials)
+        print(f"TPE ile değerlendirilen kombinasyon sayısı: {len(history)} / {len(params)}")
+    else:
+        # None olan sonuçları filtreleyin ve en iyi skoru bulun
+        results = [r for r in evaluate_parallel(params, shared_ohlcv) if r is not None]
+        best_result = max(results, key=lambda x: x[0])
+
+    if walk_forward_validation:
+        folds = walk_forward.fold_windows(start_time_unix, end_time_unix, train_days * walk_forward.DAY_MS,
+                                          test_days * walk_forward.DAY_MS)
+        fold_reports, summary = walk_forward.walk_forward(shared_ohlcv, params, folds,
+                                                          partial(score_trades, verbose=False), leverage=leverage,
+                                                          n_jobs=num_cores, interval=interval)
+        for report in fold_reports:
+            print(f"Test {pd.to_datetime(report['test_start'], unit='ms').date()} - "
+                  f"{pd.to_datetime(report['test_end'], unit='ms').date()}: parametreler={report['params']}, "
+                  f"eğitim skoru={report['train_score']}, test skoru={report['test_score']}, "
+                  f"işlem sayısı={report['test_trades']}")
+        print(f"Walk-forward örneklem dışı sonuçlar: {summary}")
+
+    if profile_params is not None:
+        profiling.profile_call(calculate_score, profile_params, shared_ohlcv, path='profile_eval.prof')
+
+if profiling.enabled:
+    profiling.print_report()
+    profiling.write_report(profile_report)
+
+if result_store is not None:
+    # hits: depodan okunan, misses: bu çalışmada hesaplanan sonuçlar.
+    print(f"Sonuç deposu ({results_db}): {result_store.counters['hits']} sonuç depodan okundu, "
+          f"{result_store.counters['misses']} sonuç hesaplandı ({result_store.counters})")
+    result_store.close()
+
+best_score, best_parameters, trade_numbers, profitable_ratio, pnl_per_trade = best_result
 
 print(f"En iyi hiperparametreler: higher_than={best_parameters[0]}, risp={best_parameters[1]}, macd={best_parameters[2]}")
 print(f"En iyi skor: {best_score}")
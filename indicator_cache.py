@@ -0,0 +1,184 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+import talib
+
+
+def fingerprint(*arrays):
+    """
+    Dizilerin içeriğinden (tip, boyut ve baytlar) kısa bir özet üretir. Aynı veri aralığı aynı özeti verir; tek bir mum
+    bile değişirse özet değişir.
+
+    Parameters
+    ----------
+    *arrays : array-like
+        Özeti çıkarılacak diziler.
+
+    Returns
+    -------
+    str
+        32 karakterlik onaltılık özet.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        digest.update(f'{values.dtype.str}{values.shape}'.encode())
+        digest.update(memoryview(values).cast('B'))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    İndikatör dizileri için iki katmanlı önbellek. Anahtar (sembol, interval, veri özeti, indikatör adı, parametreler)
+    şeklindedir. İlk katman süreç içinde boyutu sınırlı bir LRU sözlüğüdür; disk_dir verilirse ikinci katman olarak
+    sonuçlar `.npz` dosyalarına yazılır ve sonraki çalıştırmalarda (ya da diğer işçi süreçlerinde) tekrar hesaplanmaz.
+    Dönen diziler salt okunurdur; önbellekteki değerin yanlışlıkla değiştirilmesini engeller.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Bellekte tutulacak maksimum sonuç sayısı. Varsayılan değer 256.
+
+    disk_dir : str, optional
+        Disk katmanının klasörü. Verilmezse sadece bellek katmanı kullanılır.
+    """
+
+    def __init__(self, maxsize=256, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f'{name}.npz')
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def get_or_compute(self, name, params, inputs, compute, symbol=None, interval=None):
+        """
+        Anahtara karşılık gelen sonucu önbellekten döndürür; yoksa compute(*inputs) ile hesaplayıp saklar.
+
+        Parameters
+        ----------
+        name : str
+            İndikatör adı. Örneğin: 'RSI'.
+
+        params : dict
+            İndikatör parametreleri. Örneğin: {'timeperiod': 14}.
+
+        inputs : tuple
+            İndikatörün girdileri (numpy dizileri). Anahtardaki veri özeti bunlardan çıkarılır.
+
+        compute : callable
+            compute(*inputs) şeklinde çağrılıp bir dizi ya da dizi tuple'ı döndüren fonksiyon.
+
+        symbol, interval : str, optional
+            Sembol ve interval. Anahtarı okunur kılar ve farklı sembollerin sonuçlarını ayırır.
+
+        Returns
+        -------
+        numpy.ndarray ya da tuple
+            Salt okunur indikatör dizisi ya da dizileri.
+        """
+        key = (symbol, interval, fingerprint(*inputs), name, tuple(sorted(params.items())))
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+
+        path = self._disk_path(key) if self.disk_dir else None
+        if path is not None and os.path.exists(path):
+            with np.load(path) as stored:
+                arrays = [stored[f'arr_{i}'] for i in range(len(stored.files) - 1)]
+                single = bool(stored['single'])
+            self.disk_hits += 1
+        else:
+            result = compute(*inputs)
+            single = not isinstance(result, tuple)
+            arrays = [np.asarray(result)] if single else [np.asarray(values) for values in result]
+            self.misses += 1
+            if path is not None:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                # Yarım kalan yazmalar önbelleği bozmasın diye dosya önce geçici isimle yazılır.
+                tmp_path = f'{path[:-4]}.{os.getpid()}.tmp.npz'
+                np.savez(tmp_path, *arrays, single=single)
+                os.replace(tmp_path, path)
+
+        for values in arrays:
+            values.setflags(write=False)
+        value = arrays[0] if single else tuple(arrays)
+        self._remember(key, value)
+        return value
+
+    def stats(self):
+        """
+        Önbelleğin isabet sayılarını döndürür.
+
+        Returns
+        -------
+        dict
+            'hits' (bellek), 'disk_hits', 'misses', 'hit_ratio' ve 'size' (bellekteki sonuç sayısı).
+        """
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.disk_hits) / total if total else 0.0,
+            'size': len(self.entries),
+        }
+
+    def clear(self):
+        """Bellek katmanını ve sayaçları sıfırlar. Disk katmanı silinmez."""
+        self.entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+
+# Modüllerin ortak kullandığı önbellek. CRYANAL_INDICATOR_CACHE ortam değişkeni bir klasör gösteriyorsa disk katmanı
+# açılır; ortam değişkeni joblib işçi süreçlerine de geçtiği için işçiler aynı disk katmanını paylaşır.
+default_cache = IndicatorCache(maxsize=int(os.environ.get('CRYANAL_INDICATOR_CACHE_SIZE', 256)),
+                               disk_dir=os.environ.get('CRYANAL_INDICATOR_CACHE') or None)
+
+
+def indicator(name, *inputs, symbol=None, interval=None, cache=None, **params):
+    """
+    talib.<name>(*inputs, **params) sonucunu önbellek üzerinden döndürür. Aynı veri ve parametrelerle yapılan sonraki
+    çağrılar indikatörü yeniden hesaplamaz.
+
+    Parameters
+    ----------
+    name : str
+        TA-Lib fonksiyon adı. Örneğin: 'RSI', 'SMA', 'MACD', 'EMA', 'PLUS_DI'.
+
+    *inputs : numpy.ndarray
+        İndikatörün girdileri. Örneğin kapanış fiyatları ya da (high, low, close).
+
+    symbol, interval : str, optional
+        Sembol ve interval.
+
+    cache : IndicatorCache, optional
+        Kullanılacak önbellek. Verilmezse default_cache kullanılır.
+
+    **params
+        TA-Lib parametreleri. Örneğin: timeperiod=14.
+
+    Returns
+    -------
+    numpy.ndarray ya da tuple
+        Salt okunur indikatör dizisi ya da dizileri (MACD gibi çok çıktılı indikatörlerde).
+    """
+    inputs = tuple(np.ascontiguousarray(values, dtype=np.float64) for values in inputs)
+    function = getattr(talib, name)
+    cache = cache if cache is not None else default_cache
+    return cache.get_or_compute(name, params, inputs, lambda *args: function(*args, **params), symbol=symbol,
+                                interval=interval)
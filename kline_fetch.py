@@ -0,0 +1,197 @@
+import os
+
+import requests
+
+BASE_URL = "https://api.binance.com"
+FUTURES_BASE_URL = "https://fapi.binance.com"
+
+KLINE_COLUMNS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume',
+                 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+
+# Binance interval kodlarının milisaniye karşılıkları. Aylık mumlar sabit uzunlukta olmadığı için listede yoktur.
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 60 * 60_000,
+    '2h': 2 * 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '6h': 6 * 60 * 60_000,
+    '8h': 8 * 60 * 60_000,
+    '12h': 12 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+    '3d': 3 * 24 * 60 * 60_000,
+    '1w': 7 * 24 * 60 * 60_000,
+}
+
+
+def interval_to_ms(interval):
+    """
+    Binance interval kodunu milisaniyeye çevirir.
+
+    Parameters
+    ----------
+    interval : str
+        Candlestick intervali. Örneğin: '1m', '4h', '1d'.
+
+    Returns
+    -------
+    int
+        Bir mumun milisaniye cinsinden süresi.
+    """
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Desteklenmeyen interval: {interval}")
+    return INTERVAL_MS[interval]
+
+
+def api_url(market='spot'):
+    """
+    Binance REST API adresini döndürür. CRYANAL_BINANCE_URL ortam değişkeni ayarlıysa (örneğin yerel mock_binance
+    sunucusu) hem spot hem vadeli istekler bu adrese gider; değişken joblib işçilerine de geçer.
+
+    Parameters
+    ----------
+    market : str, optional
+        'spot' ya da 'futures'. Varsayılan değer 'spot'.
+
+    Returns
+    -------
+    str
+        Sonunda '/' olmayan adres.
+    """
+    override = os.environ.get('CRYANAL_BINANCE_URL')
+    if override:
+        return override.rstrip('/')
+    return FUTURES_BASE_URL if market == 'futures' else BASE_URL
+
+
+def configure_client(client_class):
+    """
+    CRYANAL_BINANCE_URL ayarlıysa python-binance Client sınıfının REST adreslerini bu adrese yönlendirir. İstemci
+    oluşturulurken sunucuya ping attığı için nesne oluşturulmadan önce çağrılmalıdır.
+
+    Parameters
+    ----------
+    client_class : type
+        binance.client.Client.
+
+    Returns
+    -------
+    type
+        Aynı sınıf.
+    """
+    override = os.environ.get('CRYANAL_BINANCE_URL')
+    if override:
+        override = override.rstrip('/')
+        client_class.API_URL = override + '/api'
+        client_class.FUTURES_URL = override + '/fapi'
+    return client_class
+
+
+def fetch_klines(symbol, interval, start_time, end_time, limit=1000, session=None, base_url=None):
+    """
+    Binance REST API üzerinden [start_time, end_time] aralığındaki tüm kline verilerini sayfa sayfa çeker. get_binance_data
+    fonksiyonlarından farklı olarak satır sınırı yoktur; aralığın tamamı döner.
+
+    Parameters
+    ----------
+    symbol : str
+        Çekmek istediğiniz sembol. Örneğin: 'BTCUSDT'.
+
+    interval : str
+        Candlestick intervali. Örneğin: '1m', '3m', '1h', '1d' vb.
+
+    start_time : int
+        Başlangıç zamanı, milisaniye cinsinden timestamp.
+
+    end_time : int
+        Bitiş zamanı, milisaniye cinsinden timestamp (dahil).
+
+    limit : int, optional
+        Tek bir istekte çekilecek maksimum kline sayısı. Binance en fazla 1000 kabul eder. Varsayılan değer 1000.
+
+    session : requests.Session, optional
+        Bağlantıların tekrar kullanılması için oturum. Verilmezse requests.get kullanılır.
+
+    base_url : str, optional
+        API adresi. Verilmezse api_url() kullanılır.
+
+    Returns
+    -------
+    list
+        API'nin döndürdüğü formatta kline satırları.
+    """
+    get = session.get if session is not None else requests.get
+    url = f"{base_url or api_url()}/api/v3/klines"
+
+    data = []
+    while start_time <= end_time:
+        params = {'symbol': symbol, 'interval': interval, 'startTime': start_time, 'endTime': end_time,
+                  'limit': limit}
+        response = get(url, params=params)
+        response.raise_for_status()
+        temp_data = response.json()
+        data.extend(temp_data)
+
+        if len(temp_data) < limit:
+            break
+        start_time = temp_data[-1][0] + 1
+
+    return data
+
+
+def split_range(start_time, end_time, interval, limit=1000):
+    """
+    [start_time, end_time] aralığını, her biri en fazla `limit` mum içeren ve mum sınırlarına hizalanmış pencerelere
+    böler. Pencereler birbirinden bağımsız olarak (eşzamanlı) çekilebilir.
+
+    Parameters
+    ----------
+    start_time, end_time : int
+        Milisaniye cinsinden başlangıç ve bitiş zamanı (dahil).
+
+    interval : str
+        Candlestick intervali. Örneğin: '1m', '1h'.
+
+    limit : int, optional
+        Bir penceredeki maksimum mum sayısı. Varsayılan değer 1000.
+
+    Returns
+    -------
+    list
+        [başlangıç, bitiş] pencereleri.
+    """
+    step = interval_to_ms(interval)
+    span = step * limit
+    windows = []
+    window_start = start_time
+    # İlk pencerenin sonu mum sınırına hizalanır, sonraki pencereler tam `limit` mum içerir.
+    window_end = start_time - start_time % step + span - 1
+    while window_start <= end_time:
+        windows.append([window_start, min(window_end, end_time)])
+        window_start = window_end + 1
+        window_end += span
+    return windows
+
+
+def merge_klines(chunks):
+    """
+    Pencerelerden gelen kline satırlarını birleştirir, open_time'a göre sıralar ve tekrar edenleri atar.
+
+    Parameters
+    ----------
+    chunks : list
+        Kline satırı listelerinden oluşan liste.
+
+    Returns
+    -------
+    list
+        Sıralı ve tekrarsız kline satırları.
+    """
+    merged = {}
+    for chunk in chunks:
+        for row in chunk:
+            merged[row[0]] = row
+    return [merged[open_time] for open_time in sorted(merged)]
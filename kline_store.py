@@ -0,0 +1,421 @@
+import io
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from kline_fetch import fetch_klines, interval_to_ms
+
+# Saklanan sütunlar ve tipleri. API'nin 'ignore' sütunu saklanmaz.
+STORE_COLUMNS = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+
+
+def _merge_ranges(ranges):
+    """Çakışan ya da bitişik [başlangıç, bitiş] aralıklarını birleştirir."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(covered, start_time, end_time):
+    """
+    [start_time, end_time] aralığının saklanan aralıklar tarafından kapsanmayan kısımlarını bulur.
+
+    Parameters
+    ----------
+    covered : list
+        Birleştirilmiş [başlangıç, bitiş] aralıkları.
+
+    start_time, end_time : int
+        İstenen aralık, milisaniye cinsinden (dahil).
+
+    Returns
+    -------
+    list
+        Eksik [başlangıç, bitiş] aralıkları.
+    """
+    gaps = []
+    cursor = start_time
+    for start, end in covered:
+        if end < cursor:
+            continue
+        if start > end_time:
+            break
+        if start > cursor:
+            gaps.append([cursor, start - 1])
+        cursor = max(cursor, end + 1)
+    if cursor <= end_time:
+        gaps.append([cursor, end_time])
+    return gaps
+
+
+def read_meta(path):
+    """Bölüm klasöründeki meta.json içeriği. Bölüm yoksa None döner."""
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _write_meta(path, meta):
+    tmp_path = os.path.join(path, 'meta.tmp.json')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, 'meta.json'))
+
+
+def read_columns(path, meta, columns, mmap_mode='r'):
+    """
+    Bölümün sütun dosyalarını okur. Sütunlar meta.json'daki satır sayısına kısaltılır; yarım kalan bir eklemenin
+    dosyaların sonuna yazdığı satırlar okunmaz.
+
+    Parameters
+    ----------
+    path : str
+        Bölüm klasörü.
+
+    meta : dict
+        read_meta sonucu. 'data' (sütun dosyalarının alt klasörü) ve 'rows' anahtarları yoksa dosyalar bölüm klasöründen
+        tüm uzunluklarıyla okunur (eski format).
+
+    columns : iterable
+        Okunacak sütunlar.
+
+    mmap_mode : str, optional
+        np.load için memory-map modu. None ise veri belleğe okunur. Varsayılan değer 'r'.
+
+    Returns
+    -------
+    dict
+        Sütun adı -> numpy dizisi.
+    """
+    data_path = os.path.join(path, meta.get('data', ''))
+    rows = meta.get('rows')
+    arrays = {}
+    for column in columns:
+        values = np.load(os.path.join(data_path, f'{column}.npy'), mmap_mode=mmap_mode)
+        arrays[column] = values if rows is None else values[:rows]
+    return arrays
+
+
+def write_columns(path, arrays, meta):
+    """
+    Bölümü baştan yazar. Sütunlar önce yeni bir alt klasöre yazılır, sonra meta.json bu klasörü gösterecek şekilde tek
+    adımda (os.replace) değiştirilir ve eski dosyalar silinir. Yazma yarıda kalırsa bölüm eski haliyle okunur.
+
+    Parameters
+    ----------
+    path : str
+        Bölüm klasörü.
+
+    arrays : dict
+        Sütun adı -> numpy dizisi. Tüm diziler aynı uzunlukta olmalıdır.
+
+    meta : dict
+        meta.json'a yazılacak diğer bilgiler (örneğin kapsanan aralıklar). 'data' ve 'rows' anahtarları eklenir.
+    """
+    os.makedirs(path, exist_ok=True)
+    previous = read_meta(path)
+    data = f'data-{time.time_ns()}'
+    data_path = os.path.join(path, data)
+    os.makedirs(data_path)
+    rows = None
+    for column, values in arrays.items():
+        np.save(os.path.join(data_path, f'{column}.npy'), np.ascontiguousarray(values))
+        rows = len(values)
+    _write_meta(path, {**meta, 'data': data, 'rows': rows or 0})
+
+    if previous is not None and previous.get('data'):
+        shutil.rmtree(os.path.join(path, previous['data']), ignore_errors=True)
+    for name in os.listdir(path):
+        # Eski formatta bölüm klasöründe duran sütun dosyaları ve yarım kalmış yazmaların klasörleri.
+        full = os.path.join(path, name)
+        if name.endswith('.npy') or (name.startswith('data-') and name != data and os.path.isdir(full)):
+            if os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+            else:
+                os.remove(full)
+
+
+def _header(dtype, rows):
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                  'fortran_order': False, 'shape': (rows,)})
+    return buffer.getvalue()
+
+
+def append_columns(path, arrays, meta):
+    """
+    Sütunları bölümün sonuna ekler; mevcut satırlar yeniden yazılmaz, maliyet eklenen satır sayısına bağlıdır. Veri her
+    dosyanın sonuna yazılır ve `.npy` başlığındaki boyut yerinde güncellenir; yeni satır sayısı en son meta.json ile
+    kaydedilir. Sadece meta.json'un saydığı satırlardan sonraki baytlara yazılır; dosyalar kısaltılmadığı için okunan
+    satırlar ve açık memory-map'ler etkilenmez. Yarıda kalan bir eklemenin satırları meta.json güncellenmediği için
+    okunmaz ve bir sonraki eklemede üzerine yazılır. Mevcut satırları değiştiren güncellemeler write_columns ile yazılır.
+
+    Parameters
+    ----------
+    path : str
+        Bölüm klasörü. Bölüm yazılmış olmalıdır.
+
+    arrays : dict
+        Sütun adı -> eklenecek satırlar. Bölümdeki tüm sütunlar bulunmalıdır.
+
+    meta : dict
+        meta.json'a yazılacak diğer bilgiler. 'data' ve 'rows' anahtarları korunur ya da güncellenir.
+
+    Returns
+    -------
+    bool
+        False ise (eski format ya da başlığa sığmayan boyut) hiçbir şey yazılmamıştır; bölüm write_columns ile baştan
+        yazılmalıdır.
+    """
+    current = read_meta(path)
+    if current is None or 'data' not in current or 'rows' not in current:
+        return False
+    data_path = os.path.join(path, current['data'])
+    rows = current['rows']
+    added = len(next(iter(arrays.values())))
+
+    files = []
+    for column, values in arrays.items():
+        file_path = os.path.join(data_path, f'{column}.npy')
+        with open(file_path, 'rb') as f:
+            np.lib.format.read_magic(f)
+            _, _, dtype = np.lib.format.read_array_header_1_0(f)
+            header_size = f.tell()
+        header = _header(dtype, rows + added)
+        if len(header) != header_size:
+            return False
+        files.append((file_path, header, np.ascontiguousarray(values, dtype=dtype)))
+
+    for file_path, header, values in files:
+        with open(file_path, 'r+b') as f:
+            f.seek(len(header) + rows * values.itemsize)
+            f.write(values.tobytes())
+            f.seek(0)
+            f.write(header)
+    _write_meta(path, {**meta, 'data': current['data'], 'rows': rows + added})
+    return True
+
+
+class KlineStore:
+    """
+    Sembol ve interval bazında bölümlenmiş, diskte sütun sütun saklanan kline deposu. Her bölüm
+    `root/SYMBOL/INTERVAL/` klasöründe sütun başına bir `.npy` dosyası ve hangi zaman aralıklarının çekildiğini, satır
+    sayısını ve sütun dosyalarının alt klasörünü tutan bir `meta.json` dosyasından oluşur. İstenen aralığın sadece eksik
+    kısımları API'den çekilir, geri kalanı diskten memory-map ile okunur. Son mumdan sonraki yeni mumlar dosyaların
+    sonuna eklenir; sadece baştaki ya da aradaki boşluklar doldurulurken bölüm baştan yazılır.
+
+    Parameters
+    ----------
+    root : str
+        Deponun kök klasörü.
+
+    fetcher : callable, optional
+        fetcher(symbol, interval, start_time, end_time) şeklinde çağrılıp API formatında kline satırları döndüren
+        fonksiyon. Varsayılan değer kline_fetch.fetch_klines.
+
+    offline : bool, optional
+        True ise API'ye hiç istek atılmaz, sadece diskteki veri kullanılır. CRYANAL_OFFLINE=1 ortam değişkeni ile de
+        açılabilir. Varsayılan değer False.
+    """
+
+    def __init__(self, root, fetcher=fetch_klines, offline=False):
+        self.root = root
+        self.fetcher = fetcher
+        self.offline = offline or os.environ.get('CRYANAL_OFFLINE') == '1'
+
+    def partition_path(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def covered_ranges(self, symbol, interval):
+        """
+        Bir bölüm için daha önce çekilmiş [başlangıç, bitiş] aralıklarını döndürür.
+        """
+        meta = read_meta(self.partition_path(symbol, interval))
+        return [] if meta is None else meta['ranges']
+
+    def read_partition(self, symbol, interval, mmap_mode='r'):
+        """
+        Bir bölümün tüm sütunlarını okur. Varsayılan olarak dosyalar memory-map ile açılır, veri kopyalanmaz.
+
+        Returns
+        -------
+        dict
+            Sütun adı -> numpy dizisi. Bölüm yoksa boş diziler döner.
+        """
+        path = self.partition_path(symbol, interval)
+        meta = read_meta(path)
+        if meta is None:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in STORE_COLUMNS.items()}
+        return read_columns(path, meta, STORE_COLUMNS, mmap_mode=mmap_mode)
+
+    def write_partition(self, symbol, interval, arrays, ranges):
+        """
+        Bir bölümün sütunlarını ve kapsadığı aralıkları diske baştan yazar (write_columns). Yarım kalan bir yazma bölümü
+        bozmaz; bölüm eski haliyle okunur.
+        """
+        write_columns(self.partition_path(symbol, interval), {column: arrays[column] for column in STORE_COLUMNS},
+                      {'ranges': _merge_ranges(ranges)})
+
+    def merge_partition(self, symbol, interval, new, ranges):
+        """
+        Yeni mumları bölüme ekler ve kapsanan aralıkları günceller. Tüm yeni mumlar bölümdeki son mumdan sonraysa
+        (kuyruk güncellemesi) sütun dosyalarının sonuna eklenir; aksi halde bölüm birleştirilip baştan yazılır. Aynı
+        open_time değerine sahip mumlardan bölümde olan korunur.
+
+        Parameters
+        ----------
+        new : dict
+            Sütun adı -> yeni mumlar. Sıralı olması gerekmez.
+
+        ranges : list
+            Güncelleme sonrası bölümün kapsadığı tüm [başlangıç, bitiş] aralıkları.
+
+        Returns
+        -------
+        int
+            Eklenen yeni mum sayısı.
+        """
+        path = self.partition_path(symbol, interval)
+        open_time, first = np.unique(new['open_time'], return_index=True)
+        new = {column: np.asarray(new[column], dtype=dtype)[first] for column, dtype in STORE_COLUMNS.items()}
+        existing = self.read_partition(symbol, interval)
+        meta = {'ranges': _merge_ranges(ranges)}
+        if len(existing['open_time']) and (not len(open_time) or open_time[0] > existing['open_time'][-1]):
+            if append_columns(path, new, meta):
+                return len(open_time)
+
+        merged = {column: np.concatenate([existing[column], new[column]]) for column in STORE_COLUMNS}
+        # Zamana göre sırala ve aynı open_time değerine sahip tekrarlanan mumları at.
+        merged_time, first = np.unique(merged['open_time'], return_index=True)
+        write_columns(path, {column: values[first] for column, values in merged.items()}, meta)
+        return len(merged_time) - len(existing['open_time'])
+
+    def update(self, symbol, interval, start_time, end_time):
+        """
+        [start_time, end_time] aralığında eksik olan kısımları API'den çekip bölüme ekler. Sadece kapanmış mumlar
+        saklanır; henüz kapanmamış son mum bir sonraki çağrıda tekrar çekilir.
+
+        Returns
+        -------
+        int
+            Eklenen yeni mum sayısı.
+        """
+        step = interval_to_ms(interval)
+        now = int(time.time() * 1000)
+        # Kapanmamış mumun başlangıcından sonrası kapsanmış sayılmaz.
+        end_time = min(end_time, now - now % step - 1)
+        if self.offline or end_time < start_time:
+            return 0
+
+        covered = self.covered_ranges(symbol, interval)
+        gaps = missing_ranges(covered, start_time, end_time)
+        if not gaps:
+            return 0
+
+        rows = []
+        for gap_start, gap_end in gaps:
+            rows.extend(self.fetcher(symbol, interval, gap_start, gap_end))
+        return self.add_klines(symbol, interval, rows, gaps)
+
+    def add_klines(self, symbol, interval, rows, ranges):
+        """
+        Başka bir yoldan (örneğin async_fetch.fetch_many ile birçok sembol için tek seferde) çekilmiş kline satırlarını
+        bölüme ekler ve ranges aralıklarını kapsanmış olarak işaretler. Kapanmamış mumlar saklanmaz.
+
+        Parameters
+        ----------
+        rows : list
+            API formatında kline satırları.
+
+        ranges : list
+            Satırların çekildiği [başlangıç, bitiş] aralıkları. Bitişler kapanmış son mumu geçmemelidir.
+
+        Returns
+        -------
+        int
+            Eklenen yeni mum sayısı.
+        """
+        now = int(time.time() * 1000)
+        rows = [row for row in rows if row[6] < now]
+        new = {column: np.array([row[i] for row in rows], dtype=dtype)
+               for i, (column, dtype) in enumerate(STORE_COLUMNS.items())}
+        return self.merge_partition(symbol, interval, new, self.covered_ranges(symbol, interval) + list(ranges))
+
+    def load(self, symbol, interval, start_time, end_time):
+        """
+        [start_time, end_time] aralığındaki mumları sütunlar halinde döndürür. Eksik kısımlar varsa (offline modda
+        değilse) önce API'den çekilir.
+
+        Parameters
+        ----------
+        symbol : str
+            Sembol. Örneğin: 'BTCUSDT'.
+
+        interval : str
+            Candlestick intervali. Örneğin: '1h', '1d'.
+
+        start_time, end_time : int
+            Milisaniye cinsinden başlangıç ve bitiş zamanı (dahil).
+
+        Returns
+        -------
+        dict
+            Sütun adı -> numpy dizisi. Diziler memory-map edilmiş dosyaların dilimleridir.
+        """
+        self.update(symbol, interval, start_time, end_time)
+        arrays = self.read_partition(symbol, interval)
+        lo, hi = np.searchsorted(arrays['open_time'], [start_time, end_time], side='left')
+        if hi < len(arrays['open_time']) and arrays['open_time'][hi] == end_time:
+            hi += 1
+        return {column: values[lo:hi] for column, values in arrays.items()}
+
+    def load_frame(self, symbol, interval, start_time, end_time):
+        """
+        load fonksiyonunun sonucunu get_binance_data ile aynı yapıda bir DataFrame olarak döndürür: 'open_time' sütunu
+        pandas datetime tipine çevrilip indeks yapılır. Fiyat ve hacim sütunları doğrudan float tipindedir.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Kline verileri.
+        """
+        df = pd.DataFrame(self.load(symbol, interval, start_time, end_time))
+        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+        df.set_index('open_time', inplace=True)
+        return df
+
+    def load_klines(self, symbol, interval, start_time, end_time):
+        """
+        load fonksiyonunun sonucunu API'nin döndürdüğü satır formatında (liste listesi) döndürür. Kline satırlarıyla
+        çalışan mevcut kodun depoyu değiştirmeden kullanabilmesi içindir.
+
+        Returns
+        -------
+        list
+            Kline satırları. 'ignore' sütunu '0' olarak doldurulur.
+        """
+        arrays = self.load(symbol, interval, start_time, end_time)
+        columns = [arrays[column].tolist() for column in STORE_COLUMNS]
+        return [list(row) + ['0'] for row in zip(*columns)]
@@ -0,0 +1,308 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from async_fetch import fetch_many_async
+from kline_fetch import INTERVAL_MS
+from panel_scoring import SCORE_COLUMNS
+
+STREAM_URL = "wss://stream.binance.com:9443"
+FUTURES_STREAM_URL = "wss://fstream.binance.com"
+
+# Tek bir websocket bağlantısında açılabilecek maksimum akış sayısı.
+MAX_STREAMS = {'spot': 1024, 'futures': 200}
+
+
+def stream_url(market='futures'):
+    """
+    Binance websocket adresini döndürür. CRYANAL_BINANCE_WS_URL ortam değişkeni ayarlıysa (örneğin yerel
+    mock_binance.MockKlineStream) bu adres kullanılır.
+
+    Parameters
+    ----------
+    market : str, optional
+        'spot' ya da 'futures'. Varsayılan değer 'futures'.
+
+    Returns
+    -------
+    str
+        Sonunda '/' olmayan adres.
+    """
+    override = os.environ.get('CRYANAL_BINANCE_WS_URL')
+    if override:
+        return override.rstrip('/')
+    return FUTURES_STREAM_URL if market == 'futures' else STREAM_URL
+
+
+def kline_event_to_row(kline):
+    """Websocket kline olayının 'k' alanını REST API'nin döndürdüğü kline satırı formatına çevirir."""
+    return [kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'], kline['T'], kline['q'], kline['n'],
+            kline['V'], kline['Q'], kline.get('B', '0')]
+
+
+async def _follow(session, url, symbols, interval, handle, catch_up, reconnect_delay, max_reconnect_delay,
+                  counters):
+    # Bir bağlantının akışlarını dinler; bağlantı koparsa artan bekleme süreleriyle yeniden bağlanır.
+    streams = '/'.join(f'{symbol.lower()}@kline_{interval}' for symbol in symbols)
+    delay = reconnect_delay
+    while True:
+        try:
+            async with session.ws_connect(f'{url}/stream?streams={streams}', heartbeat=30) as ws:
+                counters['connections'] += 1
+                delay = reconnect_delay
+                caught_up = False
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    data = json.loads(message.data)
+                    data = data.get('data', data)
+                    kline = data.get('k')
+                    # Kapanmamış mum güncellemeleri atlanır; sadece kapanan mumlar işlenir.
+                    if kline is None or not kline['x']:
+                        continue
+                    if not caught_up:
+                        # Bağlantıdan sonraki ilk kapanış: bu mumdan önce kapanmış, kaçırılan mumlar tamamlanır.
+                        await catch_up(symbols, kline['t'] - 1)
+                        caught_up = True
+                    await handle(data['s'], kline_event_to_row(kline), data['E'])
+        except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError):
+            pass
+        counters['reconnects'] += 1
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_reconnect_delay)
+
+
+async def stream_closed_klines(symbols, interval, on_close, market='futures', url=None, last_open_times=None,
+                               backfill=True, backfill_concurrency=20, stop=None, reconnect_delay=1.0,
+                               max_reconnect_delay=30.0):
+    """
+    Sembollerin kline akışlarını dinler ve kapanan her mum için on_close(symbol, kline, event_time) çağırır. Semboller
+    bağlantı başına en fazla MAX_STREAMS[market] akış olacak şekilde bölünür. Aynı mum iki kez işlenmez. Her bağlantı
+    kurulduğunda (ilk bağlantı ve kopmalardan sonra) akıştan gelen ilk kapanıştan önce kapanmış ve henüz işlenmemiş
+    mumlar bağlantıdaki tüm semboller için REST API'den eşzamanlı çekilip sırayla işlenir (backfill); akışta atlanan bir
+    mum görülürse o sembol için aynı şekilde tamamlanır.
+
+    Parameters
+    ----------
+    symbols : list
+        Semboller. Örneğin: ['BTCUSDT', 'ETHUSDT'].
+
+    interval : str
+        Candlestick intervali. Örneğin: '1m', '1d'.
+
+    on_close : callable
+        on_close(symbol, kline, event_time). kline REST formatında satırdır; event_time olayın milisaniye cinsinden
+        zamanıdır (REST'ten tamamlanan mumlar için None).
+
+    market : str, optional
+        'spot' ya da 'futures'. Varsayılan değer 'futures'.
+
+    url : str, optional
+        Websocket adresi. Verilmezse stream_url(market).
+
+    last_open_times : dict, optional
+        Sembol -> geçmiş verideki son kapanmış mumun açılış zamanı. Verilirse bu mumlar tekrar işlenmez ve geçmişle
+        akışın ilk mumu arasındaki boşluk tamamlanır.
+
+    backfill : bool, optional
+        False ise boşluklar REST API'den tamamlanmaz. Varsayılan değer True.
+
+    backfill_concurrency : int, optional
+        Tamamlama sırasında aynı anda açık olabilecek maksimum REST isteği sayısı. Varsayılan değer 20.
+
+    stop : asyncio.Event, optional
+        Ayarlandığında dinleme sonlanır. Verilmezse süresiz dinlenir.
+
+    reconnect_delay, max_reconnect_delay : float, optional
+        Yeniden bağlanmadan önce beklenen ilk ve en uzun süre (saniye). Varsayılan değerler 1 ve 30.
+
+    Returns
+    -------
+    dict
+        'connections', 'reconnects', 'closed' (işlenen kapanmış mumlar), 'duplicates' ve 'backfilled' sayaçları.
+    """
+    url = url or stream_url(market)
+    step = INTERVAL_MS.get(interval)
+    last = dict(last_open_times or {})
+    stop = stop or asyncio.Event()
+    counters = {'connections': 0, 'reconnects': 0, 'closed': 0, 'duplicates': 0, 'backfilled': 0}
+
+    def apply(missing):
+        for symbol, rows in missing.items():
+            for row in rows:
+                if row[0] > last[symbol]:
+                    on_close(symbol, row, None)
+                    last[symbol] = row[0]
+                    counters['backfilled'] += 1
+
+    async def catch_up(chunk, end):
+        if not backfill or step is None:
+            return
+        known = [symbol for symbol in chunk if symbol in last and last[symbol] + step <= end]
+        if known:
+            start = min(last[symbol] for symbol in known) + step
+            apply(await fetch_many_async(known, interval, start, end, market=market, concurrency=backfill_concurrency))
+
+    async def handle(symbol, kline, event_time):
+        previous = last.get(symbol)
+        if previous is not None and kline[0] <= previous:
+            counters['duplicates'] += 1
+            return
+        if backfill and previous is not None and step is not None and kline[0] > previous + step:
+            apply(await fetch_many_async([symbol], interval, previous + step, kline[0] - 1, market=market))
+        last[symbol] = kline[0]
+        on_close(symbol, kline, event_time)
+        counters['closed'] += 1
+
+    size = MAX_STREAMS[market]
+    async with aiohttp.ClientSession() as session:
+        tasks = [asyncio.ensure_future(_follow(session, url, symbols[i:i + size], interval, handle, catch_up,
+                                               reconnect_delay, max_reconnect_delay, counters))
+                 for i in range(0, len(symbols), size)]
+        stopped = asyncio.ensure_future(stop.wait())
+        try:
+            done, _ = await asyncio.wait([stopped, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            # Dinleyicilerden biri hatayla sonlandıysa (örneğin on_close içinde) hata yukarı iletilir.
+            for task in done:
+                if task is not stopped:
+                    task.result()
+        finally:
+            for task in [stopped, *tasks]:
+                task.cancel()
+            await asyncio.gather(stopped, *tasks, return_exceptions=True)
+    return counters
+
+
+class LiveRanking:
+    """
+    Bellekte tutulan canlı puan tablosu. Kapanan her mumda sadece ilgili sembol yeniden puanlanır; sıralı tablo ilk
+    okunduğunda yeniden kurulur. Mum kapanışından (websocket olay zamanı) puanın güncellenmesine kadar geçen süreler
+    ölçülür.
+
+    Parameters
+    ----------
+    rescore : callable
+        rescore(symbol, kline) -> analyze_and_score formatında sözlük. Örneğin Execution.on_candle_close.
+
+    scores : iterable, optional
+        Başlangıç puanları (analyze_and_score formatında sözlükler).
+    """
+
+    def __init__(self, rescore, scores=()):
+        self.rescore = rescore
+        self.scores = {score['symbol']: score for score in scores}
+        self.version = 0
+        self.latencies = deque(maxlen=10000)
+        self._table = None
+
+    def on_close(self, symbol, kline, event_time=None):
+        """Kapanan mumla sembolü yeniden puanlar. stream_closed_klines için on_close olarak verilebilir."""
+        self.scores[symbol] = self.rescore(symbol, kline)
+        self.version += 1
+        self._table = None
+        if event_time is not None:
+            self.latencies.append(time.time() * 1000 - event_time)
+
+    def table(self, n=None):
+        """
+        Puana göre büyükten küçüğe sıralı tablo. Puanlanamayan semboller 'error' sütunuyla sondadır.
+
+        Parameters
+        ----------
+        n : int, optional
+            Verilirse ilk n satır.
+
+        Returns
+        -------
+        pandas.DataFrame
+            panel_scoring.score_panel ile aynı yapıda tablo.
+        """
+        if self._table is None:
+            table = pd.DataFrame(list(self.scores.values()), columns=['symbol'] + SCORE_COLUMNS).set_index('symbol')
+            self._table = table.sort_values('points', ascending=False, na_position='last', kind='stable')
+        return self._table if n is None else self._table.head(n)
+
+    def latency_stats(self):
+        """
+        Mum kapanışından puan güncellemesine kadar geçen sürelerin özeti (milisaniye).
+
+        Returns
+        -------
+        dict
+            'count', 'mean_ms', 'p50_ms', 'p99_ms' ve 'max_ms'.
+        """
+        if not self.latencies:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        latencies = np.array(self.latencies)
+        return {'count': len(latencies), 'mean_ms': float(latencies.mean()),
+                'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+                'max_ms': float(latencies.max())}
+
+
+def run_live(symbols, interval, ranking, market='futures', duration=None, report=None, report_interval=10.0,
+             **kwargs):
+    """
+    stream_closed_klines fonksiyonunun senkron sarmalayıcısı. Kapanan mumlar ranking.on_close ile işlenir; tablo
+    değiştiyse her `report_interval` saniyede bir report(ranking) çağrılır. Ctrl+C ile durdurulabilir.
+
+    Parameters
+    ----------
+    symbols : list
+        Semboller.
+
+    interval : str
+        Candlestick intervali.
+
+    ranking : LiveRanking
+        Güncellenecek puan tablosu.
+
+    market : str, optional
+        'spot' ya da 'futures'. Varsayılan değer 'futures'.
+
+    duration : float, optional
+        Verilirse bu kadar saniye sonra dinleme sonlanır.
+
+    report : callable, optional
+        report(ranking). Örneğin tablonun ilk 10 satırını yazdırmak için.
+
+    report_interval : float, optional
+        Rapor aralığı (saniye). Varsayılan değer 10.
+
+    **kwargs
+        stream_closed_klines parametreleri (url, last_open_times, backfill, ...).
+
+    Returns
+    -------
+    dict
+        stream_closed_klines sayaçları.
+    """
+    async def main():
+        stop = asyncio.Event()
+        if duration is not None:
+            asyncio.get_running_loop().call_later(duration, stop.set)
+
+        async def reporter():
+            seen = ranking.version
+            while True:
+                await asyncio.sleep(report_interval)
+                if ranking.version != seen:
+                    seen = ranking.version
+                    report(ranking)
+
+        task = asyncio.ensure_future(reporter()) if report is not None else None
+        try:
+            return await stream_closed_klines(symbols, interval, ranking.on_close, market=market, stop=stop, **kwargs)
+        finally:
+            if task is not None:
+                task.cancel()
+
+    try:
+        return asyncio.run(main())
+    except KeyboardInterrupt:
+        return None
@@ -0,0 +1,874 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from aiohttp import web
+
+from async_fetch import MARKETS, kline_weight
+from kline_fetch import INTERVAL_MS
+from kline_store import STORE_COLUMNS
+from synthetic_data import random_walk_arrays
+
+# 2017-01-01 00:00:00 UTC. Sentetik serilerin varsayılan başlangıcı; betiklerdeki tarih aralıklarını kapsar.
+SYNTHETIC_START_TIME = 1483228800000
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Sembol adından karşı varlığı ayırmak için bilinen karşı varlıklar. Uzun olanlar önce denenir.
+QUOTE_ASSETS = ('FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'TRY', 'EUR', 'BTC', 'ETH', 'BNB')
+
+# (piyasa, uç nokta) -> (tüm semboller için ağırlık, tek sembol için ağırlık)
+ENDPOINT_WEIGHTS = {
+    ('spot', 'ping'): (1, 1),
+    ('spot', 'time'): (1, 1),
+    ('spot', 'exchangeInfo'): (20, 20),
+    ('spot', 'ticker/24hr'): (80, 2),
+    ('futures', 'ping'): (1, 1),
+    ('futures', 'time'): (1, 1),
+    ('futures', 'exchangeInfo'): (1, 1),
+    ('futures', 'ticker/24hr'): (40, 1),
+}
+
+PREFIXES = {'/api/v3/': 'spot', '/fapi/v1/': 'futures'}
+
+
+def split_symbol(symbol):
+    """Sembolü (temel varlık, karşı varlık) olarak ayırır. Karşı varlık bilinmiyorsa son 4 harf kabul edilir."""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol[:-4], symbol[-4:]
+
+
+class ReplaySource:
+    """
+    Mock sunucunun yanıtlarını ürettiği veri kaynağı. Veri (sembol, interval) bazında kline_store.STORE_COLUMNS
+    sütunlarından oluşan numpy dizileri olarak tutulur. Kaydedilmiş veri (yerel kline deposu ya da DataFrame'ler)
+    verilebilir; sentetik semboller için istenen interval ilk istendiğinde tohumlu rastgele yürüyüşle üretilir.
+
+    Parameters
+    ----------
+    arrays : dict, optional
+        (sembol, interval) -> sütun adı -> numpy dizisi.
+
+    synthetic_symbols : list, optional
+        Sentetik veri üretilecek semboller. Her sembolün tohumu seed + sıra numarasıdır.
+
+    seed : int, optional
+        Sentetik veri tohumu. Varsayılan değer 0.
+
+    start_time : int, optional
+        Sentetik serilerin milisaniye cinsinden başlangıcı. Varsayılan değer 2017-01-01.
+
+    end_time : int, optional
+        Sentetik serilerin bitişi. Verilmezse seri üretildiği ana kadar uzanır.
+
+    Attributes
+    ----------
+    clock : int or None
+        Tekrar oynatma saati (milisaniye). Ayarlıysa REST yanıtlarında sadece kapanış zamanı bu andan önce olan mumlar
+        görünür; MockKlineStream mumları kapattıkça saati ilerletir. None ise tüm veri görünür.
+    """
+
+    def __init__(self, arrays=None, synthetic_symbols=(), seed=0, start_time=SYNTHETIC_START_TIME, end_time=None):
+        self.data = dict(arrays or {})
+        self.synthetic_symbols = list(synthetic_symbols)
+        self.seed = seed
+        self.start_time = start_time
+        self.end_time = end_time
+        self.clock = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def synthetic(cls, symbols=None, n_symbols=10, quote_asset='USDT', **kwargs):
+        """
+        Sentetik veri kaynağı. symbols verilmezse 'SYN000USDT', 'SYN001USDT', ... şeklinde n_symbols sembol kullanılır.
+        Betiklerdeki sabit coin listeleriyle çalışmak için örneğin symbols=['BTCUSDT', 'ETHUSDT'] verilebilir.
+        """
+        symbols = symbols or [f'SYN{i:03d}{quote_asset}' for i in range(n_symbols)]
+        return cls(synthetic_symbols=[symbol.upper() for symbol in symbols], **kwargs)
+
+    @classmethod
+    def from_store(cls, store, symbols=None, intervals=None):
+        """
+        Yerel kline deposundaki (kline_store.KlineStore) kaydedilmiş veriyi kaynak olarak kullanır. Bölümler
+        memory-map ile açılır.
+        """
+        arrays = {}
+        for symbol in sorted(os.listdir(store.root)) if os.path.isdir(store.root) else []:
+            if symbols is not None and symbol not in symbols:
+                continue
+            for interval in sorted(os.listdir(os.path.join(store.root, symbol))):
+                if intervals is not None and interval not in intervals:
+                    continue
+                partition = store.read_partition(symbol, interval)
+                if len(partition['open_time']):
+                    arrays[(symbol, interval)] = partition
+        return cls(arrays)
+
+    @classmethod
+    def from_frames(cls, frames, interval):
+        """
+        get_binance_data ya da synthetic_data.synthetic_universe yapısındaki DataFrame'leri kaynak olarak kullanır.
+
+        Parameters
+        ----------
+        frames : dict
+            Sembol -> 'open_time' indeksli DataFrame.
+
+        interval : str
+            Verinin intervali.
+        """
+        arrays = {}
+        for symbol, df in frames.items():
+            columns = {'open_time': df.index.asi8 // 10 ** 6}
+            for column, dtype in STORE_COLUMNS.items():
+                if column != 'open_time':
+                    columns[column] = df[column].to_numpy(dtype=dtype)
+            arrays[(symbol, interval)] = columns
+        return cls(arrays)
+
+    def symbols(self):
+        return sorted({symbol for symbol, _ in self.data} | set(self.synthetic_symbols))
+
+    def arrays(self, symbol, interval):
+        """
+        Bir sembolün bir intervaldeki sütunlarını döndürür. Sentetik semboller için ilk istekte üretilir.
+
+        Returns
+        -------
+        dict
+            Sütun adı -> numpy dizisi. Sembol ya da interval yoksa None.
+        """
+        key = (symbol, interval)
+        arrays = self.data.get(key)
+        if arrays is not None or symbol not in self.synthetic_symbols or interval not in INTERVAL_MS:
+            return arrays
+        with self.lock:
+            if key not in self.data:
+                step = INTERVAL_MS[interval]
+                start = self.start_time - self.start_time % step
+                end = self.end_time or int(time.time() * 1000)
+                # Sentetik seri, son mumu bitiş anında kapanacak şekilde tam mumlardan oluşur.
+                n_bars = max(1, (end - start) // step)
+                index = self.synthetic_symbols.index(symbol)
+                self.data[key] = random_walk_arrays(n_bars, seed=self.seed + index, interval=interval,
+                                                    start_time=start, start_price=10.0 + 10.0 * index)
+            return self.data[key]
+
+    def visible(self, arrays):
+        """Saate göre kapanmış (görünür) mum sayısı."""
+        if self.clock is None:
+            return len(arrays['open_time'])
+        return int(np.searchsorted(arrays['close_time'], self.clock, side='left'))
+
+    def klines(self, symbol, interval, start_time=None, end_time=None, limit=500):
+        """
+        Binance /klines uç noktasının seçim kuralları: startTime verilirse bu zamandan itibaren ilk `limit` mum, sadece
+        endTime verilirse bu zamana kadarki son `limit` mum, hiçbiri verilmezse son `limit` mum döner.
+
+        Returns
+        -------
+        list
+            API formatında kline satırları. Sembol ya da interval yoksa None.
+        """
+        arrays = self.arrays(symbol, interval)
+        if arrays is None:
+            return None
+        open_time = arrays['open_time']
+        lo = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side='left'))
+        hi = len(open_time) if end_time is None else int(np.searchsorted(open_time, end_time, side='right'))
+        hi = min(hi, self.visible(arrays))
+        if start_time is None:
+            lo = max(lo, hi - limit)
+        else:
+            hi = min(hi, lo + limit)
+        if hi <= lo:
+            return []
+
+        columns = []
+        for column, dtype in STORE_COLUMNS.items():
+            values = arrays[column][lo:hi].tolist()
+            columns.append(values if dtype == np.int64 else [f'{value:.8f}' for value in values])
+        return [list(row) + ['0'] for row in zip(*columns)]
+
+    def _ticker_arrays(self, symbol):
+        # 24 saatlik özet için bir günü aşmayan en büyük interval kullanılır; sentetik semboller için günlük veri.
+        if symbol in self.synthetic_symbols:
+            return self.arrays(symbol, '1d')
+        intervals = [interval for s, interval in self.data if s == symbol and INTERVAL_MS.get(interval, 0) <= DAY_MS]
+        if not intervals:
+            return None
+        return self.data[(symbol, max(intervals, key=INTERVAL_MS.get))]
+
+    def ticker(self, symbol):
+        """Sembolün son 24 saatlik ticker özeti. Veri yoksa None."""
+        arrays = self._ticker_arrays(symbol)
+        if arrays is not None and self.clock is not None:
+            n = self.visible(arrays)
+            arrays = {column: values[:n] for column, values in arrays.items()}
+        if arrays is None or not len(arrays['open_time']):
+            return None
+        close_time = int(arrays['close_time'][-1])
+        lo = int(np.searchsorted(arrays['open_time'], close_time + 1 - DAY_MS, side='left'))
+        lo = min(lo, len(arrays['open_time']) - 1)
+        open_price = float(arrays['open'][lo])
+        last_price = float(arrays['close'][-1])
+        return {
+            'symbol': symbol,
+            'priceChange': f'{last_price - open_price:.8f}',
+            'priceChangePercent': f'{(last_price / open_price - 1) * 100:.3f}',
+            'openPrice': f'{open_price:.8f}',
+            'lastPrice': f'{last_price:.8f}',
+            'highPrice': f'{float(np.max(arrays["high"][lo:])):.8f}',
+            'lowPrice': f'{float(np.min(arrays["low"][lo:])):.8f}',
+            'volume': f'{float(np.sum(arrays["volume"][lo:])):.8f}',
+            'quoteVolume': f'{float(np.sum(arrays["quote_asset_volume"][lo:])):.8f}',
+            'openTime': int(arrays['open_time'][lo]),
+            'closeTime': close_time,
+            'count': int(np.sum(arrays['number_of_trades'][lo:])),
+        }
+
+    def listing_time(self, symbol):
+        """Sembolün ilk mumunun açılış zamanı (listelenme zamanı olarak kullanılır)."""
+        times = [int(arrays['open_time'][0]) for (s, _), arrays in self.data.items()
+                 if s == symbol and len(arrays['open_time'])]
+        if symbol in self.synthetic_symbols:
+            times.append(self.start_time)
+        return min(times) if times else None
+
+
+class MockBinanceServer:
+    """
+    Binance REST API'nin kline, 24 saatlik ticker ve exchange info uç noktalarını (spot /api/v3 ve USDT-M vadeli /fapi/v1)
+    yerel olarak sunan test sunucusu. İstek ağırlıkları Binance'teki gibi hesaplanır ve X-MBX-USED-WEIGHT-1M başlığında
+    döner; pencere başına ağırlık sınırı aşılırsa Retry-After başlığıyla 429 yanıtı verilir. Yapay gecikme ve rastgele
+    sunucu hataları eklenebilir. Her istek ayrı bir iş parçacığında işlenir, böylece eşzamanlı indiriciler gerçekçi
+    şekilde ölçülebilir.
+
+    Parameters
+    ----------
+    source : ReplaySource
+        Veri kaynağı.
+
+    host : str, optional
+        Dinlenecek adres. Varsayılan değer '127.0.0.1'.
+
+    port : int, optional
+        Dinlenecek port. 0 ise boş bir port seçilir. Varsayılan değer 0.
+
+    latency : float, optional
+        Her yanıta eklenecek saniye cinsinden gecikme. Varsayılan değer 0.
+
+    jitter : float, optional
+        Gecikmeye eklenecek [0, jitter] aralığında rastgele süre. Varsayılan değer 0.
+
+    weight_limits : dict, optional
+        Piyasa -> pencere başına ağırlık sınırı. Verilmezse Binance sınırları (spot 6000, vadeli 2400) kullanılır.
+
+    window : float, optional
+        Ağırlık penceresinin saniye cinsinden uzunluğu. Binance'te 60; geri çekilme davranışını hızlı test etmek için
+        küçültülebilir. Varsayılan değer 60.
+
+    error_rate : float, optional
+        İsteklerin bu oranına 503 (sunucu hatası) yanıtı verilir. Varsayılan değer 0.
+
+    seed : int, optional
+        Gecikme ve hata üretimi için tohum.
+    """
+
+    def __init__(self, source, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, weight_limits=None, window=60,
+                 error_rate=0.0, seed=None):
+        self.source = source
+        self.latency = latency
+        self.jitter = jitter
+        self.weight_limits = {market: budget for market, (_, _, budget) in MARKETS.items()}
+        self.weight_limits.update(weight_limits or {})
+        self.window = window
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.used = {market: 0 for market in MARKETS}
+        self.window_id = None
+        self.in_flight = 0
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Sunucuyu arka planda bir iş parçacığında başlatır."""
+        # Kısa yoklama aralığı: stop() sunucuyu beklemeden kapatır.
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def reset_stats(self):
+        with self.lock:
+            self.counters = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'weight': 0, 'rows': 0,
+                             'max_in_flight': 0, 'paths': {}}
+
+    def stats(self):
+        """
+        İstek sayaçları.
+
+        Returns
+        -------
+        dict
+            'requests', 'rate_limited' (429), 'errors' (enjekte edilen 503), 'weight' (toplam ağırlık), 'rows' (dönen
+            kline satırları), 'max_in_flight' (aynı anda işlenen en fazla istek) ve 'paths' (yol -> istek sayısı).
+        """
+        with self.lock:
+            return {**self.counters, 'paths': dict(self.counters['paths'])}
+
+    def admit(self, market, path, weight):
+        """
+        İsteği ağırlık penceresine kaydeder.
+
+        Returns
+        -------
+        int
+            Bu penceredeki kullanılan ağırlık.
+        float
+            İstek reddedildiyse Retry-After süresi, kabul edildiyse None.
+        """
+        with self.lock:
+            now = time.time()
+            window_id = int(now // self.window)
+            if window_id != self.window_id:
+                self.window_id = window_id
+                self.used = {key: 0 for key in self.used}
+            self.counters['requests'] += 1
+            self.counters['paths'][path] = self.counters['paths'].get(path, 0) + 1
+            if self.used[market] + weight > self.weight_limits[market]:
+                self.counters['rate_limited'] += 1
+                return self.used[market], max(1, math.ceil((window_id + 1) * self.window - now))
+            self.used[market] += weight
+            self.counters['weight'] += weight
+            return self.used[market], None
+
+    def delay(self):
+        with self.lock:
+            fail = self.error_rate > 0 and self.random.random() < self.error_rate
+            seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+        return fail
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.counters['max_in_flight'] = max(self.counters['max_in_flight'], self.in_flight)
+
+    def leave(self, rows=0, error=False):
+        with self.lock:
+            self.in_flight -= 1
+            self.counters['rows'] += rows
+            self.counters['errors'] += error
+
+    def exchange_info(self, market):
+        symbols = []
+        for symbol in self.source.symbols():
+            base, quote = split_symbol(symbol)
+            info = {'symbol': symbol, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote}
+            if market == 'futures':
+                info.update({'pair': symbol, 'contractType': 'PERPETUAL', 'marginAsset': quote,
+                             'onboardDate': self.source.listing_time(symbol)})
+            symbols.append(info)
+        return {
+            'timezone': 'UTC',
+            'serverTime': int(time.time() * 1000),
+            'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1,
+                            'limit': self.weight_limits[market]}],
+            'symbols': symbols,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Bağlantıların tekrar kullanılabilmesi için (aiohttp ve requests.Session havuzları) HTTP/1.1.
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        # İstemcinin kapattığı bağlantılar (örneğin hata yanıtından sonra) olağandır; traceback yazdırılmaz.
+        try:
+            super().handle()
+        except ConnectionError:
+            pass
+
+    def _send(self, status, body, used=None, retry_after=None):
+        payload = json.dumps(body, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if used is not None:
+            self.send_header('X-MBX-USED-WEIGHT-1M', str(used))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        mock = self.server.mock
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        market = next((m for prefix, m in PREFIXES.items() if parts.path.startswith(prefix)), None)
+        if market is None:
+            self._send(404, {'code': -1, 'msg': 'Not found.'})
+            return
+        endpoint = parts.path.split('/', 3)[3]
+        symbol = query.get('symbol', '').upper()
+
+        if endpoint == 'klines':
+            _, max_limit, _ = MARKETS[market]
+            limit = min(int(query.get('limit', 500)), max_limit)
+            weight = kline_weight(market, limit)
+        elif (market, endpoint) in ENDPOINT_WEIGHTS:
+            weight = ENDPOINT_WEIGHTS[(market, endpoint)][1 if symbol else 0]
+        else:
+            self._send(404, {'code': -1, 'msg': 'Not found.'})
+            return
+
+        used, retry_after = mock.admit(market, parts.path, weight)
+        if retry_after is not None:
+            self._send(429, {'code': -1003, 'msg': 'Too many requests; current limit is '
+                                                   f'{mock.weight_limits[market]} request weight per minute.'},
+                       used=used, retry_after=retry_after)
+            return
+
+        mock.enter()
+        rows, error = 0, False
+        try:
+            if mock.delay():
+                error = True
+                self._send(503, {'code': -1001, 'msg': 'Internal error; unable to process your request. '
+                                                       'Please try again.'}, used=used)
+                return
+            if endpoint == 'ping':
+                self._send(200, {}, used=used)
+            elif endpoint == 'time':
+                self._send(200, {'serverTime': int(time.time() * 1000)}, used=used)
+            elif endpoint == 'exchangeInfo':
+                self._send(200, mock.exchange_info(market), used=used)
+            elif endpoint == 'ticker/24hr':
+                if symbol:
+                    ticker = mock.source.ticker(symbol)
+                    if ticker is None:
+                        self._send(400, {'code': -1121, 'msg': 'Invalid symbol.'}, used=used)
+                    else:
+                        self._send(200, ticker, used=used)
+                else:
+                    tickers = [mock.source.ticker(s) for s in mock.source.symbols()]
+                    self._send(200, [ticker for ticker in tickers if ticker is not None], used=used)
+            else:
+                interval = query.get('interval')
+                if not symbol:
+                    self._send(400, {'code': -1102, 'msg': "Mandatory parameter 'symbol' was not sent."}, used=used)
+                    return
+                if interval not in INTERVAL_MS:
+                    self._send(400, {'code': -1120, 'msg': 'Invalid interval.'}, used=used)
+                    return
+                start_time = int(query['startTime']) if 'startTime' in query else None
+                end_time = int(query['endTime']) if 'endTime' in query else None
+                klines = mock.source.klines(symbol, interval, start_time, end_time, limit)
+                if klines is None:
+                    self._send(400, {'code': -1121, 'msg': 'Invalid symbol.'}, used=used)
+                    return
+                rows = len(klines)
+                self._send(200, klines, used=used)
+        finally:
+            mock.leave(rows, error)
+
+
+class MockKlineStream:
+    """
+    Binance kline websocket akışının yerel karşılığı. Kaynaktaki kaydedilmiş mumları sırayla tekrar oynatır: her adımda
+    abone olunan semboller için sıradaki mum önce `partials` kez kapanmamış (x=false), sonra kapanmış (x=true) olarak
+    gönderilir ve kaynağın saati (ReplaySource.clock) mumun kapanışına ilerletilir. Böylece aynı kaynağı kullanan
+    MockBinanceServer da sadece kapanmış mumları döndürür. Binance'teki gibi birleşik akış
+    (/stream?streams=<sembol>@kline_<interval>/...) ve ham akış (/ws/<sembol>@kline_<interval>) yolları desteklenir.
+    Sunucu kendi olay döngüsüyle arka planda bir iş parçacığında çalışır.
+
+    Parameters
+    ----------
+    source : ReplaySource
+        Veri kaynağı.
+
+    interval : str
+        Tekrar oynatılacak mumların intervali. Örneğin: '1m', '1d'.
+
+    start_time : int, optional
+        Tekrar oynatılacak ilk mumun açılış zamanı (milisaniye). Verilmezse kaynağın ilk sembolünün son `replay` mumu
+        oynatılır.
+
+    replay : int, optional
+        start_time verilmediğinde oynatılacak mum sayısı. Varsayılan değer 100.
+
+    step : float, optional
+        Mum kapanışları arasındaki saniye. İlk adım ilk bağlantı geldiğinde başlar. None ise mumlar sadece advance()
+        çağrıldığında kapanır. Varsayılan değer 1.0.
+
+    partials : int, optional
+        Her mum kapanmadan önce gönderilecek kapanmamış güncelleme sayısı. Varsayılan değer 1.
+
+    host : str, optional
+        Dinlenecek adres. Varsayılan değer '127.0.0.1'.
+
+    port : int, optional
+        Dinlenecek port. 0 ise boş bir port seçilir. Varsayılan değer 0.
+    """
+
+    def __init__(self, source, interval, start_time=None, replay=100, step=1.0, partials=1, host='127.0.0.1',
+                 port=0):
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Desteklenmeyen interval: {interval}")
+        self.source = source
+        self.interval = interval
+        if start_time is None:
+            open_time = source.arrays(source.symbols()[0], interval)['open_time']
+            start_time = int(open_time[max(0, len(open_time) - replay)])
+        self.cursor = start_time
+        # Tekrar oynatma başlamadan önce kapanışı start_time'dan önce olan mumlar görünür.
+        source.clock = start_time
+        self.step = step
+        self.partials = partials
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.counters = {'connections': 0, 'messages': 0, 'closed': 0, 'dropped': 0}
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port))
+        self.loop = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.socket.getsockname()[:2]
+        return f'ws://{host}:{port}'
+
+    def start(self):
+        """Sunucuyu arka planda bir iş parçacığında başlatır."""
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        app.router.add_get('/ws/{streams:.+}', self._handle)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        self.loop.run_until_complete(web.SockSite(self.runner, self.socket).start())
+        self.connected = asyncio.Event()
+        self.ticker = self.loop.create_task(self._tick()) if self.step is not None else None
+        ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def _shutdown(self):
+        if self.ticker is not None:
+            self.ticker.cancel()
+        await self._close_all()
+        await self.runner.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def stats(self):
+        """
+        Akış sayaçları.
+
+        Returns
+        -------
+        dict
+            'connections' (kabul edilen bağlantılar), 'open' (açık bağlantılar), 'messages' (gönderilen mesajlar),
+            'closed' (kapanmış mum olayları), 'dropped' (drop() ile kesilen bağlantılar) ve 'cursor' (sıradaki mumun
+            açılış zamanı).
+        """
+        with self.lock:
+            return {**self.counters, 'open': len(self.subscribers), 'cursor': self.cursor}
+
+    def advance(self):
+        """
+        Sıradaki mumu abonelere gönderir (step=None iken elle ilerletmek için).
+
+        Returns
+        -------
+        bool
+            Oynatılacak mum kalmadıysa False.
+        """
+        return asyncio.run_coroutine_threadsafe(self._advance(), self.loop).result()
+
+    def drop(self):
+        """Açık bağlantıların hepsini keser; istemcinin yeniden bağlanma davranışını test etmek için."""
+        asyncio.run_coroutine_threadsafe(self._close_all(dropped=True), self.loop).result()
+
+    async def _close_all(self, dropped=False):
+        connections = list(self.subscribers)
+        for ws in connections:
+            await ws.close()
+        if dropped:
+            with self.lock:
+                self.counters['dropped'] += len(connections)
+
+    async def _handle(self, request):
+        combined = 'streams' not in request.match_info
+        names = (request.query.get('streams', '') if combined else request.match_info['streams']).split('/')
+        symbols = []
+        for name in names:
+            symbol, _, stream = name.partition('@')
+            if stream == f'kline_{self.interval}' and self.source.arrays(symbol.upper(), self.interval) is not None:
+                symbols.append(symbol.upper())
+        if not symbols:
+            raise web.HTTPBadRequest(text=f'Sadece <sembol>@kline_{self.interval} akışları desteklenir.')
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.subscribers[ws] = (symbols, combined)
+        with self.lock:
+            self.counters['connections'] += 1
+        self.connected.set()
+        try:
+            # İstemci mesajları (SUBSCRIBE vb.) yok sayılır; bağlantı kapanana kadar beklenir.
+            async for _ in ws:
+                pass
+        finally:
+            self.subscribers.pop(ws, None)
+        return ws
+
+    async def _tick(self):
+        await self.connected.wait()
+        while await self._advance():
+            await asyncio.sleep(self.step)
+
+    def _event(self, symbol, arrays, row, closed, fraction, event_time):
+        open_price = float(arrays['open'][row])
+        close = open_price + (float(arrays['close'][row]) - open_price) * fraction
+        high = float(arrays['high'][row]) if closed else max(open_price, close)
+        low = float(arrays['low'][row]) if closed else min(open_price, close)
+        return {
+            'e': 'kline', 'E': event_time, 's': symbol,
+            'k': {
+                't': int(arrays['open_time'][row]), 'T': int(arrays['close_time'][row]), 's': symbol,
+                'i': self.interval, 'o': f'{open_price:.8f}', 'c': f'{close:.8f}', 'h': f'{high:.8f}',
+                'l': f'{low:.8f}', 'v': f'{float(arrays["volume"][row]) * fraction:.8f}',
+                'n': int(int(arrays['number_of_trades'][row]) * fraction), 'x': closed,
+                'q': f'{float(arrays["quote_asset_volume"][row]) * fraction:.8f}',
+                'V': f'{float(arrays["taker_buy_base_asset_volume"][row]) * fraction:.8f}',
+                'Q': f'{float(arrays["taker_buy_quote_asset_volume"][row]) * fraction:.8f}', 'B': '0',
+            },
+        }
+
+    async def _send(self, events):
+        for ws, (symbols, combined) in list(self.subscribers.items()):
+            for symbol in symbols:
+                if symbol not in events or ws.closed:
+                    continue
+                data = events[symbol]
+                payload = {'stream': f'{symbol.lower()}@kline_{self.interval}', 'data': data} if combined else data
+                try:
+                    await ws.send_str(json.dumps(payload, separators=(',', ':')))
+                except ConnectionError:
+                    break
+                with self.lock:
+                    self.counters['messages'] += 1
+
+    async def _advance(self):
+        # Bağlı istemci olmasa da saat ilerler (istemci tarafında boşluk oluşur); oynatma kaynağın tüm sembollerinin
+        # mumları bitince sona erer.
+        subscribed = {symbol for symbols, _ in self.subscribers.values() for symbol in symbols}
+        rows, remaining = {}, False
+        for symbol in self.source.symbols():
+            arrays = self.source.arrays(symbol, self.interval)
+            if arrays is None:
+                continue
+            row = int(np.searchsorted(arrays['open_time'], self.cursor, side='left'))
+            remaining |= row < len(arrays['open_time'])
+            if symbol in subscribed and row < len(arrays['open_time']) and arrays['open_time'][row] == self.cursor:
+                rows[symbol] = (arrays, row)
+        if not remaining:
+            return False
+
+        for i in range(1, self.partials + 1):
+            event_time = int(time.time() * 1000)
+            fraction = i / (self.partials + 1)
+            await self._send({symbol: self._event(symbol, arrays, row, False, fraction, event_time)
+                              for symbol, (arrays, row) in rows.items()})
+
+        # Mum kapanır: saat ilerletilir, REST tarafı da kapanan mumu döndürmeye başlar.
+        self.cursor += INTERVAL_MS[self.interval]
+        self.source.clock = self.cursor
+        event_time = int(time.time() * 1000)
+        await self._send({symbol: self._event(symbol, arrays, row, True, 1.0, event_time)
+                          for symbol, (arrays, row) in rows.items()})
+        with self.lock:
+            self.counters['closed'] += len(rows)
+        return True
+
+
+@contextmanager
+def _environ(name, value):
+    previous = os.environ.get(name)
+    os.environ[name] = value
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = previous
+
+
+@contextmanager
+def serve(source=None, **kwargs):
+    """
+    Sunucuyu başlatır ve with bloğu boyunca CRYANAL_BINANCE_URL ortam değişkenini sunucunun adresine ayarlar. Böylece
+    kline_fetch, async_fetch, get_binance_data fonksiyonları ve configure_client ile oluşturulan python-binance
+    istemcileri (ve bu sırada başlatılan joblib işçileri) yerel sunucuya istek atar.
+
+        with mock_binance.serve(ReplaySource.synthetic(['BTCUSDT', 'ETHUSDT']), latency=0.02) as server:
+            candles = fetch_many(['BTCUSDT', 'ETHUSDT'], '1d', start_time, end_time)
+            print(server.stats())
+
+    Parameters
+    ----------
+    source : ReplaySource, optional
+        Veri kaynağı. Verilmezse 10 sentetik sembol kullanılır.
+
+    **kwargs
+        MockBinanceServer parametreleri.
+    """
+    server = MockBinanceServer(source or ReplaySource.synthetic(), **kwargs)
+    with server, _environ('CRYANAL_BINANCE_URL', server.url):
+        yield server
+
+
+@contextmanager
+def serve_stream(source, interval, **kwargs):
+    """
+    MockKlineStream'i başlatır ve with bloğu boyunca CRYANAL_BINANCE_WS_URL ortam değişkenini akışın adresine ayarlar;
+    kline_stream bu adrese bağlanır. Aynı kaynakla serve() birlikte kullanıldığında REST geçmişi ve akış aynı saati
+    paylaşır.
+
+        source = ReplaySource.synthetic(n_symbols=200)
+        with serve(source), serve_stream(source, '1m', step=0.5) as stream:
+            ...
+
+    Parameters
+    ----------
+    source : ReplaySource
+        Veri kaynağı.
+
+    interval : str
+        Akışın intervali.
+
+    **kwargs
+        MockKlineStream parametreleri.
+    """
+    stream = MockKlineStream(source, interval, **kwargs)
+    with stream, _environ('CRYANAL_BINANCE_WS_URL', stream.url):
+        yield stream
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaydedilmiş ya da sentetik veriyle yerel Binance REST sunucusu.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--store', help="Kaydedilmiş veri için yerel kline deposu klasörü (örneğin 'klines').")
+    parser.add_argument('--symbols', nargs='+', help="Sentetik semboller. Örneğin: BTCUSDT ETHUSDT.")
+    parser.add_argument('--n-symbols', type=int, default=50, help="--symbols verilmezse sentetik sembol sayısı.")
+    parser.add_argument('--seed', type=int, default=0, help="Sentetik veri tohumu.")
+    parser.add_argument('--start-date', default='2017-01-01', help="Sentetik serilerin başlangıç tarihi (UTC).")
+    parser.add_argument('--latency', type=float, default=0.0, help="Saniye cinsinden yanıt gecikmesi.")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Gecikmeye eklenecek rastgele süre üst sınırı.")
+    parser.add_argument('--spot-weight-limit', type=int, help="Spot için pencere başına ağırlık sınırı.")
+    parser.add_argument('--futures-weight-limit', type=int, help="Vadeli için pencere başına ağırlık sınırı.")
+    parser.add_argument('--window', type=float, default=60, help="Ağırlık penceresinin saniye cinsinden uzunluğu.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 yanıtı verilecek istek oranı.")
+    parser.add_argument('--stream-interval', help="Verilirse bu intervalde kline websocket akışı da başlatılır.")
+    parser.add_argument('--stream-port', type=int, default=8081, help="Websocket akışının portu.")
+    parser.add_argument('--stream-step', type=float, default=1.0, help="Akışta mum kapanışları arası saniye.")
+    parser.add_argument('--replay', type=int, default=100, help="Akışta tekrar oynatılacak son mum sayısı.")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        from kline_store import KlineStore
+        source = ReplaySource.from_store(KlineStore(args.store, offline=True))
+    else:
+        start = datetime.strptime(args.start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        source = ReplaySource.synthetic(args.symbols, n_symbols=args.n_symbols, seed=args.seed,
+                                        start_time=int(start.timestamp() * 1000))
+    weight_limits = {}
+    if args.spot_weight_limit:
+        weight_limits['spot'] = args.spot_weight_limit
+    if args.futures_weight_limit:
+        weight_limits['futures'] = args.futures_weight_limit
+
+    server = MockBinanceServer(source, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                               weight_limits=weight_limits, window=args.window, error_rate=args.error_rate,
+                               seed=args.seed)
+    print(f"{len(source.symbols())} sembol ile {server.url} adresinde dinleniyor.")
+    print(f"Betikleri yönlendirmek için: export CRYANAL_BINANCE_URL={server.url}")
+    stream = None
+    if args.stream_interval:
+        stream = MockKlineStream(source, args.stream_interval, replay=args.replay, step=args.stream_step,
+                                 host=args.host, port=args.stream_port).start()
+        print(f"Kline akışı {stream.url} adresinde: export CRYANAL_BINANCE_WS_URL={stream.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats(), indent=2))
+        if stream is not None:
+            stream.stop()
+            print(json.dumps(stream.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
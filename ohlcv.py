@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from kline_store import STORE_COLUMNS
+
+
+def parse_klines(klines, float_dtype=np.float64, columns=None):
+    """
+    API formatındaki kline satırlarını tek geçişte tipli sütunlara çevirir. Zamanlar ve işlem sayısı int64, fiyat ve
+    hacimler float_dtype tipinde olur; kullanılmayan 'ignore' sütunu atılır.
+
+    Parameters
+    ----------
+    klines : list
+        Binance API'nin döndürdüğü kline satırları (ya da aynı yapıda bir liste).
+
+    float_dtype : numpy.dtype, optional
+        Fiyat ve hacim sütunlarının tipi. np.float32 mum başına belleği yarıya indirir; TA-Lib float64 beklediği için
+        indikatörler hesaplanırken sütun dönüştürülür. Varsayılan değer np.float64.
+
+    columns : list, optional
+        Ayrıştırılacak sütunlar. Verilmezse kline_store.STORE_COLUMNS içindeki tüm sütunlar.
+
+    Returns
+    -------
+    dict
+        Sütun adı -> numpy dizisi.
+    """
+    names = list(STORE_COLUMNS)
+    columns = names if columns is None else list(columns)
+    if not len(klines):
+        return {column: np.empty(0, dtype=STORE_COLUMNS[column] if STORE_COLUMNS[column] == np.int64 else float_dtype)
+                for column in columns}
+
+    table = np.array(klines, dtype=object)
+    arrays = {}
+    for column in columns:
+        dtype = np.int64 if STORE_COLUMNS[column] == np.int64 else float_dtype
+        arrays[column] = table[:, names.index(column)].astype(dtype)
+    return arrays
+
+
+class OHLCV:
+    """
+    Tipli sütunlardan (numpy dizileri) oluşan kline kabı. API yanıtı get_binance_data, Execution ve
+    binance_historical_data içinde bir kez ayrıştırılır; sonrasında fiyat sütunları için tekrar tekrar `.astype(float)`
+    çağrılmaz. Mum başına bellek string sütunlu DataFrame'e göre (~630 bayt) float64 ile 88, float32 ile 56 bayta iner.
+
+    Sütunlar kline_store.STORE_COLUMNS adlarını taşır; yerel depo (KlineStore.load), paylaşılan veri
+    (SharedOHLCV.attach) ve sentetik veri (random_walk_arrays) aynı sözlük yapısını döndürdüğü için doğrudan
+    sarmalanabilir.
+
+    Parameters
+    ----------
+    arrays : dict
+        Sütun adı -> numpy dizisi. 'open_time' sütunu bulunmalıdır.
+    """
+
+    __slots__ = ('arrays',)
+
+    def __init__(self, arrays):
+        self.arrays = dict(arrays)
+
+    @classmethod
+    def from_klines(cls, klines, float_dtype=np.float64, columns=None):
+        """API formatındaki kline satırlarından oluşturur. Parametreler parse_klines ile aynıdır."""
+        if columns is not None and 'open_time' not in columns:
+            columns = ['open_time'] + list(columns)
+        return cls(parse_klines(klines, float_dtype=float_dtype, columns=columns))
+
+    @classmethod
+    def from_frame(cls, df, float_dtype=np.float64):
+        """'open_time' indeksli bir DataFrame'den (get_binance_data yapısı) oluşturur."""
+        arrays = {'open_time': df.index.to_numpy(dtype='datetime64[ms]').astype(np.int64)}
+        for column, dtype in STORE_COLUMNS.items():
+            if column != 'open_time' and column in df.columns:
+                arrays[column] = df[column].to_numpy(dtype=np.int64 if dtype == np.int64 else float_dtype)
+        return cls(arrays)
+
+    def __len__(self):
+        return len(self.arrays['open_time'])
+
+    def __getitem__(self, column):
+        return self.arrays[column]
+
+    def __contains__(self, column):
+        return column in self.arrays
+
+    @property
+    def columns(self):
+        return list(self.arrays)
+
+    @property
+    def nbytes(self):
+        """Sütunların toplam bayt cinsinden boyutu."""
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def slice(self, start=None, stop=None):
+        """Satır aralığını kopyalamadan (görünüm olarak) döndürür."""
+        return OHLCV({column: values[start:stop] for column, values in self.arrays.items()})
+
+    def between(self, start_time, end_time):
+        """Açılış zamanı [start_time, end_time] aralığındaki mumları kopyalamadan döndürür."""
+        lo, hi = np.searchsorted(self.arrays['open_time'], [start_time, end_time], side='left')
+        if hi < len(self) and self.arrays['open_time'][hi] == end_time:
+            hi += 1
+        return self.slice(lo, hi)
+
+    def astype(self, float_dtype):
+        """Float sütunları verilen tipe çevrilmiş yeni bir kap döndürür. Tamsayı sütunlar paylaşılır."""
+        return OHLCV({column: values if values.dtype == np.int64 else values.astype(float_dtype)
+                      for column, values in self.arrays.items()})
+
+    def to_frame(self, columns=None, index=True):
+        """
+        get_binance_data ile aynı yapıda DataFrame döndürür: 'open_time' pandas datetime tipine çevrilip indeks yapılır.
+        Sütunlar dizilerin üzerine kopyalanmadan kurulur.
+
+        Parameters
+        ----------
+        columns : list, optional
+            DataFrame'e alınacak sütunlar. Verilmezse tüm sütunlar.
+
+        index : bool, optional
+            False ise 'open_time' milisaniye cinsinden int64 bir sütun olarak kalır. Varsayılan değer True.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Kline verileri.
+        """
+        columns = [column for column in (columns or self.arrays) if column != 'open_time']
+        data = {column: self.arrays[column] for column in columns}
+        if not index:
+            return pd.DataFrame({'open_time': self.arrays['open_time'], **data}, copy=False)
+        time_index = pd.to_datetime(self.arrays['open_time'], unit='ms')
+        time_index.name = 'open_time'
+        return pd.DataFrame(data, index=time_index, copy=False)
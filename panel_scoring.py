@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+import profiling
+from ohlcv import OHLCV
+
+FIB_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+
+# Puan tablosunun sütunları (indeks 'symbol').
+SCORE_COLUMNS = ['date', 'price', 'fib_points', 'ema_sma_points', 'pdx_points', 'points', 'error']
+
+
+def stack(candles, columns=('high', 'low', 'close')):
+    """
+    Sembollerin mumlarını (sembol × zaman) boyutlu dizilere dizer. Her sembolün serisi sağa (son muma) hizalanır,
+    eksik baş kısım NaN ile doldurulur. Aynı bitiş zamanıyla çekilen bir evrende bu, zamana göre hizalamayla aynıdır;
+    her sembolün indikatörleri kendi satırları üzerinden hesaplandığı için sonuçlar sembol sembol hesaplamayla aynı olur.
+
+    Parameters
+    ----------
+    candles : dict
+        Sembol -> zamana göre sıralı DataFrame ya da ohlcv.OHLCV. OHLCV kapları sütunları doğrudan numpy dizisi olarak
+        verdiği için dizme işlemi DataFrame'lere göre belirgin şekilde hızlıdır.
+
+    columns : tuple, optional
+        Dizilecek sütunlar. Varsayılan değer ('high', 'low', 'close').
+
+    Returns
+    -------
+    list
+        Semboller (satır sırası).
+    dict
+        Sütun adı -> (sembol × zaman) float64 dizisi.
+    numpy.ndarray
+        Her sembolün mum sayısı.
+    """
+    symbols = list(candles)
+    lengths = np.array([len(candles[symbol]) for symbol in symbols], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    panel = {column: np.full((len(symbols), width), np.nan) for column in columns}
+    for row, symbol in enumerate(symbols):
+        data = candles[symbol]
+        for column in columns:
+            panel[column][row, width - len(data):] = np.asarray(data[column], dtype=np.float64)
+    return symbols, panel, lengths
+
+
+def _last_time(data):
+    # OHLCV kabında zaman milisaniye cinsinden 'open_time' sütunudur; DataFrame'de indekstir.
+    if isinstance(data, OHLCV):
+        return np.datetime64(int(data['open_time'][-1]), 'ms')
+    return data.index.to_numpy()[-1]
+
+
+def ema(values, lengths, period):
+    """
+    (sembol × zaman) dizisinin her satırı için talib.EMA ile aynı sonucu veren üstel hareketli ortalama. Her satırın ilk
+    değeri kendi ilk `period` değerinin basit ortalamasıdır; zaman ekseni üzerinde tek döngüde tüm semboller birlikte
+    güncellenir.
+
+    Returns
+    -------
+    numpy.ndarray
+        values ile aynı boyutlu dizi. Değer olmayan yerler NaN.
+    """
+    n_symbols, width = values.shape
+    start = width - lengths
+    rows = np.flatnonzero(lengths >= period)
+    # TA-Lib ilk değeri sırayla toplayıp böler; toplama sırası korunur.
+    seed = np.zeros(len(rows))
+    for j in range(period):
+        seed += values[rows, start[rows] + j]
+    seed_at = np.full(n_symbols, -1)
+    seed_at[rows] = start[rows] + period - 1
+    seed_values = np.full(n_symbols, np.nan)
+    seed_values[rows] = seed / period
+
+    # Döngü zaman üzerinde olduğu için (zaman × sembol) düzeninde çalışılır; her adımda bitişik bir satır okunur.
+    columns = np.ascontiguousarray(values.T)
+    out = np.empty((width, n_symbols))
+    k = 2.0 / (period + 1)
+    prev = np.full(n_symbols, np.nan)
+    for t in range(width):
+        prev = np.where(seed_at == t, seed_values, ((columns[t] - prev) * k) + prev)
+        out[t] = prev
+    return out.T
+
+
+def directional_indicators(high, low, close, lengths, period=14):
+    """
+    (sembol × zaman) dizilerinin her satırı için talib.PLUS_DI ve talib.MINUS_DI ile aynı sonucu veren Wilder yumuşatmalı
+    yön göstergeleri.
+
+    Returns
+    -------
+    numpy.ndarray
+        PLUS_DI, high ile aynı boyutlu.
+    numpy.ndarray
+        MINUS_DI, high ile aynı boyutlu.
+    """
+    n_symbols, width = high.shape
+    if width < 2:
+        return np.full((n_symbols, width), np.nan), np.full((n_symbols, width), np.nan)
+
+    diff_p = np.full((n_symbols, width), np.nan)
+    diff_m = np.full((n_symbols, width), np.nan)
+    diff_p[:, 1:] = high[:, 1:] - high[:, :-1]
+    diff_m[:, 1:] = low[:, :-1] - low[:, 1:]
+    minus_dm = np.where((diff_m > 0) & (diff_p < diff_m), diff_m, 0.0)
+    plus_dm = np.where(~((diff_m > 0) & (diff_p < diff_m)) & (diff_p > 0) & (diff_p > diff_m), diff_p, 0.0)
+    true_range = np.full((n_symbols, width), np.nan)
+    true_range[:, 1:] = np.maximum(np.maximum(high[:, 1:] - low[:, 1:], np.abs(high[:, 1:] - close[:, :-1])),
+                                   np.abs(low[:, 1:] - close[:, :-1]))
+
+    # İlk period - 1 fark yumuşatılmadan, sırayla toplanır. Toplam, girdinin init_at konumuna yazılır ve öncesi sıfırlanır;
+    # böylece döngü her adımda tek bir ifadeyle güncellenir (0 - 0 / period + toplam = toplam).
+    start = width - lengths
+    rows = np.flatnonzero(lengths > period)
+    init_at = np.full(n_symbols, width)
+    init_at[rows] = start[rows] + period - 1
+    before = np.arange(width) < init_at[:, None]
+    inputs = {}
+    for name, values in (('plus', plus_dm), ('minus', minus_dm), ('tr', true_range)):
+        total = np.zeros(len(rows))
+        for j in range(1, period):
+            total += values[rows, start[rows] + j]
+        values = np.where(before, 0.0, values)
+        values[rows, init_at[rows]] = total
+        # ema ile aynı şekilde (zaman × sembol) düzenine çevrilir.
+        inputs[name] = np.ascontiguousarray(values.T)
+
+    smoothed = {name: np.zeros((width, n_symbols)) for name in inputs}
+    prev_plus = prev_minus = prev_tr = np.zeros(n_symbols)
+    for t in range(int(init_at.min()), width):
+        prev_plus = smoothed['plus'][t] = (prev_plus - prev_plus / period) + inputs['plus'][t]
+        prev_minus = smoothed['minus'][t] = (prev_minus - prev_minus / period) + inputs['minus'][t]
+        prev_tr = smoothed['tr'][t] = prev_tr - (prev_tr / period) + inputs['tr'][t]
+    smoothed = {name: values.T for name, values in smoothed.items()}
+
+    valid = np.arange(width) > init_at[:, None]
+    zero = (-0.00000001 < smoothed['tr']) & (smoothed['tr'] < 0.00000001)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = np.where(valid, np.where(zero, 0.0, 100.0 * (smoothed['plus'] / smoothed['tr'])), np.nan)
+        minus_di = np.where(valid, np.where(zero, 0.0, 100.0 * (smoothed['minus'] / smoothed['tr'])), np.nan)
+    return plus_di, minus_di
+
+
+def _crossover_points(fast, slow, t):
+    points = np.ones(fast.shape[0])
+    points = np.where((fast[:, t] > slow[:, t]) & (fast[:, t - 1] < slow[:, t - 1]), points * 1.2, points)
+    return np.where((fast[:, t] < slow[:, t]) & (fast[:, t - 1] > slow[:, t - 1]), points / 1.2, points)
+
+
+def score_panel(candles, min_candles=200, fib_window=50, lookback=3):
+    """
+    Execution.analyze_and_score puanlamasını tüm semboller için tek vektörel geçişte yapar: EMA5/EMA10 kesişimi, son
+    `fib_window` mumun Fibonacci seviyelerinin geçilmesi ve PLUS_DI/MINUS_DI kesişimi son `lookback` mumda puanlanır.
+    Sonuçlar analyze_and_score ile aynıdır.
+
+    Parameters
+    ----------
+    candles : dict
+        Sembol -> 'high', 'low' ve 'close' sütunlarına sahip, zamana göre sıralı DataFrame ya da ohlcv.OHLCV.
+
+    min_candles : int, optional
+        Puanlama için gereken minimum mum sayısı. Varsayılan değer 200.
+
+    fib_window : int, optional
+        Fibonacci seviyeleri için kullanılan mum sayısı. Varsayılan değer 50.
+
+    lookback : int, optional
+        Puanlanan son mum sayısı. Varsayılan değer 3.
+
+    Returns
+    -------
+    pandas.DataFrame
+        'symbol' indeksli, 'date', 'price', 'fib_points', 'ema_sma_points', 'pdx_points', 'points' ve 'error'
+        sütunlarına sahip, puana göre büyükten küçüğe sıralı tablo. Puanlanamayan semboller (veri yok ya da yetersiz)
+        'error' sütunuyla tablonun sonunda yer alır.
+    """
+    errors = {}
+    scored = {}
+    for symbol, data in candles.items():
+        if len(data) < min_candles:
+            errors[symbol] = 'All data is NaN' if not len(data) else 'Insufficient data for EMA calculations'
+        else:
+            scored[symbol] = data
+
+    table = pd.DataFrame(columns=SCORE_COLUMNS, index=pd.Index([], name='symbol'))
+    if scored:
+        with profiling.stage('panel_scoring', rows=int(sum(len(data) for data in scored.values()))):
+            symbols, panel, lengths = stack(scored)
+            high, low, close = panel['high'], panel['low'], panel['close']
+            ema5 = ema(close, lengths, 5)
+            ema10 = ema(close, lengths, 10)
+            pdx, mdx = directional_indicators(high, low, close, lengths, 14)
+
+            highest = np.fmax.reduce(high[:, -fib_window:], axis=1)
+            lowest = np.fmin.reduce(low[:, -fib_window:], axis=1)
+            levels = [highest - ratio * (highest - lowest) for ratio in FIB_RATIOS]
+
+            points = np.ones(len(symbols))
+            width = close.shape[1]
+            for t in range(width - lookback, width):
+                ema_sma_points = _crossover_points(ema5, ema10, t)
+                points = points * ema_sma_points
+
+                fib_points = np.ones(len(symbols))
+                for level in levels:
+                    up = (close[:, t] > level) & (level > close[:, t - 1])
+                    down = (close[:, t] < level) & (level < close[:, t - 1])
+                    fib_points = np.where(up, fib_points * 1.2, np.where(down, fib_points / 1.2, fib_points))
+                points = points * fib_points
+
+                pdx_points = _crossover_points(pdx, mdx, t)
+                points = points * pdx_points
+
+            dates = np.array([_last_time(scored[symbol]) for symbol in symbols]).astype('datetime64[ns]')
+            table = pd.DataFrame({'date': dates, 'price': close[:, -1],
+                                  'fib_points': fib_points, 'ema_sma_points': ema_sma_points,
+                                  'pdx_points': pdx_points, 'points': points, 'error': None},
+                                 index=pd.Index(symbols, name='symbol'))
+            # Fiyat sütunlarının tamamı boş olan semboller puanlanmaz.
+            empty = np.isnan(high).all(axis=1) & np.isnan(low).all(axis=1) & np.isnan(close).all(axis=1)
+            if empty.any():
+                table.loc[empty, SCORE_COLUMNS[:-1]] = np.nan
+                table.loc[empty, 'error'] = 'All data is NaN'
+
+    table = table.reindex(list(table.index) + list(errors))
+    table.loc[list(errors), 'error'] = list(errors.values())
+    return table.sort_values('points', ascending=False, na_position='last', kind='stable')
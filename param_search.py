@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+
+def _best(results, key):
+    valid = [r for r in results if r is not None]
+    return max(valid, key=key) if valid else None
+
+
+def successive_halving(candidates, evaluate, min_budget=0.25, max_budget=1.0, eta=3, key=lambda r: r[0]):
+    """
+    Successive halving ile parametre araması. Tüm adaylar önce düşük bütçeyle (örneğin verinin bir kısmıyla) ucuza
+    değerlendirilir; her turda en iyi 1/eta kısmı bir üst bütçeye terfi eder, son tur tam bütçeyle yapılır. Sonucu None
+    olan adaylar (sinyal üretmeyen ya da ortalama işlem süresi sınırını aşan kombinasyonlar) ilk turda elenir.
+
+    Parameters
+    ----------
+    candidates : list
+        Parametre kombinasyonları. Örneğin: [(higher_than, rsip, macdp), ...].
+
+    evaluate : callable
+        evaluate(candidates, budget) şeklinde çağrılıp her aday için bir sonuç (ya da None) listesi döndüren fonksiyon.
+
+    min_budget : float, optional
+        İlk turun bütçesi. Varsayılan değer 0.25.
+
+    max_budget : float, optional
+        Son turun bütçesi. Varsayılan değer 1.0.
+
+    eta : int, optional
+        Her turda adayların kaçta birinin terfi edeceği. Varsayılan değer 3.
+
+    key : callable, optional
+        Sonuçtan skoru çıkaran fonksiyon. Varsayılan olarak sonucun ilk elemanı.
+
+    Returns
+    -------
+    object
+        Son turdaki en iyi sonuç. Hiçbir aday geçerli sonuç üretmezse None.
+    list
+        Her tur için (bütçe, değerlendirilen aday sayısı) tuple'ları.
+    """
+    rounds = max(0, int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9)))
+    survivors = list(candidates)
+    history = []
+    results = []
+    for k in range(rounds, -1, -1):
+        budget = max_budget * eta ** -k
+        results = evaluate(survivors, budget)
+        history.append((budget, len(survivors)))
+        if k == 0:
+            break
+        ranked = sorted((i for i, r in enumerate(results) if r is not None), key=lambda i: key(results[i]),
+                        reverse=True)
+        if not ranked:
+            return None, history
+        survivors = [survivors[i] for i in ranked[:max(1, math.ceil(len(survivors) / eta))]]
+    return _best(results, key), history
+
+
+def tpe_search(space, evaluate, n_trials=30, n_startup=10, gamma=0.25, n_candidates=24, key=lambda r: r[0],
+               seed=None):
+    """
+    Ayrık parametre uzayında TPE (Tree-structured Parzen Estimator) benzeri Bayesçi arama. Değerlendirilen
+    kombinasyonlar skora göre iyi (en iyi gamma oranı) ve kötü olarak ikiye ayrılır; her parametre için iki grubun değer
+    frekanslarından l(x) ve g(x) dağılımları çıkarılır. Yeni aday l(x)'ten örneklenen adaylar arasından l(x)/g(x) oranı en
+    yüksek olan, daha önce denenmemiş kombinasyondur. Sonucu None olan kombinasyonlar (sinyal yok ya da ortalama işlem
+    süresi sınırı aşıldı) budanır ve kötü gruba eklenir.
+
+    Parameters
+    ----------
+    space : list
+        Her parametre için olası değerlerin listesi. Örneğin: [higher_thans, rsips, macdps].
+
+    evaluate : callable
+        evaluate(params) şeklinde çağrılıp bir sonuç ya da None döndüren fonksiyon. Örneğin calculate_score.
+
+    n_trials : int, optional
+        Maksimum değerlendirme sayısı. Varsayılan değer 30.
+
+    n_startup : int, optional
+        Modelden önce rastgele seçilecek kombinasyon sayısı. Varsayılan değer 10.
+
+    gamma : float, optional
+        İyi grup oranı. Varsayılan değer 0.25.
+
+    n_candidates : int, optional
+        Her adımda l(x)'ten örneklenen aday sayısı. Varsayılan değer 24.
+
+    key : callable, optional
+        Sonuçtan skoru çıkaran fonksiyon. Varsayılan olarak sonucun ilk elemanı.
+
+    seed : int, optional
+        Rastgele sayı üreteci tohumu.
+
+    Returns
+    -------
+    object
+        En iyi sonuç. Hiçbir kombinasyon geçerli sonuç üretmezse None.
+    list
+        Değerlendirme sırasına göre (parametreler, sonuç) tuple'ları.
+    """
+    rng = np.random.default_rng(seed)
+    space = [list(values) for values in space]
+    total = int(np.prod([len(values) for values in space]))
+    history = []
+    seen = set()
+
+    def random_choice():
+        return tuple(int(rng.integers(len(values))) for values in space)
+
+    def frequencies(choices, dim):
+        # Laplace düzeltmesi: hiç görülmemiş değerlerin olasılığı sıfır olmaz.
+        counts = np.ones(len(space[dim]))
+        for choice in choices:
+            counts[choice[dim]] += 1
+        return counts / counts.sum()
+
+    scores = {}
+    while len(history) < min(n_trials, total):
+        if len(history) < n_startup:
+            choice = random_choice()
+            while choice in seen:
+                choice = random_choice()
+        else:
+            # Budanan kombinasyonlar en kötü skoru alır.
+            ordered = sorted(seen, key=lambda c: scores[c], reverse=True)
+            n_good = max(1, int(math.ceil(gamma * len(ordered))))
+            good, bad = ordered[:n_good], ordered[n_good:]
+            l_probs = [frequencies(good, dim) for dim in range(len(space))]
+            g_probs = [frequencies(bad, dim) for dim in range(len(space))]
+
+            choice, best_ratio = None, -np.inf
+            for _ in range(n_candidates):
+                candidate = tuple(int(rng.choice(len(space[dim]), p=l_probs[dim])) for dim in range(len(space)))
+                if candidate in seen:
+                    continue
+                ratio = sum(np.log(l_probs[dim][candidate[dim]]) - np.log(g_probs[dim][candidate[dim]])
+                            for dim in range(len(space)))
+                if ratio > best_ratio:
+                    choice, best_ratio = candidate, ratio
+            if choice is None:
+                choice = random_choice()
+                while choice in seen:
+                    choice = random_choice()
+
+        params = tuple(space[dim][choice[dim]] for dim in range(len(space)))
+        result = evaluate(params)
+        seen.add(choice)
+        scores[choice] = key(result) if result is not None else -np.inf
+        history.append((params, result))
+
+    return _best([result for _, result in history], key), history
@@ -0,0 +1,333 @@
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# Ölçüm açık mı? CRYANAL_PROFILE=1 ortam değişkeni joblib işçilerine de geçtiği için işçilerde de ölçüm yapılır.
+enabled = os.environ.get('CRYANAL_PROFILE') == '1'
+# Bellek ölçümü tracemalloc ile yapılır ve kodu belirgin şekilde yavaşlatır; ayrıca açılır.
+track_allocations = os.environ.get('CRYANAL_PROFILE_ALLOC') == '1'
+
+# (aşama, coin, parametreler) -> [çağrı sayısı, toplam süre, satır sayısı, tepe bellek]
+_records = {}
+# Etiket bağlamı: iç içe stage çağrıları coin ve parametre etiketlerini buradan devralır.
+_labels = [{}]
+# Bellek ölçümünde iç içe aşamaların tepe değerleri.
+_peaks = []
+
+
+def enable(allocations=False):
+    """
+    Ölçümü açar. Ortam değişkenleri de ayarlanır, böylece bundan sonra başlatılan joblib işçileri de ölçüm yapar.
+
+    Parameters
+    ----------
+    allocations : bool, optional
+        True ise her aşamanın tepe bellek kullanımı tracemalloc ile ölçülür. Varsayılan değer False.
+    """
+    global enabled, track_allocations
+    enabled = True
+    track_allocations = allocations
+    os.environ['CRYANAL_PROFILE'] = '1'
+    os.environ['CRYANAL_PROFILE_ALLOC'] = '1' if allocations else '0'
+
+
+@contextmanager
+def context(**labels):
+    """
+    İçinde çalışan tüm aşamalara etiket ekler. Örneğin coin ya da parametre seti:
+
+        with profiling.context(coin='BTCUSDT', params=(1.2, 1.8, 1.8)):
+            ...
+    """
+    if not enabled:
+        yield
+        return
+    _labels.append({**_labels[-1], **labels})
+    try:
+        yield
+    finally:
+        _labels.pop()
+
+
+class stage:
+    """
+    Bir kod bloğunun süresini, çağrı sayısını, işlenen satır sayısını ve (açıksa) tepe bellek kullanımını kaydeden
+    bağlam yöneticisi. Ölçüm kapalıyken maliyeti bir nesne oluşturmaktan ibarettir. Satır sayısı blok içinde
+    öğrenilebiliyorsa rows alanına yazılabilir:
+
+        with profiling.stage('fetch', coin=symbol) as s:
+            df = get_binance_data(...)
+            s.rows = len(df)
+
+    Parameters
+    ----------
+    name : str
+        Aşama adı. Örneğin: 'fetch', 'indicators', 'points', 'simulate'.
+
+    rows : int, optional
+        İşlenen satır (mum) sayısı.
+
+    **labels
+        Ek etiketler (coin, params). None olan ya da verilmeyen etiketler context ile verilenlerden devralınır.
+    """
+
+    __slots__ = ('name', 'rows', 'labels', 'start', 'start_memory')
+
+    def __init__(self, name, rows=0, **labels):
+        self.name = name
+        self.rows = rows
+        self.labels = labels
+
+    def __enter__(self):
+        if not enabled:
+            return self
+        labels = dict(_labels[-1])
+        labels.update((key, value) for key, value in self.labels.items() if value is not None)
+        self.labels = labels
+        _labels.append(labels)
+        if track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if _peaks:
+                _peaks[-1] = max(_peaks[-1], peak)
+            tracemalloc.reset_peak()
+            _peaks.append(current)
+            self.start_memory = current
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not enabled:
+            return False
+        elapsed = time.perf_counter() - self.start
+        allocated = 0
+        if track_allocations:
+            stage_peak = max(_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            allocated = stage_peak - self.start_memory
+            if _peaks:
+                _peaks[-1] = max(_peaks[-1], stage_peak)
+        _labels.pop()
+
+        key = (self.name, self.labels.get('coin'), _format_params(self.labels.get('params')))
+        entry = _records.get(key)
+        if entry is None:
+            _records[key] = [1, elapsed, self.rows, allocated]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += self.rows
+            entry[3] = max(entry[3], allocated)
+        return False
+
+
+def _format_params(params):
+    if params is None:
+        return None
+    return ','.join(str(float(p)) if not isinstance(p, str) else p for p in params)
+
+
+def timed(name=None):
+    """
+    Fonksiyon çağrılarını stage ile ölçen dekoratör. Aşama adı verilmezse fonksiyonun adı kullanılır.
+    """
+    def decorator(function):
+        stage_name = name or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with stage(stage_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Bu süreçte toplanan kayıtları döndürür. joblib işçilerinden ana sürece göndermek için kullanılır.
+
+    Returns
+    -------
+    dict
+        (aşama, coin, parametreler) -> [çağrı sayısı, toplam süre, satır sayısı, tepe bellek].
+    """
+    return {key: list(value) for key, value in _records.items()}
+
+
+def merge(records):
+    """Başka bir süreçten gelen snapshot çıktısını bu sürecin kayıtlarına ekler."""
+    for key, (calls, elapsed, rows, allocated) in records.items():
+        entry = _records.get(key)
+        if entry is None:
+            _records[key] = [calls, elapsed, rows, allocated]
+        else:
+            entry[0] += calls
+            entry[1] += elapsed
+            entry[2] += rows
+            entry[3] = max(entry[3], allocated)
+
+
+def reset():
+    """Kayıtları siler."""
+    _records.clear()
+
+
+def profiled_call(function, *args, **kwargs):
+    """
+    Fonksiyonu çağırır ve sonucu bu çağrı sırasında toplanan kayıtlarla birlikte döndürür. joblib işçilerinde
+    delayed(profiled_call)(fonksiyon, ...) şeklinde kullanılır; ana süreç kayıtları merge ile birleştirir.
+
+    Returns
+    -------
+    object
+        Fonksiyonun sonucu.
+    dict
+        snapshot çıktısı.
+    """
+    saved = snapshot()
+    reset()
+    try:
+        result = function(*args, **kwargs)
+        return result, snapshot()
+    finally:
+        reset()
+        merge(saved)
+
+
+def report(by=('stage',)):
+    """
+    Kayıtları verilen alanlara göre gruplayıp özetler.
+
+    Parameters
+    ----------
+    by : tuple, optional
+        Gruplama alanları: 'stage', 'coin', 'params'. Varsayılan değer ('stage',).
+
+    Returns
+    -------
+    list
+        Toplam süreye göre büyükten küçüğe sıralı satırlar. Her satırda gruplama alanları ile 'calls', 'seconds',
+        'mean_ms', 'rows', 'rows_per_sec' ve 'alloc_peak_mb' bulunur.
+    """
+    fields = ('stage', 'coin', 'params')
+    grouped = {}
+    for key, (calls, elapsed, rows, allocated) in _records.items():
+        labels = dict(zip(fields, key))
+        group = tuple(labels[field] for field in by)
+        entry = grouped.setdefault(group, [0, 0.0, 0, 0])
+        entry[0] += calls
+        entry[1] += elapsed
+        entry[2] += rows
+        entry[3] = max(entry[3], allocated)
+
+    rows_out = []
+    for group, (calls, elapsed, rows, allocated) in grouped.items():
+        row = dict(zip(by, group))
+        row.update({
+            'calls': calls,
+            'seconds': elapsed,
+            'mean_ms': elapsed / calls * 1000 if calls else 0.0,
+            'rows': rows,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0,
+            'alloc_peak_mb': allocated / 2 ** 20,
+        })
+        rows_out.append(row)
+    return sorted(rows_out, key=lambda row: row['seconds'], reverse=True)
+
+
+def write_report(path, by=('stage', 'coin', 'params')):
+    """
+    report çıktısını dosyaya yazar. Dosya uzantısı '.csv' ise CSV, değilse JSON formatı kullanılır.
+
+    Parameters
+    ----------
+    path : str
+        Çıktı dosyası.
+
+    by : tuple, optional
+        Gruplama alanları. Varsayılan değer ('stage', 'coin', 'params').
+    """
+    rows = report(by=by)
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(by) + ['calls', 'seconds', 'mean_ms', 'rows', 'rows_per_sec',
+                                                               'alloc_peak_mb'])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, 'w') as f:
+            json.dump({'by_stage': report(by=('stage',)), 'rows': rows}, f, indent=2)
+
+
+def print_report(by=('stage',)):
+    """Aşama bazında özeti tablo olarak yazdırır."""
+    print(f"{'Aşama':<20} {'Çağrı':>8} {'Süre (s)':>10} {'Ort. (ms)':>10} {'Satır/s':>14} {'Bellek (MB)':>12}")
+    for row in report(by=by):
+        print(f"{str(row.get('stage')):<20} {row['calls']:>8} {row['seconds']:>10.3f} {row['mean_ms']:>10.3f} "
+              f"{row['rows_per_sec']:>14,.0f} {row['alloc_peak_mb']:>12.1f}")
+
+
+def profile_call(function, *args, path=None, use_pyinstrument=False, top=25, **kwargs):
+    """
+    Tek bir çağrıyı cProfile (ya da kuruluysa ve istenirse pyinstrument) ile profiller. Örneğin tek bir parametre
+    setinin calculate_score değerlendirmesi.
+
+    Parameters
+    ----------
+    function : callable
+        Profillenecek fonksiyon.
+
+    *args, **kwargs
+        Fonksiyonun argümanları.
+
+    path : str, optional
+        Çıktı dosyası. cProfile için '.prof' (snakeviz ile açılabilir), pyinstrument için '.html'.
+
+    use_pyinstrument : bool, optional
+        True ise ve pyinstrument kuruluysa örnekleyici profil kullanılır. Varsayılan değer False.
+
+    top : int, optional
+        cProfile özetinde yazdırılacak fonksiyon sayısı. Varsayılan değer 25.
+
+    Returns
+    -------
+    object
+        Fonksiyonun sonucu.
+    """
+    if use_pyinstrument:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument kurulu değil, cProfile kullanılıyor.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.stop()
+                print(profiler.output_text(unicode=True))
+                if path:
+                    with open(path, 'w') as f:
+                        f.write(profiler.output_html())
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+        print(stream.getvalue())
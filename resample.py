@@ -0,0 +1,195 @@
+import numpy as np
+
+from kline_fetch import INTERVAL_MS, interval_to_ms
+from kline_store import STORE_COLUMNS, KlineStore, missing_ranges
+
+# 1970-01-01 Perşembe gününe denk gelir; Binance haftalık mumları Pazartesi 00:00 UTC'de açılır.
+WEEK_OFFSET = 4 * INTERVAL_MS['1d']
+
+# Toplanarak birleştirilen sütunlar. Diğerleri: open ilk, high en büyük, low en küçük, close son değer.
+SUM_COLUMNS = ('volume', 'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
+               'taker_buy_quote_asset_volume')
+
+
+def check_intervals(base_interval, interval):
+    """
+    interval mumlarının base_interval mumlarından türetilebildiğini kontrol eder. Hedef interval taban intervalin tam katı
+    olmalıdır; aylık ('1M') mumlar günün tam böleni olan taban intervallerden türetilebilir.
+    """
+    base = interval_to_ms(base_interval)
+    target = INTERVAL_MS['1d'] if interval == '1M' else interval_to_ms(interval)
+    if (target <= base and interval != '1M') or target % base:
+        raise ValueError(f"{interval} mumları {base_interval} mumlarından türetilemez")
+
+
+def bucket_bounds(open_time, interval):
+    """
+    Açılış zamanlarının düştüğü interval mumlarının sınırları. Haftalık mumlar Pazartesi, aylık mumlar ayın ilk günü
+    açılır; diğerleri Unix zamanının başlangıcına hizalıdır.
+
+    Parameters
+    ----------
+    open_time : numpy.ndarray
+        Milisaniye cinsinden int64 zamanlar.
+
+    interval : str
+        Hedef interval. Örneğin: '4h', '1d', '1w', '1M'.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her zamanın düştüğü mumun açılış zamanı.
+    numpy.ndarray
+        Aynı mumun bitişi (bir sonraki mumun açılış zamanı).
+    """
+    open_time = np.asarray(open_time, dtype=np.int64)
+    if interval == '1M':
+        months = open_time.astype('datetime64[ms]').astype('datetime64[M]')
+        return (months.astype('datetime64[ms]').astype(np.int64),
+                (months + 1).astype('datetime64[ms]').astype(np.int64))
+    step = interval_to_ms(interval)
+    offset = WEEK_OFFSET if interval == '1w' else 0
+    start = open_time - (open_time - offset) % step
+    return start, start + step
+
+
+def resample_arrays(arrays, interval):
+    """
+    Zamana göre sıralı mum sütunlarını tek vektörel geçişte daha uzun bir intervale çevirir: open ilk, high en büyük,
+    low en küçük, close son değer; hacimler ve işlem sayısı toplanır. En az bir mumu olan her dönem için bir mum üretilir;
+    dönemin tamamlanıp tamamlanmadığı kontrol edilmez.
+
+    Parameters
+    ----------
+    arrays : dict
+        Sütun adı -> numpy dizisi (kline_store.STORE_COLUMNS adları). 'open_time' sütunu bulunmalıdır; olmayan sütunlar
+        sonuçta da bulunmaz.
+
+    interval : str
+        Hedef interval. Örneğin: '4h', '1d', '1w', '1M'.
+
+    Returns
+    -------
+    dict
+        Aynı sütunlara sahip, hedef intervaldeki mumlar. close_time bir sonraki mumun açılışından 1 ms öncesidir.
+    """
+    open_time = np.asarray(arrays['open_time'], dtype=np.int64)
+    columns = [column for column in STORE_COLUMNS if column in arrays]
+    if not len(open_time):
+        return {column: np.asarray(arrays[column])[:0] for column in columns}
+
+    starts, ends = bucket_bounds(open_time, interval)
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(open_time)] - 1
+
+    out = {}
+    for column in columns:
+        values = np.asarray(arrays[column])
+        if column == 'open_time':
+            out[column] = starts[first]
+        elif column == 'close_time':
+            out[column] = ends[first] - 1
+        elif column == 'open':
+            out[column] = values[first]
+        elif column == 'close':
+            out[column] = values[last]
+        elif column == 'high':
+            out[column] = np.maximum.reduceat(values, first)
+        elif column == 'low':
+            out[column] = np.minimum.reduceat(values, first)
+        elif column in SUM_COLUMNS:
+            out[column] = np.add.reduceat(values, first)
+    return out
+
+
+class ResampledStore(KlineStore):
+    """
+    Daha uzun intervalleri, taban depodaki (örneğin 1m ya da 1h) mumlardan yerel olarak türeten kline deposu. Türetilen
+    mumlar KlineStore ile aynı bölüm yapısında ayrı bir kök klasörde saklanır; bir aralık bir kez türetildikten sonra
+    diskten okunur. Eksik kısımlar için sadece taban depodaki veri (taban depo eksikse önce API'den) tek geçişte
+    çevrilir; interval değiştirmek için aynı geçmiş tekrar indirilmez. Sadece tamamlanmış (taban mumları tümüyle depoda
+    bulunan) dönemler saklanır ve döndürülür.
+
+    KlineStore ile aynı arayüze sahiptir (load, load_frame, load_klines); get_binance_data fonksiyonlarına store olarak
+    verilebilir. Taban interval istendiğinde taban depo doğrudan kullanılır.
+
+    Parameters
+    ----------
+    base : KlineStore
+        Taban mumların deposu.
+
+    base_interval : str, optional
+        Taban interval. Varsayılan değer '1h'.
+
+    root : str, optional
+        Türetilen mumların kök klasörü. Verilmezse '<base.root>_from_<base_interval>'.
+    """
+
+    def __init__(self, base, base_interval='1h', root=None):
+        super().__init__(root or f'{base.root}_from_{base_interval}', fetcher=None, offline=base.offline)
+        self.base = base
+        self.base_interval = base_interval
+
+    def _complete_ranges(self, symbol, interval, start_time, end_time):
+        # Taban deponun kapsadığı aralıkların [start_time, end_time] ile kesişimleri dönem sınırlarına daraltılır.
+        ranges = []
+        for start, end in self.base.covered_ranges(symbol, self.base_interval):
+            start, end = max(start, start_time), min(end, end_time)
+            if start > end:
+                continue
+            (first_start, last_start), (first_end, _) = bucket_bounds([start, end + 1], interval)
+            start = first_start if first_start == start else first_end
+            end = last_start - 1
+            if start <= end:
+                ranges.append([int(start), int(end)])
+        return ranges
+
+    def update(self, symbol, interval, start_time, end_time):
+        """
+        [start_time, end_time] aralığında henüz türetilmemiş dönemleri taban mumlardan türetip bölüme ekler.
+
+        Returns
+        -------
+        int
+            Eklenen yeni mum sayısı.
+        """
+        if interval == self.base_interval:
+            return self.base.update(symbol, interval, start_time, end_time)
+        check_intervals(self.base_interval, interval)
+
+        covered = self.covered_ranges(symbol, interval)
+        gaps = missing_ranges(covered, start_time, end_time)
+        if not gaps:
+            return 0
+
+        parts = []
+        ranges = []
+        for gap_start, gap_end in gaps:
+            # Açılış zamanı aralıkta olan dönemler türetilir; son dönem için taban mumlar dönemin sonuna kadar okunur.
+            starts, ends = bucket_bounds([gap_start, gap_end], interval)
+            first = int(starts[0]) if starts[0] == gap_start else int(ends[0])
+            if first > gap_end:
+                continue
+            base = self.base.load(symbol, self.base_interval, first, int(ends[1]) - 1)
+            complete = self._complete_ranges(symbol, interval, first, int(ends[1]) - 1)
+            if not complete:
+                continue
+            derived = resample_arrays(base, interval)
+            keep = np.zeros(len(derived['open_time']), dtype=bool)
+            for start, end in complete:
+                keep |= (derived['open_time'] >= start) & (derived['open_time'] <= end)
+            parts.append({column: values[keep] for column, values in derived.items()})
+            ranges.extend(complete)
+        if not ranges:
+            return 0
+
+        new = {column: np.concatenate([part[column] for part in parts]) for column in STORE_COLUMNS}
+        return self.merge_partition(symbol, interval, new, covered + ranges)
+
+    def load(self, symbol, interval, start_time, end_time):
+        """
+        KlineStore.load ile aynıdır. Taban interval dışındaki intervaller taban mumlardan türetilir.
+        """
+        if interval == self.base_interval:
+            return self.base.load(symbol, interval, start_time, end_time)
+        return super().load(symbol, interval, start_time, end_time)
@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import inspect
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fraction REAL NOT NULL,
+    coins TEXT NOT NULL,
+    interval TEXT,
+    start_time INTEGER,
+    end_time INTEGER,
+    code_version TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    score REAL,
+    result TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_key, params, fraction)
+);
+CREATE INDEX IF NOT EXISTS results_score ON results (fraction, score);
+"""
+
+
+def code_version(*objects):
+    """
+    Sonuçları etkileyen kodun özeti. Modüllerin, fonksiyonların ya da dosya yollarının kaynak kodundan çıkarılır;
+    kod değişince önceki sonuçlar yeniden kullanılmaz.
+
+    Parameters
+    ----------
+    *objects
+        Modül, fonksiyon ya da dosya yolu. Örneğin: signal_engine, trade_kernel, score_trades.
+
+    Returns
+    -------
+    str
+        12 karakterlik özet.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        if isinstance(obj, str):
+            with open(obj, 'rb') as f:
+                digest.update(f.read())
+        else:
+            digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()[:12]
+
+
+def _dumps(value):
+    # Sonuçlardaki numpy sayıları Python sayılarına çevrilir.
+    return json.dumps(value, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
+
+def _tuples(value):
+    # JSON listeleri sonuçlardaki tuple yapısına geri çevrilir.
+    return tuple(_tuples(v) for v in value) if isinstance(value, list) else value
+
+
+class ResultStore:
+    """
+    Hiperparametre taramalarının sonuçlarını SQLite tablosunda saklar. Her sonuç tamamlanır tamamlanmaz yazılır;
+    anahtar çalışma ayarları (coinler, interval, tarih aralığı ve sonucu etkileyen diğer ayarlar), parametreler, veri
+    oranı (fraction) ve kod sürümüdür. Tarama yarıda kesilirse ya da ızgaraya yeni değerler eklenirse sadece henüz
+    değerlendirilmemiş kombinasyonlar hesaplanır. Farklı taramaların en iyi sonuçları `best` ile yeniden hesaplamadan
+    sorgulanabilir.
+
+    Parameters
+    ----------
+    path : str
+        SQLite dosyası.
+
+    settings : dict, optional
+        Sonucu etkileyen çalışma ayarları. 'coins', 'interval', 'start_time' ve 'end_time' ayrı sütunlarda da
+        saklanır. JSON'a çevrilebilir olmalıdır.
+
+    code_version : str, optional
+        Kod sürümü. Örneğin code_version(signal_engine, trade_kernel, score_trades).
+    """
+
+    def __init__(self, path, settings=None, code_version=''):
+        self.path = path
+        self.settings = dict(settings or {})
+        self.code_version = code_version
+        self.settings_json = json.dumps(self.settings, sort_keys=True, default=str)
+        self.run_key = hashlib.sha256(f'{self.settings_json}|{code_version}'.encode()).hexdigest()
+        self.connection = sqlite3.connect(path)
+        # WAL: tarama yazarken başka süreçler tabloyu okuyabilir.
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+        self.counters = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_many(self, param_list, fraction=1.0):
+        """
+        Daha önce saklanmış sonuçlar.
+
+        Returns
+        -------
+        dict
+            Parametreler (tuple) -> sonuç (None olabilir). Sadece saklanmış kombinasyonlar bulunur.
+        """
+        keys = {_dumps(list(params)): tuple(params) for params in param_list}
+        found = {}
+        key_list = list(keys)
+        # SQLite'ın parametre sınırı için sorgu parçalara bölünür.
+        for i in range(0, len(key_list), 500):
+            chunk = key_list[i:i + 500]
+            rows = self.connection.execute(
+                f"SELECT params, result FROM results WHERE run_key = ? AND fraction = ? "
+                f"AND params IN ({','.join('?' * len(chunk))})", [self.run_key, fraction, *chunk])
+            for params, result in rows:
+                found[keys[params]] = _tuples(json.loads(result))
+        self.counters['hits'] += len(found)
+        self.counters['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, param_list, results, fraction=1.0):
+        """Sonuçları tek bir işlemde yazar. Aynı anahtarla saklanmış sonuçların üzerine yazılır."""
+        now = time.time()
+        rows = [(self.run_key, _dumps(list(params)), fraction, _dumps(self.settings.get('coins', [])),
+                 self.settings.get('interval'), self.settings.get('start_time'), self.settings.get('end_time'),
+                 self.code_version, self.settings_json, None if result is None else float(result[0]), _dumps(result),
+                 now)
+                for params, result in zip(param_list, results)]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        rows)
+        self.counters['stored'] += len(rows)
+
+    def evaluate(self, param_list, evaluate, fraction=1.0):
+        """
+        Saklanmış sonuçları kullanır, eksik kombinasyonları evaluate ile hesaplayıp saklar.
+
+        Parameters
+        ----------
+        param_list : list
+            Parametre kombinasyonları.
+
+        evaluate : callable
+            evaluate(missing, store) -> sonuç listesi. Sonuçları parça parça hesaplayan fonksiyonlar her parça bittiğinde
+            store(params, results) çağırarak sonuçları hemen yazabilir; evaluate'in döndürdüğü ama henüz yazılmamış
+            sonuçlar sonda yazılır.
+
+        fraction : float, optional
+            Değerlendirmede kullanılan veri oranı. Varsayılan değer 1.
+
+        Returns
+        -------
+        list
+            param_list sırasıyla sonuçlar.
+        """
+        found = self.get_many(param_list, fraction)
+        missing = [params for params in dict.fromkeys(tuple(params) for params in param_list) if params not in found]
+        if missing:
+            stored = set()
+
+            def store(params, results):
+                self.put_many(params, results, fraction)
+                stored.update(tuple(p) for p in params)
+
+            results = evaluate(missing, store)
+            rest = [(params, result) for params, result in zip(missing, results) if params not in stored]
+            if rest:
+                self.put_many(*zip(*rest), fraction=fraction)
+            found.update(zip(missing, results))
+        return [found[tuple(params)] for params in param_list]
+
+    def best(self, n=10, fraction=1.0, current=False, **filters):
+        """
+        Saklanan tüm taramalardaki en yüksek skorlu sonuçlar.
+
+        Parameters
+        ----------
+        n : int, optional
+            Sonuç sayısı. Varsayılan değer 10.
+
+        fraction : float, optional
+            Veri oranı. Varsayılan değer 1 (tam veriyle yapılan değerlendirmeler).
+
+        current : bool, optional
+            True ise sadece bu ayarlar ve kod sürümüyle yapılan değerlendirmeler. Varsayılan değer False.
+
+        **filters
+            Sütun eşitlik filtreleri: interval, start_time, end_time, code_version. coins bir liste olarak verilir.
+
+        Returns
+        -------
+        list
+            'params', 'score', 'result', 'coins', 'interval', 'start_time', 'end_time', 'code_version', 'settings' ve
+            'created_at' anahtarlı sözlükler, skora göre büyükten küçüğe.
+        """
+        clauses = ['score IS NOT NULL', 'fraction = ?']
+        values = [fraction]
+        if current:
+            clauses.append('run_key = ?')
+            values.append(self.run_key)
+        for column, value in filters.items():
+            if column not in ('coins', 'interval', 'start_time', 'end_time', 'code_version'):
+                raise ValueError(f"Bilinmeyen filtre: {column}")
+            clauses.append(f'{column} = ?')
+            values.append(_dumps(list(value)) if column == 'coins' else value)
+        rows = self.connection.execute(
+            f"SELECT params, score, result, coins, interval, start_time, end_time, code_version, settings, created_at "
+            f"FROM results WHERE {' AND '.join(clauses)} ORDER BY score DESC LIMIT ?", [*values, n])
+        return [{'params': _tuples(json.loads(params)), 'score': score, 'result': _tuples(json.loads(result)),
+                 'coins': json.loads(coins), 'interval': interval, 'start_time': start_time, 'end_time': end_time,
+                 'code_version': version, 'settings': json.loads(settings), 'created_at': created_at}
+                for params, score, result, coins, interval, start_time, end_time, version, settings, created_at
+                in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Saklanan hiperparametre sonuçlarının en iyilerini listeler.")
+    parser.add_argument('path', nargs='?', default='sweep_results.sqlite')
+    parser.add_argument('-n', type=int, default=10, help="Sonuç sayısı.")
+    parser.add_argument('--interval')
+    parser.add_argument('--coins', nargs='+')
+    parser.add_argument('--code-version')
+    args = parser.parse_args(argv)
+    filters = {key: value for key, value in (('interval', args.interval), ('coins', args.coins),
+                                             ('code_version', args.code_version)) if value}
+    with ResultStore(args.path) as store:
+        for row in store.best(args.n, **filters):
+            print(f"{row['score']:.6f}  {row['params']}  {','.join(row['coins'])}  {row['interval']}  "
+                  f"{row['start_time']}-{row['end_time']}  {row['code_version']}")
+
+
+if __name__ == '__main__':
+    main()
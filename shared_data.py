@@ -0,0 +1,168 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Paylaşılan sütunlar ve tipleri.
+SHARED_COLUMNS = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+}
+
+
+def fingerprint(data):
+    """
+    Yayınlanan verinin özeti: coinler, satır sayıları, ilk ve son open_time değerleri ve tüm sütunların içeriği. Sonuç
+    deposunun (result_store) anahtarına eklenir; farklı veriyle (örneğin depoda eksik aralıkla çevrimdışı çalışma ya da
+    borsada düzeltilen mumlar) hesaplanan skorlar birbirinin yerine kullanılmaz.
+
+    Parameters
+    ----------
+    data : SharedOHLCV or PortableOHLCV
+        Coin verileri.
+
+    Returns
+    -------
+    dict
+        'coins' -> coin -> (satır sayısı, ilk open_time, son open_time) ve 'digest' -> 16 karakterlik içerik özeti.
+    """
+    digest = hashlib.sha256()
+    coins = {}
+    for coin in data.coins:
+        arrays = data.attach(coin)
+        open_time = arrays['open_time']
+        coins[coin] = (len(open_time), int(open_time[0]) if len(open_time) else None,
+                       int(open_time[-1]) if len(open_time) else None)
+        digest.update(coin.encode())
+        for column in SHARED_COLUMNS:
+            digest.update(np.ascontiguousarray(arrays[column]).data)
+    return {'coins': coins, 'digest': digest.hexdigest()[:16]}
+
+
+class SharedOHLCV:
+    """
+    Birden fazla coinin OHLCV verisini diskte memory-map edilebilir `.npy` dosyaları olarak yayınlar. Nesnenin kendisi
+    sadece klasör yolunu ve coin listesini taşır; joblib işçilerine gönderildiğinde veri kopyalanmaz, her işçi aynı
+    dosyaları salt okunur olarak açar ve işletim sisteminin sayfa önbelleğini paylaşır.
+
+    Parameters
+    ----------
+    folder : str
+        Dosyaların bulunduğu klasör.
+
+    coins : list
+        Yayınlanan coinler.
+    """
+
+    def __init__(self, folder, coins):
+        self.folder = folder
+        self.coins = list(coins)
+
+    @classmethod
+    def publish(cls, frames, folder=None):
+        """
+        DataFrame'leri sütun sütun diske yazar.
+
+        Parameters
+        ----------
+        frames : dict
+            Coin -> get_binance_data çıktısı DataFrame.
+
+        folder : str, optional
+            Hedef klasör. Verilmezse geçici bir klasör oluşturulur.
+
+        Returns
+        -------
+        SharedOHLCV
+            İşçilere gönderilebilecek hafif nesne.
+        """
+        folder = folder or tempfile.mkdtemp(prefix='cryanal_shared_')
+        for coin, df in frames.items():
+            path = os.path.join(folder, coin)
+            os.makedirs(path, exist_ok=True)
+            arrays = {'open_time': df.index.to_numpy(dtype='datetime64[ms]').astype(np.int64)}
+            for column in list(SHARED_COLUMNS)[1:]:
+                arrays[column] = df[column].to_numpy(dtype=SHARED_COLUMNS[column])
+            for column, values in arrays.items():
+                np.save(os.path.join(path, f'{column}.npy'), np.ascontiguousarray(values))
+        return cls(folder, frames.keys())
+
+    def attach(self, coin):
+        """
+        Bir coinin sütunlarını kopyalamadan, salt okunur memory-map olarak açar.
+
+        Returns
+        -------
+        dict
+            Sütun adı -> salt okunur numpy.memmap.
+        """
+        path = os.path.join(self.folder, coin)
+        return {column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r') for column in SHARED_COLUMNS}
+
+    def frame(self, coin):
+        """
+        Bir coinin verisini get_binance_data ile aynı yapıda ('open_time' indeksli) bir DataFrame olarak döndürür.
+        Sütunlar memory-map edilmiş dizilerin üzerine kopyalanmadan kurulur; yeni sütun eklenebilir ama mevcut sütunlar
+        salt okunurdur.
+
+        Returns
+        -------
+        pandas.DataFrame
+            OHLCV verileri.
+        """
+        arrays = self.attach(coin)
+        index = pd.to_datetime(arrays.pop('open_time'), unit='ms')
+        index.name = 'open_time'
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+    def close(self):
+        """Yayınlanan dosyaları siler."""
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PortableOHLCV:
+    """
+    SharedOHLCV ile aynı arayüze (coins, attach, frame) sahip, veriyi bellekte taşıyan kap. Memory-map edilmiş dosyalar
+    sadece aynı makinede okunabildiği için başka makinelerdeki işçilere (örneğin sweep ile) veri bu kapla bir kez
+    gönderilir.
+
+    Parameters
+    ----------
+    arrays : dict
+        Coin -> sütun adı -> numpy dizisi (SHARED_COLUMNS).
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.coins = list(arrays)
+
+    @classmethod
+    def from_shared(cls, shared):
+        """SharedOHLCV verisini belleğe kopyalar."""
+        return cls({coin: {column: np.array(values) for column, values in shared.attach(coin).items()}
+                    for coin in shared.coins})
+
+    def attach(self, coin):
+        """Bir coinin sütunları. Diziler paylaşılır, kopyalanmaz."""
+        return dict(self.arrays[coin])
+
+    def frame(self, coin):
+        """SharedOHLCV.frame ile aynı yapıda DataFrame."""
+        arrays = self.attach(coin)
+        index = pd.to_datetime(arrays.pop('open_time'), unit='ms')
+        index.name = 'open_time'
+        return pd.DataFrame(arrays, index=index, copy=False)
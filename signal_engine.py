@@ -0,0 +1,346 @@
+import numpy as np
+import pandas as pd
+
+import profiling
+from indicator_cache import indicator
+
+
+def compute_indicators(close, symbol=None, interval=None):
+    """
+    calculate_points fonksiyonlarında kullanılan indikatörleri tüm seri için tek seferde hesaplar.
+
+    TA-Lib'in RSI, SMA ve MACD hesaplamaları nedenseldir; i. indeksteki değer yalnızca ilk i+1 veriye bağlıdır. Bu yüzden
+    seriyi bir kez hesaplamak, expanding() ile her satırda ön eki yeniden hesaplamakla aynı sonucu verir. İndikatörler
+    indicator_cache üzerinden hesaplanır; aynı kapanış serisi için tekrar hesaplanmaz.
+
+    Parameters
+    ----------
+    close : array-like
+        Kapanış fiyatları.
+
+    symbol, interval : str, optional
+        Önbellek anahtarında kullanılan sembol ve interval.
+
+    Returns
+    -------
+    dict
+        'close', 'rsi', 'rsi_ma', 'macd' ve 'macd_signal' anahtarlarına sahip, float64 numpy dizilerinden oluşan sözlük.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    with profiling.stage('indicators', rows=len(close), coin=symbol):
+        rsi = indicator('RSI', close, symbol=symbol, interval=interval, timeperiod=14)
+        rsi_ma = indicator('SMA', rsi, symbol=symbol, interval=interval, timeperiod=14)
+        macd, macd_signal, macd_hist = indicator('MACD', close, symbol=symbol, interval=interval, fastperiod=12,
+                                                 slowperiod=26, signalperiod=9)
+
+    return {'close': close, 'rsi': rsi, 'rsi_ma': rsi_ma, 'macd': macd, 'macd_signal': macd_signal}
+
+
+def _previous(values):
+    """
+    Diziyi bir adım kaydırır (values[i - 1]). İlk eleman NaN olur, böylece karşılaştırmalar False döner.
+    """
+    shifted = np.empty_like(values)
+    shifted[0] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+def bar_points(indicators, rsip=1.8, macdp=1.8):
+    """
+    hiperparam_sim ve sim_metrics stratejisinde her mum için RSI ve MACD kesişimlerinden gelen puan çarpanını hesaplar.
+    calculate_points içindeki for döngüsünün tek bir adımının vektörel karşılığıdır.
+
+    Parameters
+    ----------
+    indicators : dict
+        compute_indicators fonksiyonunun çıktısı.
+
+    rsip : float or numpy.ndarray, optional
+        RSI kesişim puanı. Varsayılan değer 1.8.
+
+    macdp : float or numpy.ndarray, optional
+        MACD kesişim puanı. Varsayılan değer 1.8.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her mum için rsi_points * macd_points değeri. rsip ve macdp (n_params, 1) boyutlu diziler olarak verilirse sonuç
+        (n_params, n_bars) boyutlu olur.
+    """
+    rsi, rsi_ma = indicators['rsi'], indicators['rsi_ma']
+    macd, macd_signal = indicators['macd'], indicators['macd_signal']
+    prev_rsi, prev_rsi_ma = _previous(rsi), _previous(rsi_ma)
+    prev_macd, prev_macd_signal = _previous(macd), _previous(macd_signal)
+
+    # RSI
+    rsi_up = (rsi > rsi_ma) & (prev_rsi < prev_rsi_ma) & (rsi < 40)
+    rsi_down = (rsi < rsi_ma) & (prev_rsi > prev_rsi_ma) & (rsi > 70)
+    rsi_points = np.where(rsi_up, 1 * rsip, np.where(rsi_down, 1 / rsip, 1.0))
+
+    # MACD
+    macd_up = (macd > macd_signal) & (macd < 0) & (prev_macd < prev_macd_signal)
+    macd_down = (macd < macd_signal) & (macd > 0) & (prev_macd > prev_macd_signal)
+    macd_points = np.where(macd_up, 1 * macdp, np.where(macd_down, 1 / macdp, 1.0))
+
+    return rsi_points * macd_points
+
+
+def window_points(factors, window=3, min_periods=20):
+    """
+    Her mum için son `window` mumun puan çarpanlarını çarparak toplam puanı bulur. expanding(min_periods=...) davranışını
+    korumak için ilk min_periods - 1 mum NaN bırakılır.
+
+    Parameters
+    ----------
+    factors : numpy.ndarray
+        bar_points fonksiyonunun çıktısı. İki boyutlu ise her satır ayrı bir parametre seti olarak işlenir.
+
+    window : int, optional
+        Toplam puana katılan son mum sayısı. Varsayılan değer 3.
+
+    min_periods : int, optional
+        Puan hesaplanabilmesi için gereken minimum mum sayısı. Varsayılan değer 20.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her mum için toplam puan.
+    """
+    n = factors.shape[-1]
+    points = np.full(factors.shape, np.nan)
+    start = max(min_periods, window + 1) - 1
+    if n <= start:
+        return points
+
+    # calculate_points'teki çarpma sırası korunur: ((1 * f[k-2]) * f[k-1]) * f[k]
+    total = np.ones(factors.shape[:-1] + (n - start,))
+    for offset in range(window - 1, -1, -1):
+        total = total * factors[..., start - offset:n - offset]
+    points[..., start:] = total
+    return points
+
+
+def calculate_points_series(close, rsip=1.8, macdp=1.8, min_periods=20):
+    """
+    hiperparam_sim ve sim_metrics modüllerindeki calculate_points fonksiyonunun expanding().apply ile her satır için
+    verdiği sonucu O(n) sürede, tek geçişte hesaplar.
+
+    Parameters
+    ----------
+    close : array-like
+        Kapanış fiyatları.
+
+    rsip : float, optional
+        RSI kesişim puanı. Varsayılan değer 1.8.
+
+    macdp : float, optional
+        MACD kesişim puanı. Varsayılan değer 1.8.
+
+    min_periods : int, optional
+        Puan hesaplanabilmesi için gereken minimum mum sayısı. Varsayılan değer 20.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her mum için toplam puan.
+    """
+    indicators = compute_indicators(close)
+    with profiling.stage('points', rows=len(indicators['close'])):
+        return window_points(bar_points(indicators, rsip=rsip, macdp=macdp), min_periods=min_periods)
+
+
+def batch_signals(close, higher_thans, rsips, macdps, short_th=0.5, min_periods=20, symbol=None, interval=None):
+    """
+    Bir parametre ızgarasının tamamını tek geçişte değerlendirir. RSI, RSI-SMA, MACD ve kesişimler parametrelerden
+    bağımsız olduğu için bir kez hesaplanır; puanlar parametre ekseni üzerinde yayınlama (broadcast) ile bulunur. Aynı
+    (rsip, macdp) çiftine sahip kombinasyonların puanları bir kez hesaplanır.
+
+    Parameters
+    ----------
+    close : array-like
+        Kapanış fiyatları.
+
+    higher_thans, rsips, macdps : array-like
+        Her kombinasyon için uzun pozisyon eşiği, RSI puanı ve MACD puanı. Üçü de aynı uzunlukta olmalıdır.
+
+    short_th : float, optional
+        Kısa pozisyon almak için gereken maksimum puan. Varsayılan değer 0.5.
+
+    min_periods : int, optional
+        Puan hesaplanabilmesi için gereken minimum mum sayısı. Varsayılan değer 20.
+
+    symbol, interval : str, optional
+        İndikatör önbelleğinin anahtarında kullanılan sembol ve interval.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_params, n_bars) boyutlu puan matrisi.
+    numpy.ndarray
+        (n_params, n_bars) boyutlu long sinyalleri.
+    numpy.ndarray
+        (n_params, n_bars) boyutlu short sinyalleri.
+    """
+    higher_thans = np.asarray(higher_thans, dtype=np.float64)
+    pairs, inverse = np.unique(np.column_stack([np.asarray(rsips, dtype=np.float64),
+                                                np.asarray(macdps, dtype=np.float64)]),
+                               axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    indicators = compute_indicators(close, symbol=symbol, interval=interval)
+    with profiling.stage('points', rows=len(indicators['close']) * len(higher_thans), coin=symbol):
+        factors = bar_points(indicators, rsip=pairs[:, :1], macdp=pairs[:, 1:])
+        points = window_points(factors, min_periods=min_periods)[inverse]
+
+        long_signal = points > higher_thans[:, None]
+        short_signal = points < short_th
+    return points, long_signal, short_signal
+
+
+def graph_points_series(close, rsip=1.4, macdp=1.2, min_periods=20):
+    """
+    test_graph modülündeki calculate_points fonksiyonunun expanding().apply ile her satır için verdiği sonucu O(n)
+    sürede hesaplar. Bu stratejide sadece son mumun kesişimleri, RSI aşırı bölgeleri ve MACD dönüşleri puanlanır.
+
+    Parameters
+    ----------
+    close : array-like
+        Kapanış fiyatları.
+
+    rsip : float, optional
+        RSI kesişim puanı. Varsayılan değer 1.4.
+
+    macdp : float, optional
+        MACD dönüş puanı. Varsayılan değer 1.2.
+
+    min_periods : int, optional
+        Puan hesaplanabilmesi için gereken minimum mum sayısı. Varsayılan değer 20.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her mum için puan.
+    """
+    indicators = compute_indicators(close)
+    with profiling.stage('points', rows=len(indicators['close'])):
+        rsi, rsi_ma = indicators['rsi'], indicators['rsi_ma']
+        macd, macd_signal = indicators['macd'], indicators['macd_signal']
+        prev_rsi, prev_rsi_ma = _previous(rsi), _previous(rsi_ma)
+        prev_macd = _previous(macd)
+        prev2_macd = _previous(prev_macd)
+
+        # RSI
+        rsi_up = (rsi > rsi_ma) & (prev_rsi < prev_rsi_ma)
+        rsi_down = (rsi < rsi_ma) & (prev_rsi > prev_rsi_ma)
+        rsi_points = np.where(rsi_up, 1 * rsip, np.where(rsi_down, 1 / rsip, 1.0))
+        rsi_points = np.where(rsi > 80, rsi_points * 0.9, np.where(rsi < 20, rsi_points * 1.1, rsi_points))
+
+        # MACD
+        macd_up = (macd < macd_signal) & (macd < 0) & (prev2_macd > prev_macd) & (prev_macd < macd)
+        macd_down = (macd > macd_signal) & (macd > 0) & (prev2_macd < prev_macd) & (prev_macd > macd)
+        macd_points = np.where(macd_up, 1 * macdp, np.where(macd_down, 1 / macdp, 1.0))
+
+        points = 1 * rsi_points * macd_points
+        points[:min(min_periods - 1, len(points))] = np.nan
+        return points
+
+
+def legacy_points(df, points_fn, min_periods=20, **kwargs):
+    """
+    Eski yöntemi, yani her satır için expanding().apply ile points_fn çağrısını çalıştırır. O(n²) maliyetlidir; sadece
+    vektörel motorun doğrulanması için kullanılmalıdır.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        'close' sütununa sahip bir DataFrame.
+
+    points_fn : callable
+        Modüldeki calculate_points fonksiyonu.
+
+    min_periods : int, optional
+        expanding() için minimum mum sayısı. Varsayılan değer 20.
+
+    **kwargs
+        points_fn fonksiyonuna aktarılacak parametreler (rsip, macdp).
+
+    Returns
+    -------
+    numpy.ndarray
+        Her satır için eski yöntemle hesaplanan puan.
+    """
+    with profiling.stage('legacy_points', rows=len(df)):
+        legacy = df['close'].expanding(min_periods=min_periods).apply(
+            lambda x: points_fn(df.loc[x.index], **kwargs))
+    return legacy.to_numpy(dtype=np.float64)
+
+
+def check_parity(df, points, points_fn, min_periods=20, rtol=1e-9, **kwargs):
+    """
+    Vektörel motorun ürettiği puanları eski expanding().apply yöntemiyle karşılaştırır. Fark varsa ilk farklı satırı
+    belirten bir AssertionError fırlatır.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        'close' sütununa sahip bir DataFrame.
+
+    points : array-like
+        Vektörel motorun hesapladığı puanlar.
+
+    points_fn : callable
+        Modüldeki calculate_points fonksiyonu.
+
+    min_periods : int, optional
+        expanding() için minimum mum sayısı. Varsayılan değer 20.
+
+    rtol : float, optional
+        Karşılaştırmada kullanılan bağıl tolerans. Varsayılan değer 1e-9.
+
+    **kwargs
+        points_fn fonksiyonuna aktarılacak parametreler (rsip, macdp).
+
+    Returns
+    -------
+    numpy.ndarray
+        Eski yöntemle hesaplanan puanlar.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    legacy = legacy_points(df, points_fn, min_periods=min_periods, **kwargs)
+    matches = np.isclose(points, legacy, rtol=rtol, atol=0.0, equal_nan=True)
+    if not matches.all():
+        first = int(np.argmin(matches))
+        raise AssertionError(
+            f"Vektörel puanlar eski yöntemle uyuşmuyor: {int((~matches).sum())} satır farklı, ilk fark "
+            f"{df.index[first]} (vektörel={points[first]}, eski={legacy[first]})")
+    return legacy
+
+
+def apply_signals(df, points, higher_than=2, short_th=0.5):
+    """
+    Hesaplanan puanları DataFrame'e ekler ve 'long_signal' ile 'short_signal' sütunlarını oluşturur.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Sinyallerin ekleneceği DataFrame.
+
+    points : array-like
+        Her satır için puan.
+
+    higher_than : float, optional
+        Uzun pozisyon almak için gereken minimum puan. Varsayılan değer 2.
+
+    short_th : float, optional
+        Kısa pozisyon almak için gereken maksimum puan. Varsayılan değer 0.5.
+
+    Returns
+    -------
+    pandas.DataFrame
+        'points', 'long_signal' ve 'short_signal' sütunları eklenmiş DataFrame.
+    """
+    df['points'] = pd.Series(points, index=df.index)
+    df['long_signal'] = df['points'] > higher_than
+    df['short_signal'] = df['points'] < short_th
+    return df
@@ -1,12 +1,22 @@
+import numpy as np
 import pandas as pd
 import requests
 from datetime import datetime
 import talib
-from statistics import mean
+import indicator_cache
+import profiling
+import signal_engine
+import trade_kernel
+import trade_metrics
+from kline_fetch import api_url
+from kline_store import KlineStore
+from ohlcv import OHLCV
+from resample import ResampledStore
+from async_fetch import fetch_chunked
 
 
 
-def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
+def get_binance_data(symbol, interval, start_time, end_time, limit=5000, store=None, chunked=False):
     """
     Binance API üzerinden belirli bir zaman aralığı için belirli bir sembolün kline (candlestick) verilerini çeker.
 
@@ -27,38 +37,49 @@ def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
     limit : int, optional
         Tek bir istekte çekilebilecek maksimum kline sayısı. Varsayılan değer 5000.
 
+    store : kline_store.KlineStore, optional
+        Verilirse veri yerel depodan okunur ve sadece depoda eksik olan aralıklar API'den çekilir. Bu durumda 5000 satır
+        sınırı uygulanmaz. Varsayılan değer None.
+
+    chunked : bool, optional
+        True ise aralık mum sınırlarına hizalı pencerelere bölünüp pencereler eşzamanlı çekilir ve birleştirilir. Bu modda
+        5000 satır sınırı yoktur, istenen uzunlukta aralık çekilebilir. Varsayılan değer False.
+
     Returns
     -------
     pandas.DataFrame
         Binance'ten alınan kline verileri. Sütunlar: 'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'.
-        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür.
+        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume'.
+        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür. Fiyat ve
+        hacim sütunları float64, zamanlar ve işlem sayısı int64 tipindedir.
     """
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
-    columns = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume',
-               'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+    if store is not None:
+        return store.load_frame(symbol, interval, start_time, end_time)
 
-    data = []
-    while start_time < end_time:
-        response = requests.get(url)
-        temp_data = response.json()
-        data.extend(temp_data)
+    url = f"{api_url()}/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
 
-        if len(temp_data) == 0:
-            break
-        else:
-            start_time = temp_data[-1][0] + 1
-            url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
+    data = []
+    if chunked:
+        data = fetch_chunked(symbol, interval, start_time, end_time)
+    else:
+        while start_time < end_time:
+            response = requests.get(url)
+            temp_data = response.json()
+            data.extend(temp_data)
+
+            if len(temp_data) == 0:
+                break
+            else:
+                start_time = temp_data[-1][0] + 1
+                url = f"{api_url()}/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
 
-        # 5000 k-line verisine ulaştığında döngüyü durdur
-        if len(data) >= 5000:
-            data = data[:5000]
-            break
+            # 5000 k-line verisine ulaştığında döngüyü durdur
+            if len(data) >= 5000:
+                data = data[:5000]
+                break
 
-    df = pd.DataFrame(data, columns=columns)
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-    df.set_index('open_time', inplace=True)
-    return df
+    # Satırlar bir kez tipli sütunlara ayrıştırılır; fiyat sütunları tekrar dönüştürülmeden kullanılır.
+    return OHLCV.from_klines(data).to_frame()
 
 
 interval = "1d"
@@ -67,6 +88,20 @@ end_time = "2022-01-01 00:00:00"
 coins = ["BTCUSDT", "ETHUSDT", "XRPUSDT"] # İstenilen coin/usdt çiftleri girilmeli. İlgili coin ilgili tarihte
 # binance borsasında işlem gördüğine emin olunmalı.
 leverage = 1
+# Yerel kline deposu. Daha önce çekilen aralıklar diskten okunur, sadece eksik kısımlar API'den çekilir.
+# İnternet erişimi yoksa offline=True ile sadece depodaki veri kullanılır. Depoyu kullanmamak için None yapın.
+kline_store = KlineStore('klines', fetcher=fetch_chunked, offline=False)
+# Taban interval. Verilirse (örneğin '1h') `interval` mumları depodaki bu intervalin mumlarından yerel olarak türetilir;
+# interval değiştirmek yeni bir indirme gerektirmez. Her intervali ayrı çekmek için None yapın.
+base_interval = None
+if kline_store is not None and base_interval:
+    kline_store = ResampledStore(kline_store, base_interval)
+# Ölçüm: True ise indirme, indikatör, puan ve simülasyon aşamalarının süreleri, çağrı ve satır sayıları coin bazında
+# toplanır ve çalışmanın sonunda profile_report dosyasına (.json ya da .csv) yazılır.
+profile = False
+profile_report = 'profile_report.json'
+if profile:
+    profiling.enable()
 
 start_time_unix = int(datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
 end_time_unix = int(datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
@@ -94,11 +129,11 @@ def calculate_points(df, rsip=1.8, macdp=1.8):
         Hesaplanan toplam puan.
     """
     total_points = 1
-    open_ = df['open'].astype(float)
-    close = df['close'].astype(float)
-    high = df['high'].astype(float)
-    low = df['low'].astype(float)
-    volume = df['volume'].astype(float)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
     rsi = talib.RSI(close, timeperiod=14)
     rsi_ma = talib.SMA(rsi, timeperiod=14)
     macd, macd_signal, macd_hist = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
@@ -128,7 +163,7 @@ def calculate_points(df, rsip=1.8, macdp=1.8):
     return total_points
 
 
-def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8):
+def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8, parity=False):
     """
     Verilen DataFrame'de ticaret sinyallerini belirler ve 'points', 'long_signal' ve 'short_signal' sütunlarını döndürür.
 
@@ -149,18 +184,21 @@ def trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8):
     macdp : float, optional
         MACD hesaplamasında kullanılan parametre. Varsayılan değer 1.8.
 
+    parity : bool, optional
+        True ise vektörel puanlar eski expanding().apply yöntemiyle karşılaştırılır ve fark varsa AssertionError
+        fırlatılır. Eski yöntem O(n²) olduğu için sadece doğrulama amacıyla kullanılmalıdır. Varsayılan değer False.
+
     Returns
     -------
     pandas.DataFrame
         Girdi DataFrame'ine 'points', 'long_signal' ve 'short_signal' sütunları eklenmiş hali.
     """
-    df['points'] = df['close'].expanding(min_periods=20).apply(
-        lambda x: calculate_points(df.loc[x.index], rsip=rsip, macdp=macdp))
-
-    df['long_signal'] = df['points'] > higher_than
-    df['short_signal'] = df['points'] < short_th
+    # İndikatörler tüm seri için bir kez hesaplanır, her mumun puanı O(n) sürede bulunur.
+    points = signal_engine.calculate_points_series(df['close'].to_numpy(dtype=float), rsip=rsip, macdp=macdp)
+    if parity:
+        signal_engine.check_parity(df, points, calculate_points, rsip=rsip, macdp=macdp)
 
-    return df
+    return signal_engine.apply_signals(df, points, higher_than=higher_than, short_th=short_th)
 
 
 def simulate_trades(df, leverage):
@@ -189,57 +227,8 @@ def simulate_trades(df, leverage):
     float
         Simülasyon sürecinde yaşanan maksimum düşüş miktarı.
     """
-    trades = []
-    position = 0
-    balance = 100
-    highest_balance = 100
-    max_drawdown = 0
-    entry_time = None
-    entry_points = None
-    margin_call = False
-    for index, row in df.iterrows():
-        if position == 0:
-            if row['long_signal'] and not margin_call:
-                position = 1
-                entry_price = row['close']
-                entry_time = index
-                entry_points = row['points']
-            elif row['short_signal'] and not margin_call:
-                position = -1
-                entry_price = row['close']
-                entry_time = index
-                entry_points = row['points']
-        elif position == 1:
-            points_condition = 0.6 != None and row['points'] < 0.6
-            exit_condition = points_condition or margin_call
-            if exit_condition:
-                exit_price = row['close']
-                pnl = (exit_price - entry_price) / entry_price * leverage
-                new_balance = balance * (1 + pnl)
-                position = 0
-                entry_balance = balance
-                balance = new_balance
-                trades.append({"entry_time": entry_time, "close_time": row['close_time'], "type": "long", "entry_price": entry_price, "exit_price": exit_price, "pnl": pnl, "entry_balance": entry_balance, "exit_balance": balance, "entry_points": entry_points})
-                highest_balance = max(highest_balance, balance)
-                max_drawdown = max(max_drawdown, highest_balance - balance)
-                if balance <= 0:
-                    margin_call = True
-        elif position == -1:
-            points_condition = 0.6 != None and row['points'] > 0.6
-            exit_condition = points_condition or margin_call
-            if exit_condition:
-                exit_price = row['close']
-                pnl = (entry_price - exit_price) / entry_price * leverage
-                new_balance = balance * (1 + pnl)
-                position = 0
-                entry_balance = balance
-                balance = new_balance
-                trades.append({"entry_time": entry_time, "close_time": row['close_time'], "type": "short", "entry_price": entry_price, "exit_price": exit_price, "pnl": pnl, "entry_balance": entry_balance, "exit_balance": balance, "entry_points": entry_points})
-                highest_balance = max(highest_balance, balance)
-                max_drawdown = max(max_drawdown, highest_balance - balance)
-                if balance <= 0:
-                    margin_call = True
-    return trades, balance, max_drawdown
+    # DataFrame.iterrows yerine numpy dizileri üzerinde çalışan (numba kuruluysa derlenmiş) durum makinesi kullanılır.
+    return trade_kernel.simulate_trades(df, leverage)
 
 
 def print_trades(trades):
@@ -270,73 +259,87 @@ def print_trades(trades):
             f"{entry_date:<20} {exit_date:<20} {trade['type']:<10} {trade['entry_price']:<12.2f} {trade['exit_price']:<12.2f} {days:<10} {candles:<10} {pnl_percentage:<12.2f} {trade['entry_balance']:<15.2f} {trade['exit_balance']:<15.2f} {trade['entry_points']:<12.2f}")
     print("\n")
 
-all_results = []
+# Tüm coinlerin işlemleri sütun formatında (trade_metrics.columnar_trades) toplanır.
+trade_columns = {'pnl': [], 'entry_time': [], 'exit_time': [], 'coin': []}
 
 for coin in coins:
     print(f"{coin} verisi alınıyor...")
-    df = get_binance_data(coin, interval, start_time_unix, end_time_unix)
-    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype(float)
+    with profiling.stage('fetch', coin=coin) as fetch:
+        df = get_binance_data(coin, interval, start_time_unix, end_time_unix, store=kline_store)
+        fetch.rows = len(df)
 
-    print(f"{coin} için işlem sinyalleri hesaplanıyor...")
-    trading_signals = trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8)
+    with profiling.context(coin=coin):
+        print(f"{coin} için işlem sinyalleri hesaplanıyor...")
+        trading_signals = trading_signal(df, higher_than=2, short_th=0.5, rsip=1.8, macdp=1.8)
 
-    print(f"{coin} için işlemler simülasyonu yapılıyor...")
-    trades, final_balance, max_drawdown = simulate_trades(df, leverage)
+        print(f"{coin} için işlemler simülasyonu yapılıyor...")
+        trades, final_balance, max_drawdown = simulate_trades(df, leverage)
 
     print(f"\n{coin} İşlemleri:")
     print_trades(trades)
 
-    all_results.extend([(trade['pnl'], (pd.to_datetime(trade['close_time'], unit='ms') - trade['entry_time']).days) for trade in trades])
+    for trade in trades:
+        trade_columns['pnl'].append(trade['pnl'])
+        trade_columns['entry_time'].append(trade['entry_time'].value // 1_000_000)
+        trade_columns['exit_time'].append(trade['close_time'])
+        trade_columns['coin'].append(coin)
 
 def print_metrics(trades):
     """
-    İşlem verilerini alır ve bu işlemlerin istatistiklerini (metriklerini) hesaplar ve yazdırır.
-    İstatistikler, ortalama kar/zarar yüzdesi, en yüksek kar, en yüksek zarar, ortalama işlem sayısı,
-    en çok üst üste karlı işlem sayısı, en çok üst üste zararlı işlem sayısı ve ortalama mum sayısını içerir.
+    İşlemlerin istatistiklerini (metriklerini) trade_metrics ile hesaplar ve yazdırır. İstatistikler ortalama kar/zarar
+    yüzdesi, en yüksek kar ve zarar, ortalama işlem sayısı, en çok üst üste karlı ve zararlı işlem sayısı, ortalama mum
+    sayısı, Sharpe ve Sortino oranları, pozisyonda geçen süre oranı, sermaye eğrisinin maksimum düşüşü ve coin bazında
+    özetleri içerir.
 
     Parameters
     ----------
-    trades : list
-        İşlem verilerini içeren liste. Her işlem, kar/zarar oranını ve işlemin yapıldığı gün sayısını içeren bir tuple.
+    trades : dict
+        trade_metrics.columnar_trades formatında, 'pnl', 'entry_time', 'exit_time', 'coin' ve 'days' dizilerine sahip
+        işlemler.
 
     Returns
     -------
-    None
-        Bu fonksiyon doğrudan istatistikleri ekrana yazdırır, herhangi bir değer döndürmez.
+    dict
+        trade_metrics.trade_metrics sonucu.
     """
-    # Metrics
-    pnl_list = [trade[0] for trade in trades]
-    days_list = [trade[1] for trade in trades]
-
-    average_pnl = mean(pnl_list)
-    highest_profit = max(pnl_list)
-    highest_profit_days = days_list[pnl_list.index(highest_profit)]
-    highest_loss = min(pnl_list)
-    highest_loss_days = days_list[pnl_list.index(highest_loss)]
-    average_trade_count = len(pnl_list) / len(coins)
-
-    trade_direction = 1 if pnl_list[0] > 0 else -1
-    max_consecutive_profit = max_consecutive_loss = count = 0
-    for pnl in pnl_list:
-        if (pnl > 0 and trade_direction == 1) or (pnl < 0 and trade_direction == -1):
-            count += 1
-        else:
-            if trade_direction == 1:
-                max_consecutive_profit = max(max_consecutive_profit, count)
-            else:
-                max_consecutive_loss = max(max_consecutive_loss, count)
-            count = 1
-            trade_direction = -trade_direction
+    span = end_time_unix - start_time_unix
+    # Sharpe ve Sortino, coin başına yıllık işlem sayısıyla yıllıklandırılır.
+    periods_per_year = len(trades['pnl']) / len(coins) / (span / (365 * trade_metrics.DAY_MS))
+    metrics = trade_metrics.trade_metrics(trades, span=span, periods_per_year=periods_per_year, per_coin=True)
+    if not metrics['trades']:
+        print("Hiçbir işlem yapılmamıştır.")
+        return metrics
 
-    average_candle_count = sum(days_list) * 6 / len(days_list)
+    highest_profit_days = trades['days'][np.argmax(trades['pnl'])]
+    highest_loss_days = trades['days'][np.argmin(trades['pnl'])]
 
     # Print Metrics
-    print(f"Ortalama Kar/Zarar Yüzdesi: {average_pnl * 100:.2f}%")
-    print(f"En Yüksek Kar: {highest_profit * 100:.2f}% (Alındığı Gün Sayısı: {highest_profit_days})")
-    print(f"En Yüksek Zarar: {highest_loss * 100:.2f}% (Alındığı Gün Sayısı: {highest_loss_days})")
-    print(f"Ortalama İşlem Sayısı: {average_trade_count:.2f}")
-    print(f"En Çok Üst Üste Karlı İşlem Sayısı: {max_consecutive_profit}")
-    print(f"En Çok Üst Üste Zararlı İşlem Sayısı: {max_consecutive_loss}")
-    print(f"Ortalama Mum Sayısı: {average_candle_count:.2f}")
-
-print_metrics(all_results)
\ No newline at end of file
+    print(f"Ortalama Kar/Zarar Yüzdesi: {metrics['mean_pnl'] * 100:.2f}%")
+    print(f"En Yüksek Kar: {metrics['max_pnl'] * 100:.2f}% (Alındığı Gün Sayısı: {highest_profit_days:.0f})")
+    print(f"En Yüksek Zarar: {metrics['min_pnl'] * 100:.2f}% (Alındığı Gün Sayısı: {highest_loss_days:.0f})")
+    print(f"Ortalama İşlem Sayısı: {metrics['trades'] / len(coins):.2f}")
+    print(f"En Çok Üst Üste Karlı İşlem Sayısı: {metrics['max_consecutive_wins']}")
+    print(f"En Çok Üst Üste Zararlı İşlem Sayısı: {metrics['max_consecutive_losses']}")
+    print(f"Ortalama Mum Sayısı: {metrics['avg_days'] * 6:.2f}")
+    print(f"Karlı İşlem Oranı: {metrics['win_rate'] * 100:.2f}%")
+    print(f"Medyan Kar/Zarar Yüzdesi: {metrics['median_pnl'] * 100:.2f}%")
+    print(f"Sharpe Oranı (yıllık): {metrics['sharpe']:.2f}")
+    print(f"Sortino Oranı (yıllık): {metrics['sortino']:.2f}")
+    print(f"Pozisyonda Geçen Süre: {metrics['exposure'] * 100:.2f}%")
+    print(f"Maksimum Düşüş: {metrics['max_drawdown'] * 100:.2f}%")
+    for coin, coin_metrics in metrics['per_coin'].items():
+        print(f"{coin}: işlem sayısı={coin_metrics['trades']}, karlı işlem oranı={coin_metrics['win_rate'] * 100:.2f}%, "
+              f"ortalama kar/zarar={coin_metrics['mean_pnl'] * 100:.2f}%, "
+              f"medyan kar/zarar={coin_metrics['median_pnl'] * 100:.2f}%, "
+              f"pozisyonda geçen süre={coin_metrics['exposure'] * 100:.2f}%, "
+              f"maksimum düşüş={coin_metrics['max_drawdown'] * 100:.2f}%")
+    return metrics
+
+print_metrics(trade_metrics.columnar_trades(trade_columns['pnl'], trade_columns['entry_time'],
+                                            trade_columns['exit_time'], trade_columns['coin']))
+
+# Ölçüm açıksa (profile = True) aşama bazında süreler ve indikatör önbelleğinin isabet sayıları
+if profiling.enabled:
+    print(indicator_cache.default_cache.stats())
+    profiling.print_report()
+    profiling.write_report(profile_report)
@@ -0,0 +1,478 @@
+import math
+from collections import deque
+
+import numpy as np
+
+
+def _is_zero(value):
+    """TA-Lib'in TA_IS_ZERO makrosunun karşılığı."""
+    return -0.00000001 < value < 0.00000001
+
+
+def _true_range(high, low, prev_close):
+    """TA-Lib'in TRUE_RANGE makrosunun karşılığı."""
+    true_range = high - low
+    diff = abs(high - prev_close)
+    if diff > true_range:
+        true_range = diff
+    diff = abs(low - prev_close)
+    if diff > true_range:
+        true_range = diff
+    return true_range
+
+
+class SMA:
+    """
+    Basit hareketli ortalama. Her yeni değer O(1) sürede işlenir ve talib.SMA ile aynı sonucu verir. Baştaki NaN değerler
+    TA-Lib'de olduğu gibi atlanır.
+
+    Parameters
+    ----------
+    period : int
+        Ortalama periyodu.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.period_total = 0.0
+        self.value = math.nan
+
+    def update(self, value):
+        if math.isnan(value) and not self.window:
+            return self.value
+        self.window.append(value)
+        self.period_total += value
+        if len(self.window) < self.period:
+            return self.value
+        self.value = self.period_total / self.period
+        self.period_total -= self.window.popleft()
+        return self.value
+
+
+class EMA:
+    """
+    Üstel hareketli ortalama. İlk `period` değerin basit ortalaması ile başlar, her yeni değer O(1) sürede işlenir ve
+    talib.EMA ile aynı sonucu verir.
+
+    Parameters
+    ----------
+    period : int
+        Ortalama periyodu.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self.seed_total = 0.0
+        self.value = math.nan
+
+    def update(self, value):
+        if self.count < self.period:
+            if math.isnan(value) and self.count == 0:
+                return self.value
+            self.count += 1
+            self.seed_total += value
+            if self.count == self.period:
+                self.value = self.seed_total / self.period
+            return self.value
+        self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class RSI:
+    """
+    Wilder yumuşatmalı RSI. Her yeni kapanış O(1) sürede işlenir ve talib.RSI ile aynı sonucu verir.
+
+    Parameters
+    ----------
+    period : int, optional
+        RSI periyodu. Varsayılan değer 14.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_close = None
+        self.prev_gain = 0.0
+        self.prev_loss = 0.0
+        self.value = math.nan
+
+    def update(self, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return self.value
+        diff = close - self.prev_close
+        self.prev_close = close
+        self.count += 1
+
+        if self.count <= self.period:
+            if diff < 0:
+                self.prev_loss -= diff
+            else:
+                self.prev_gain += diff
+            if self.count < self.period:
+                return self.value
+            self.prev_loss /= self.period
+            self.prev_gain /= self.period
+        else:
+            self.prev_loss *= (self.period - 1)
+            self.prev_gain *= (self.period - 1)
+            if diff < 0:
+                self.prev_loss -= diff
+            else:
+                self.prev_gain += diff
+            self.prev_loss /= self.period
+            self.prev_gain /= self.period
+
+        total = self.prev_gain + self.prev_loss
+        self.value = 100.0 * (self.prev_gain / total) if not _is_zero(total) else 0.0
+        return self.value
+
+
+class MACD:
+    """
+    MACD, sinyal ve histogram değerleri. TA-Lib'deki gibi hızlı EMA, yavaş EMA'nın ilk değer verdiği mumla hizalanarak
+    başlatılır; bu yüzden talib.MACD ile aynı sonucu verir. Her yeni kapanış O(1) sürede işlenir.
+
+    Parameters
+    ----------
+    fastperiod : int, optional
+        Hızlı EMA periyodu. Varsayılan değer 12.
+
+    slowperiod : int, optional
+        Yavaş EMA periyodu. Varsayılan değer 26.
+
+    signalperiod : int, optional
+        Sinyal EMA periyodu. Varsayılan değer 9.
+    """
+
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        self.fastperiod = fastperiod
+        self.slowperiod = slowperiod
+        self.warmup = deque(maxlen=slowperiod)
+        self.fast = None
+        self.slow = None
+        self.signal_ema = EMA(signalperiod)
+        self.macd = math.nan
+        self.signal = math.nan
+        self.hist = math.nan
+
+    def update(self, close):
+        if self.slow is None:
+            self.warmup.append(close)
+            if len(self.warmup) < self.slowperiod:
+                return self.macd, self.signal, self.hist
+            # Yavaş EMA'nın ilk değeri ile hızlı EMA'nın ilk değeri aynı muma denk gelir.
+            self.slow = EMA(self.slowperiod)
+            self.fast = EMA(self.fastperiod)
+            for i, value in enumerate(self.warmup):
+                self.slow.update(value)
+                if i >= self.slowperiod - self.fastperiod:
+                    self.fast.update(value)
+            self.warmup.clear()
+        else:
+            self.slow.update(close)
+            self.fast.update(close)
+
+        macd = self.fast.value - self.slow.value
+        signal = self.signal_ema.update(macd)
+        if not math.isnan(signal):
+            self.macd, self.signal, self.hist = macd, signal, macd - signal
+        return self.macd, self.signal, self.hist
+
+
+class DirectionalMovement:
+    """
+    Wilder yumuşatmalı PLUS_DI, MINUS_DI ve ADX. Her yeni mum O(1) sürede işlenir ve talib.PLUS_DI, talib.MINUS_DI ve
+    talib.ADX ile aynı sonucu verir.
+
+    Parameters
+    ----------
+    period : int, optional
+        Yumuşatma periyodu. Varsayılan değer 14.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_high = None
+        self.prev_low = None
+        self.prev_close = None
+        self.prev_plus_dm = 0.0
+        self.prev_minus_dm = 0.0
+        self.prev_tr = 0.0
+        self.sum_dx = 0.0
+        self.plus_di = math.nan
+        self.minus_di = math.nan
+        self.adx = math.nan
+
+    def update(self, high, low, close):
+        if self.prev_high is None:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return self.plus_di, self.minus_di, self.adx
+
+        diff_p = high - self.prev_high
+        diff_m = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        true_range = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.period:
+            # İlk period - 1 mumda değerler yumuşatılmadan toplanır.
+            if diff_m > 0 and diff_p < diff_m:
+                self.prev_minus_dm += diff_m
+            elif diff_p > 0 and diff_p > diff_m:
+                self.prev_plus_dm += diff_p
+            self.prev_tr += true_range
+            return self.plus_di, self.minus_di, self.adx
+
+        self.prev_minus_dm -= self.prev_minus_dm / self.period
+        self.prev_plus_dm -= self.prev_plus_dm / self.period
+        if diff_m > 0 and diff_p < diff_m:
+            self.prev_minus_dm += diff_m
+        elif diff_p > 0 and diff_p > diff_m:
+            self.prev_plus_dm += diff_p
+        self.prev_tr = self.prev_tr - (self.prev_tr / self.period) + true_range
+
+        dx = None
+        if not _is_zero(self.prev_tr):
+            self.minus_di = 100.0 * (self.prev_minus_dm / self.prev_tr)
+            self.plus_di = 100.0 * (self.prev_plus_dm / self.prev_tr)
+            di_total = self.minus_di + self.plus_di
+            if not _is_zero(di_total):
+                dx = 100.0 * (abs(self.minus_di - self.plus_di) / di_total)
+        else:
+            self.minus_di = self.plus_di = 0.0
+
+        # ADX ilk period adet DX değerinin ortalaması ile başlar, sonra Wilder yöntemiyle yumuşatılır.
+        adx_count = self.count - self.period + 1
+        if adx_count < self.period:
+            if dx is not None:
+                self.sum_dx += dx
+        elif adx_count == self.period:
+            if dx is not None:
+                self.sum_dx += dx
+            self.adx = self.sum_dx / self.period
+        elif dx is not None:
+            self.adx = ((self.adx * (self.period - 1)) + dx) / self.period
+
+        return self.plus_di, self.minus_di, self.adx
+
+
+class RollingMax:
+    """
+    Son `window` değerin en büyüğü. Monoton bir kuyruk kullandığı için her yeni değer amortize O(1) sürede işlenir.
+
+    Parameters
+    ----------
+    window : int
+        Pencere uzunluğu.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.candidates = deque()
+
+    def _dominates(self, new, old):
+        return new >= old
+
+    def update(self, value):
+        while self.candidates and self._dominates(value, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, value))
+        if self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.candidates[0][1] if self.candidates else math.nan
+
+
+class RollingMin(RollingMax):
+    """
+    Son `window` değerin en küçüğü. Her yeni değer amortize O(1) sürede işlenir.
+
+    Parameters
+    ----------
+    window : int
+        Pencere uzunluğu.
+    """
+
+    def _dominates(self, new, old):
+        return new <= old
+
+
+class SymbolState:
+    """
+    Execution.analyze_and_score için bir sembolün canlı indikatör durumu. EMA5, EMA10, PLUS_DI, MINUS_DI ve son 50 mumun
+    en yüksek/en düşük değerlerini tutar. Yeni kapanan her mum O(1) sürede işlenir; tekrar puanlama için tüm geçmişin
+    yeniden hesaplanması gerekmez.
+
+    Parameters
+    ----------
+    symbol : str
+        Sembol adı. Örneğin: 'BTCUSDT'.
+
+    fib_window : int, optional
+        Fibonacci seviyeleri için kullanılan mum sayısı. Varsayılan değer 50.
+    """
+
+    def __init__(self, symbol, fib_window=50):
+        self.symbol = symbol
+        self.count = 0
+        self.ema5 = EMA(5)
+        self.ema10 = EMA(10)
+        self.dmi = DirectionalMovement(14)
+        self.highest = RollingMax(fib_window)
+        self.lowest = RollingMin(fib_window)
+        # Puanlama son üç mumun kesişimlerine baktığı için son dört değer saklanır.
+        self.history = deque(maxlen=4)
+
+    @classmethod
+    def from_dataframe(cls, symbol, df, fib_window=50):
+        """
+        Bir DataFrame'deki tüm mumları sırayla işleyerek durumu oluşturur.
+
+        Parameters
+        ----------
+        symbol : str
+            Sembol adı.
+
+        df : pandas.DataFrame
+            'high', 'low' ve 'close' sütunlarına sahip, zamana göre sıralı DataFrame.
+
+        fib_window : int, optional
+            Fibonacci seviyeleri için kullanılan mum sayısı. Varsayılan değer 50.
+
+        Returns
+        -------
+        SymbolState
+            Son muma kadar güncellenmiş durum.
+        """
+        state = cls(symbol, fib_window=fib_window)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        for timestamp, h, l, c in zip(df.index, high, low, close):
+            state.update(timestamp, h, l, c)
+        return state
+
+    def update(self, timestamp, high, low, close):
+        """
+        Kapanan yeni bir mumu işler.
+
+        Parameters
+        ----------
+        timestamp : object
+            Mumun zamanı. Puanlama çıktısındaki 'date' alanında kullanılır.
+
+        high, low, close : float
+            Mumun en yüksek, en düşük ve kapanış fiyatları.
+        """
+        self.count += 1
+        ema5 = self.ema5.update(close)
+        ema10 = self.ema10.update(close)
+        pdx, mdx, adx = self.dmi.update(high, low, close)
+        self.highest.update(high)
+        self.lowest.update(low)
+        self.history.append((timestamp, close, ema5, ema10, pdx, mdx))
+
+    def fibonacci_levels(self):
+        """
+        calculate_fibonacci_levels fonksiyonunun son `fib_window` mum için O(1) karşılığı.
+
+        Returns
+        -------
+        dict
+            Fibonacci seviyeleri.
+        """
+        high = self.highest.value
+        low = self.lowest.value
+        diff = high - low
+
+        return {
+            '0.236': high - 0.236 * diff,
+            '0.382': high - 0.382 * diff,
+            '0.5': high - 0.5 * diff,
+            '0.618': high - 0.618 * diff,
+            '0.786': high - 0.786 * diff,
+        }
+
+    def score(self, min_candles=200):
+        """
+        Execution.analyze_and_score ile aynı puanlamayı saklanan durum üzerinden yapar.
+
+        Parameters
+        ----------
+        min_candles : int, optional
+            Puanlama için gereken minimum mum sayısı. Varsayılan değer 200.
+
+        Returns
+        -------
+        dict
+            analyze_and_score ile aynı alanlara sahip sözlük.
+        """
+        if self.count == 0:
+            return {
+                'symbol': self.symbol,
+                'error': 'All data is NaN',
+            }
+
+        if self.count < min_candles:
+            return {
+                'symbol': self.symbol,
+                'error': 'Insufficient data for EMA calculations',
+            }
+
+        points = 1
+        fib_levels = self.fibonacci_levels()
+        history = list(self.history)
+
+        for i in range(1, 4):
+            _, close, ema5, ema10, pdx, mdx = history[i]
+            _, prev_close, prev_ema5, prev_ema10, prev_pdx, prev_mdx = history[i - 1]
+
+            # EMA 5 combinations
+            ema_sma_points = 1
+            if ema5 > ema10 and prev_ema5 < prev_ema10:
+                ema_sma_points *= 1.2
+            elif ema5 < ema10 and prev_ema5 > prev_ema10:
+                ema_sma_points /= 1.2
+
+            points *= ema_sma_points
+
+            # fib
+            fib_points = 1
+            for level in fib_levels.values():
+                if close > level > prev_close:
+                    fib_points *= 1.2
+                elif close < level < prev_close:
+                    fib_points /= 1.2
+
+            points *= fib_points
+
+            # ADX
+            pdx_points = 1
+            if pdx > mdx and prev_pdx < prev_mdx:
+                pdx_points *= 1.2
+            elif pdx < mdx and prev_pdx > prev_mdx:
+                pdx_points /= 1.2
+
+            points *= pdx_points
+
+        timestamp, close = history[-1][0], history[-1][1]
+        return {
+            'symbol': self.symbol,
+            'date': timestamp,
+            'price': close,
+            "fib_points": fib_points,
+            'ema_sma_points': ema_sma_points,
+            "pdx_points": pdx_points,
+            'points': points
+        }
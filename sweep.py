@@ -0,0 +1,394 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+import cloudpickle
+
+# Koordinatör ve işçilerin ortak anahtarı (hex). Mesajlar pickle ile taşındığı için bağlantılar bu anahtarla (HMAC)
+# doğrulanır; anahtarı bilmeyen bir süreç iş alamaz ve sonuç gönderemez.
+AUTHKEY_ENV = 'CRYANAL_SWEEP_AUTHKEY'
+
+
+def _authkey(authkey=None):
+    if authkey is not None:
+        return authkey.encode() if isinstance(authkey, str) else authkey
+    if os.environ.get(AUTHKEY_ENV):
+        return bytes.fromhex(os.environ[AUTHKEY_ENV])
+    return None
+
+
+class _Job:
+    def __init__(self, function, units):
+        self.function = cloudpickle.dumps(function)
+        self.units = list(units)
+        self.results = [None] * len(self.units)
+        self.done = [False] * len(self.units)
+        self.attempts = [0] * len(self.units)
+        self.remaining = len(self.units)
+        self.completed = deque()
+        self.error = None
+
+
+class SweepCoordinator:
+    """
+    Parametre taramasını birden fazla makinedeki işçi süreçlerine dağıtan koordinatör. İşçiler TCP üzerinden bağlanır
+    (multiprocessing.connection, ortak anahtarla doğrulanır) ve iş birimlerini sırayla çeker; sonuçlar koordinatörde
+    toplanır. Fonksiyon ve ortak veri (context) cloudpickle ile gönderilir, böylece betiklerde (__main__) tanımlı
+    fonksiyonlar da çalıştırılabilir; ortak veri her işçiye bağlantı başına bir kez gider.
+
+    Bağlantısı kopan ya da `heartbeat_timeout` saniye boyunca ses vermeyen işçinin elindeki birim kuyruğa geri konur ve
+    başka bir işçiye verilir. Hata veren ya da işçisi kaybedilen birimler `max_attempts` kez denenir; yine başarısız
+    olursa map hatayı yükseltir. Böylece işçiyi çökerten bir birim (segfault, bellek yetersizliği) taramayı kilitlemez.
+
+        with SweepCoordinator(context=data, host='0.0.0.0', port=8765, authkey=key) as coordinator:
+            results = coordinator.map(evaluate, chunks)
+
+    Parameters
+    ----------
+    context : object, optional
+        Her birimle birlikte fonksiyona verilen ortak veri. Örneğin shared_data.PortableOHLCV.
+
+    host : str, optional
+        Dinlenecek adres. Diğer makinelerden bağlanılacaksa '0.0.0.0'. Varsayılan değer '127.0.0.1'.
+
+    port : int, optional
+        Dinlenecek port. 0 ise boş bir port seçilir. Varsayılan değer 0.
+
+    authkey : bytes or str, optional
+        Ortak anahtar. Verilmezse CRYANAL_SWEEP_AUTHKEY ortam değişkeni, o da yoksa rastgele bir anahtar kullanılır
+        (sadece local_workers ile başlatılan işçiler bağlanabilir).
+
+    local_workers : int, optional
+        Başlangıçta bu makinede başlatılacak işçi süreci sayısı. Varsayılan değer 0.
+
+    heartbeat_timeout : float, optional
+        Birim işleyen bir işçiden bu kadar saniye mesaj gelmezse işçi kaybedilmiş sayılır. Varsayılan değer 30.
+
+    max_attempts : int, optional
+        Hata veren ya da işçisi kaybedilen bir birimin en fazla kaç kez deneneceği. Varsayılan değer 3.
+    """
+
+    def __init__(self, context=None, host='127.0.0.1', port=0, authkey=None, local_workers=0, heartbeat_timeout=30.0,
+                 max_attempts=3):
+        self.authkey = _authkey(authkey) or os.urandom(16)
+        self.listener = Listener((host, port), authkey=self.authkey)
+        self.address = self.listener.address
+        self.context = cloudpickle.dumps(context)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.local_workers = local_workers
+        self.processes = []
+        self.jobs = {}
+        self.pending = deque()
+        self.closed = False
+        self.condition = threading.Condition()
+        self.counters = {'connections': 0, 'workers': 0, 'units': 0, 'completed': 0, 'requeued': 0, 'errors': 0,
+                         'lost_workers': 0}
+        self.thread = None
+
+    def start(self):
+        """Bağlantıları kabul etmeye başlar ve varsa yerel işçileri başlatır."""
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+        self.thread.start()
+        self.processes.extend(start_local_workers(self.address, self.local_workers, self.authkey))
+        return self
+
+    def close(self):
+        """İşçilere işin bittiğini bildirir, dinlemeyi bırakır ve yerel işçilerin çıkmasını bekler."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.listener.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            'connections' (toplam bağlantı), 'workers' (bağlı işçi), 'units' (kuyruğa konan birim), 'completed',
+            'requeued' (kaybedilen işçilerden geri alınan ya da tekrar denenen), 'errors' (hata veren deneme),
+            'lost_workers' ve 'pending' (kuyrukta bekleyen) sayıları.
+        """
+        with self.condition:
+            return dict(self.counters, pending=len(self.pending))
+
+    def map(self, function, units, timeout=None, on_result=None):
+        """
+        function(unit, context) fonksiyonunu tüm birimler için işçilerde çalıştırır.
+
+        Parameters
+        ----------
+        function : callable
+            function(unit, context) -> sonuç. Sonuç pickle ile gönderilebilir olmalıdır.
+
+        units : list
+            İş birimleri. Örneğin parametre kombinasyonlarından oluşan parçalar.
+
+        timeout : float, optional
+            Verilirse bu kadar saniye içinde bitmeyen tarama TimeoutError yükseltir.
+
+        on_result : callable, optional
+            on_result(index, result). Her birimin sonucu geldiğinde map'i çağıran iş parçacığında çağrılır; örneğin
+            sonuçları tarama bitmeden kaydetmek için.
+
+        Returns
+        -------
+        list
+            Sonuçlar, units sırasıyla.
+        """
+        job = _Job(function, units)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            job_id = len(self.jobs)
+            self.jobs[job_id] = job
+            self.pending.extend((job_id, index) for index in range(len(job.units)))
+            self.counters['units'] += len(job.units)
+            self.condition.notify_all()
+        while True:
+            with self.condition:
+                while not job.completed and job.remaining and job.error is None:
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if wait is not None and wait <= 0:
+                        # Kalan birimler işçilere verilmez.
+                        job.error = 'timeout'
+                        raise TimeoutError(f"Tarama {timeout} saniyede bitmedi: {job.remaining} birim kaldı.")
+                    self.condition.wait(wait)
+                ready = []
+                while job.completed:
+                    index = job.completed.popleft()
+                    ready.append((index, job.results[index]))
+                finished = not job.remaining or job.error is not None
+            # on_result (örneğin sonuçların diske yazılması) kilit dışında çağrılır; işçilere birim dağıtımı beklemez.
+            if on_result is not None:
+                for index, result in ready:
+                    on_result(index, result)
+            if finished:
+                break
+        if job.error is not None:
+            raise RuntimeError(f"İş birimi {self.max_attempts} denemede başarısız oldu:\n{job.error}")
+        return job.results
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if self.closed:
+                    return
+                continue
+            except Exception:
+                # Anahtarı tutmayan ya da el sıkışmayı yarıda bırakan bağlantılar reddedilir.
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _next(self):
+        # Bekleyen bir birim gelene ya da koordinatör kapanana kadar bekler.
+        with self.condition:
+            while True:
+                while self.pending:
+                    job_id, index = self.pending.popleft()
+                    job = self.jobs[job_id]
+                    if not job.done[index] and job.error is None:
+                        return job_id, index
+                if self.closed:
+                    return None
+                self.condition.wait()
+
+    def _release(self, job_id, index, result=None, error=None):
+        with self.condition:
+            job = self.jobs[job_id]
+            if job.done[index]:
+                return
+            if error is None:
+                job.results[index] = result
+                job.done[index] = True
+                job.remaining -= 1
+                job.completed.append(index)
+                self.counters['completed'] += 1
+            else:
+                self.counters['errors'] += 1
+                job.attempts[index] += 1
+                if job.attempts[index] >= self.max_attempts:
+                    job.error = error
+                else:
+                    self.pending.append((job_id, index))
+                    self.counters['requeued'] += 1
+            self.condition.notify_all()
+
+    def _requeue(self, job_id, index):
+        with self.condition:
+            job = self.jobs[job_id]
+            if not job.done[index] and job.error is None:
+                # İşçiyi çökerten bir birim her işçiyi sırayla öldürmesin diye kayıplar da deneme sayılır.
+                job.attempts[index] += 1
+                if job.attempts[index] >= self.max_attempts:
+                    job.error = f"{index}. birimi işleyen işçi kaybedildi (bağlantı koptu ya da yaşam sinyali gelmedi)."
+                else:
+                    # Kaybedilen işçinin birimi sıranın başına konur; böylece taramanın sonu gecikmez.
+                    self.pending.appendleft((job_id, index))
+                    self.counters['requeued'] += 1
+            self.counters['lost_workers'] += 1
+            self.condition.notify_all()
+
+    def _serve(self, conn):
+        current = None
+        sent_jobs = set()
+        with self.condition:
+            self.counters['connections'] += 1
+            self.counters['workers'] += 1
+        try:
+            if not conn.poll(self.heartbeat_timeout):
+                return
+            conn.recv()
+            conn.send(('context', self.context, self.heartbeat_timeout / 3))
+            while True:
+                current = self._next()
+                if current is None:
+                    conn.send(('done',))
+                    return
+                job_id, index = current
+                job = self.jobs[job_id]
+                function = None if job_id in sent_jobs else job.function
+                conn.send(('unit', job_id, index, job.units[index], function))
+                sent_jobs.add(job_id)
+                while True:
+                    if not conn.poll(self.heartbeat_timeout):
+                        raise TimeoutError
+                    message = conn.recv()
+                    if message[0] != 'heartbeat':
+                        break
+                kind, _, _, payload = message
+                self._release(job_id, index, **{'result' if kind == 'result' else 'error': payload})
+                current = None
+        except (EOFError, OSError, TimeoutError):
+            if current is not None:
+                self._requeue(*current)
+        finally:
+            conn.close()
+            with self.condition:
+                self.counters['workers'] -= 1
+
+
+def run_worker(address, authkey=None, connect_timeout=30.0):
+    """
+    Koordinatöre bağlanıp iş birimlerini çeker ve sonuçlarını gönderir; koordinatör işin bittiğini bildirene kadar
+    çalışır. Birim işlenirken ayrı bir iş parçacığı düzenli olarak yaşam sinyali gönderir.
+
+    Parameters
+    ----------
+    address : tuple
+        Koordinatörün (host, port) adresi.
+
+    authkey : bytes or str, optional
+        Ortak anahtar. Verilmezse CRYANAL_SWEEP_AUTHKEY ortam değişkeni.
+
+    connect_timeout : float, optional
+        Koordinatör henüz dinlemiyorsa bağlanmak için bu kadar saniye tekrar denenir. Varsayılan değer 30.
+
+    Returns
+    -------
+    int
+        İşlenen birim sayısı.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            conn = Client(tuple(address), authkey=_authkey(authkey))
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+    lock = threading.Lock()
+    busy = threading.Event()
+    stopped = threading.Event()
+    processed = 0
+    try:
+        conn.send(('hello', f'{socket.gethostname()}:{os.getpid()}'))
+        _, context, heartbeat_interval = conn.recv()
+        context = cloudpickle.loads(context)
+
+        def heartbeat():
+            while not stopped.wait(heartbeat_interval):
+                if busy.is_set():
+                    with lock:
+                        conn.send(('heartbeat',))
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        functions = {}
+        while True:
+            message = conn.recv()
+            if message[0] == 'done':
+                return processed
+            _, job_id, index, unit, function = message
+            if function is not None:
+                functions[job_id] = cloudpickle.loads(function)
+            busy.set()
+            try:
+                reply = ('result', job_id, index, functions[job_id](unit, context))
+            except Exception:
+                reply = ('error', job_id, index, traceback.format_exc())
+            finally:
+                busy.clear()
+            with lock:
+                conn.send(reply)
+            processed += 1
+    except (EOFError, OSError):
+        # Koordinatör kapandı ya da bağlantı koptu.
+        return processed
+    finally:
+        stopped.set()
+        conn.close()
+
+
+def start_local_workers(address, n, authkey):
+    """
+    Bu makinede n işçi süreci başlatır (`python sweep.py worker`). Tek makinede birden fazla işçiyle deneme yapmak ya da
+    koordinatörün çekirdeklerini de kullanmak içindir.
+
+    Returns
+    -------
+    list
+        subprocess.Popen nesneleri.
+    """
+    env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+    host, port = address
+    return [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker', '--host', host, '--port', str(port)],
+                             env=env)
+            for _ in range(n)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dağıtık parametre taraması işçisi.")
+    parser.add_argument('command', choices=['worker'])
+    parser.add_argument('--host', default='127.0.0.1', help="Koordinatörün adresi.")
+    parser.add_argument('--port', type=int, default=8765, help="Koordinatörün portu.")
+    parser.add_argument('--connect-timeout', type=float, default=30.0,
+                        help="Koordinatör dinlemiyorsa bağlanmak için tekrar deneme süresi (saniye).")
+    args = parser.parse_args(argv)
+    if _authkey() is None:
+        parser.error(f"{AUTHKEY_ENV} ortam değişkeni ayarlanmalıdır.")
+    run_worker((args.host, args.port), connect_timeout=args.connect_timeout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from kline_fetch import interval_to_ms
+
+# 2020-01-01 00:00:00 UTC, milisaniye cinsinden.
+DEFAULT_START_TIME = 1577836800000
+
+
+def random_walk_arrays(n_bars, seed=0, interval='1h', start_time=DEFAULT_START_TIME, start_price=100.0,
+                       volatility=0.01):
+    """
+    Tohumlu, geometrik rastgele yürüyüş ile deterministik OHLCV sütunları üretir. Aynı parametreler her zaman aynı veriyi
+    verir; internet erişimi gerektirmez.
+
+    Parameters
+    ----------
+    n_bars : int
+        Mum sayısı.
+
+    seed : int, optional
+        Rastgele sayı üreteci tohumu. Varsayılan değer 0.
+
+    interval : str, optional
+        Candlestick intervali. Zaman damgalarının aralığını belirler. Varsayılan değer '1h'.
+
+    start_time : int, optional
+        İlk mumun milisaniye cinsinden açılış zamanı. Varsayılan değer 2020-01-01.
+
+    start_price : float, optional
+        Başlangıç fiyatı. Varsayılan değer 100.
+
+    volatility : float, optional
+        Mum başına log getirinin standart sapması. Varsayılan değer 0.01.
+
+    Returns
+    -------
+    dict
+        kline_store.STORE_COLUMNS ile aynı adlara ve tiplere sahip numpy dizileri.
+    """
+    rng = np.random.default_rng(seed)
+    step = interval_to_ms(interval)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0.0, volatility / 2, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.lognormal(3.0, 1.0, n_bars)
+    taker_buy = volume * rng.uniform(0.3, 0.7, n_bars)
+    open_time = start_time + np.arange(n_bars, dtype=np.int64) * step
+    return {
+        'open_time': open_time,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+        'close_time': open_time + step - 1,
+        'quote_asset_volume': volume * close,
+        'number_of_trades': rng.integers(10, 1000, n_bars).astype(np.int64),
+        'taker_buy_base_asset_volume': taker_buy,
+        'taker_buy_quote_asset_volume': taker_buy * close,
+    }
+
+
+def random_walk_frame(n_bars, seed=0, interval='1h', **kwargs):
+    """
+    random_walk_arrays verisini get_binance_data ile aynı yapıda bir DataFrame olarak döndürür: 'open_time' pandas
+    datetime tipinde indekstir, fiyat ve hacim sütunları float tipindedir.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Sentetik kline verileri.
+    """
+    arrays = random_walk_arrays(n_bars, seed=seed, interval=interval, **kwargs)
+    index = pd.to_datetime(arrays.pop('open_time'), unit='ms')
+    index.name = 'open_time'
+    return pd.DataFrame(arrays, index=index)
+
+
+def random_walk_klines(n_bars, seed=0, interval='1h', **kwargs):
+    """
+    random_walk_arrays verisini Binance API'nin döndürdüğü satır formatında döndürür: fiyat ve hacimler metin, zamanlar
+    ve işlem sayısı tam sayıdır, son sütun 'ignore' değeridir.
+
+    Returns
+    -------
+    list
+        Kline satırları.
+    """
+    arrays = random_walk_arrays(n_bars, seed=seed, interval=interval, **kwargs)
+    columns = []
+    for column, values in arrays.items():
+        if values.dtype == np.int64:
+            columns.append(values.tolist())
+        else:
+            columns.append([f'{value:.8f}' for value in values.tolist()])
+    return [list(row) + ['0'] for row in zip(*columns)]
+
+
+def synthetic_universe(n_symbols, n_bars, seed=0, interval='1h', quote_asset='USDT'):
+    """
+    Birden fazla sembol için sentetik veri üretir. Her sembolün tohumu seed + sıra numarasıdır.
+
+    Parameters
+    ----------
+    n_symbols : int
+        Sembol sayısı.
+
+    n_bars : int
+        Sembol başına mum sayısı.
+
+    seed : int, optional
+        Temel tohum. Varsayılan değer 0.
+
+    interval : str, optional
+        Candlestick intervali. Varsayılan değer '1h'.
+
+    quote_asset : str, optional
+        Sembol adlarının karşı varlığı. Varsayılan değer 'USDT'.
+
+    Returns
+    -------
+    dict
+        Sembol -> random_walk_frame çıktısı. Semboller 'SYN000USDT', 'SYN001USDT', ... şeklindedir.
+    """
+    return {f'SYN{i:03d}{quote_asset}': random_walk_frame(n_bars, seed=seed + i, interval=interval,
+                                                          start_price=10.0 + 10.0 * i)
+            for i in range(n_symbols)}
@@ -0,0 +1,183 @@
+import asyncio
+import time
+
+import aiohttp
+
+from async_fetch import MARKETS, fetch_many_async, kline_weight
+from kline_fetch import INTERVAL_MS
+
+
+class TailRefresher:
+    """
+    Sembollerin son kapanmış mumlarını hatırlar ve her yenilemede sadece bu mumlardan sonra kapanmış yeni mumları
+    çeker. İstek limiti eksik mum sayısına göre seçildiği için (vadeli işlemlerde 100'den az mum için ağırlık 1)
+    yenileme başına API ağırlığı ve işlem süresi geçmişin uzunluğuna değil yeni mum sayısına bağlıdır. Yeni mumlar
+    sırayla on_close ile işlenir; yeni mumu olmayan semboller için istek atılmaz ve yeniden puanlama yapılmaz.
+
+    Parameters
+    ----------
+    interval : str
+        Candlestick intervali. Aylık ('1M') interval desteklenmez.
+
+    on_close : callable
+        on_close(symbol, kline). kline REST formatında satırdır. Örneğin kline_stream.LiveRanking.on_close ya da
+        Execution.on_candle_close.
+
+    last_open_times : dict
+        Sembol -> bellekteki son kapanmış mumun milisaniye cinsinden açılış zamanı.
+
+    market : str, optional
+        'futures' ya da 'spot'. Varsayılan değer 'futures'.
+
+    concurrency : int, optional
+        Aynı anda açık olabilecek maksimum istek sayısı. Varsayılan değer 20.
+
+    Attributes
+    ----------
+    last : dict
+        Sembol -> işlenen son mumun açılış zamanı.
+
+    counters : dict
+        'cycles' (yenileme sayısı), 'requests' (istek atılan sembol sayısı), 'weight' (tahmini istek ağırlığı),
+        'candles' (işlenen yeni mum sayısı), 'rescored' (yeni mumu olan sembol sayısı) ve 'errors' (run içinde istek
+        hatasıyla biten yenileme sayısı) toplamları.
+    """
+
+    def __init__(self, interval, on_close, last_open_times, market='futures', concurrency=20):
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Desteklenmeyen interval: {interval}")
+        self.interval = interval
+        self.step = INTERVAL_MS[interval]
+        self.on_close = on_close
+        self.last = dict(last_open_times)
+        self.market = market
+        self.concurrency = concurrency
+        self.counters = {'cycles': 0, 'requests': 0, 'weight': 0, 'candles': 0, 'rescored': 0, 'errors': 0}
+
+    def boundary(self, now=None):
+        """now (milisaniye, verilmezse şu an) anından önceki son interval sınırı; öncesinde açılan mumlar kapalıdır."""
+        now = int(time.time() * 1000) if now is None else int(now)
+        return now - now % self.step
+
+    def due(self, now=None):
+        """
+        Yeni kapanmış mumu olması beklenen semboller.
+
+        Returns
+        -------
+        dict
+            Sembol -> çekilecek ilk mumun açılış zamanı.
+        """
+        last_open = self.boundary(now) - self.step
+        return {symbol: last + self.step for symbol, last in self.last.items() if last < last_open}
+
+    async def refresh_async(self, now=None):
+        """
+        Sembollerin son mumlarından sonra kapanmış mumları çeker ve sırayla on_close ile işler.
+
+        Parameters
+        ----------
+        now : int, optional
+            Milisaniye cinsinden şu an. Verilmezse sistem saati.
+
+        Returns
+        -------
+        dict
+            Sembol -> işlenen yeni mum sayısı. Sadece yeni mumu olan semboller bulunur.
+        """
+        last_open = self.boundary(now) - self.step
+        due = self.due(now)
+        self.counters['cycles'] += 1
+        if not due:
+            return {}
+
+        _, max_limit, _ = MARKETS[self.market]
+        self.counters['requests'] += len(due)
+        self.counters['weight'] += sum(kline_weight(self.market, min(max_limit, (last_open - start) // self.step + 1))
+                                       for start in due.values())
+        klines = await fetch_many_async(list(due), self.interval, due, last_open, market=self.market,
+                                        concurrency=self.concurrency)
+
+        changed = {}
+        for symbol, rows in klines.items():
+            for row in rows:
+                # Kapanmamış ya da daha önce işlenmiş mumlar atlanır.
+                if row[0] <= self.last[symbol] or row[0] > last_open:
+                    continue
+                self.on_close(symbol, row)
+                self.last[symbol] = row[0]
+                changed[symbol] = changed.get(symbol, 0) + 1
+        self.counters['candles'] += sum(changed.values())
+        self.counters['rescored'] += len(changed)
+        return changed
+
+    def refresh(self, now=None):
+        """refresh_async fonksiyonunun senkron kodda kullanılabilen hali."""
+        return asyncio.run(self.refresh_async(now))
+
+    def run(self, cycles=None, settle=2.0, retry_delay=5.0, max_retries=3, report=None):
+        """
+        Zamanlayıcı modu: her interval sınırından `settle` saniye sonra yeni mumları çeker. Bazı sembollerin son mumu
+        henüz gelmediyse `retry_delay` saniye arayla en fazla `max_retries` kez tekrar denenir. Bellekteki veri
+        başlangıçta geride kalmışsa ilk yenileme beklemeden yapılır. İstek hatasıyla biten (async_fetch'in tekrar
+        denemeleri tükenmiş) bir yenileme döngüyü bitirir ama zamanlayıcıyı durdurmaz: hata counters['errors'] ile
+        sayılır, işlenen son mumlar değişmediği için eksik mumlar bir sonraki sınırda çekilir. Ctrl+C ile
+        durdurulabilir.
+
+        Parameters
+        ----------
+        cycles : int, optional
+            Verilirse bu kadar yenileme döngüsünden sonra durur. Verilmezse süresiz çalışır.
+
+        settle : float, optional
+            Sınırdan sonra borsanın mumu kapatması için beklenen süre (saniye). Varsayılan değer 2.
+
+        retry_delay : float, optional
+            Eksik mumlar için tekrar denemeden önce beklenen süre (saniye). Varsayılan değer 5.
+
+        max_retries : int, optional
+            Döngü başına maksimum tekrar deneme sayısı. Varsayılan değer 3.
+
+        report : callable, optional
+            report(changed). Yeni mum işlenen her döngüden sonra sembol -> yeni mum sayısı sözlüğü ile çağrılır.
+
+        Returns
+        -------
+        dict
+            counters.
+        """
+        async def refresh():
+            try:
+                return await self.refresh_async()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self.counters['errors'] += 1
+                print(f"{self.interval} yenilemesi başarısız oldu, sonraki sınırda tekrar denenecek: {error!r}")
+                return None
+
+        async def main():
+            done = 0
+            failed = False
+            while cycles is None or done < cycles:
+                if failed or not self.due():
+                    now = time.time() * 1000
+                    await asyncio.sleep((self.step - now % self.step) / 1000 + settle)
+                changed = await refresh()
+                failed = changed is None
+                changed = changed or {}
+                for _ in range(max_retries):
+                    if failed or not self.due():
+                        break
+                    await asyncio.sleep(retry_delay)
+                    more = await refresh()
+                    failed = more is None
+                    for symbol, count in (more or {}).items():
+                        changed[symbol] = changed.get(symbol, 0) + count
+                if report is not None and changed:
+                    report(changed)
+                done += 1
+            return self.counters
+
+        try:
+            return asyncio.run(main())
+        except KeyboardInterrupt:
+            return self.counters
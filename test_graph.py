@@ -2,6 +2,12 @@ import requests
 import pandas as pd
 import numpy as np
 import talib
+import signal_engine
+from kline_fetch import api_url
+from kline_store import KlineStore
+from ohlcv import OHLCV
+from resample import ResampledStore
+from async_fetch import fetch_chunked
 from datetime import datetime
 import matplotlib.pyplot as plt
 
@@ -10,7 +16,7 @@ pd.set_option('display.width', 1000)
 pd.set_option('display.max_rows', None)
 
 
-def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
+def get_binance_data(symbol, interval, start_time, end_time, limit=5000, store=None, chunked=False):
     """
     Binance API üzerinden belirli bir zaman aralığı için belirli bir sembolün kline (candlestick) verilerini çeker.
 
@@ -31,37 +37,48 @@ def get_binance_data(symbol, interval, start_time, end_time, limit=5000):
     limit : int, optional
         Tek bir istekte çekilebilecek maksimum kline sayısı. Varsayılan değer 5000.
 
+    store : kline_store.KlineStore, optional
+        Verilirse veri yerel depodan okunur ve sadece depoda eksik olan aralıklar API'den çekilir. Bu durumda 5000 satır
+        sınırı uygulanmaz. Varsayılan değer None.
+
+    chunked : bool, optional
+        True ise aralık mum sınırlarına hizalı pencerelere bölünüp pencereler eşzamanlı çekilir ve birleştirilir. Bu modda
+        5000 satır sınırı yoktur, istenen uzunlukta aralık çekilebilir. Varsayılan değer False.
+
     Returns
     -------
     pandas.DataFrame
         Binance'ten alınan kline verileri. Sütunlar: 'open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'.
-        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür.
+        'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume'.
+        DataFrame 'open_time' sütunu üzerine indekslenmiştir ve bu sütun pandas datetime tipine dönüştürülmüştür. Fiyat ve
+        hacim sütunları float64, zamanlar ve işlem sayısı int64 tipindedir.
     """
-    base_url = "https://api.binance.com/api/v3/klines"
-    columns = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume',
-               'number_of_trades', 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+    if store is not None:
+        return store.load_frame(symbol, interval, start_time, end_time)
+
+    base_url = f"{api_url()}/api/v3/klines"
     data = []
 
-    while start_time < end_time:
-        url = f"{base_url}?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
-        response = requests.get(url)
-        temp_data = response.json()
-        data.extend(temp_data)
+    if chunked:
+        data = fetch_chunked(symbol, interval, start_time, end_time)
+    else:
+        while start_time < end_time:
+            url = f"{base_url}?symbol={symbol}&interval={interval}&startTime={start_time}&endTime={end_time}&limit={limit}"
+            response = requests.get(url)
+            temp_data = response.json()
+            data.extend(temp_data)
 
-        if len(temp_data) == 0:
-            break
-        else:
-            start_time = temp_data[-1][0] + 1
+            if len(temp_data) == 0:
+                break
+            else:
+                start_time = temp_data[-1][0] + 1
 
-        if len(data) >= 5000:
-            data = data[:5000]
-            break
+            if len(data) >= 5000:
+                data = data[:5000]
+                break
 
-    df = pd.DataFrame(data, columns=columns)
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-    df.set_index('open_time', inplace=True)
-    return df
+    # Satırlar bir kez tipli sütunlara ayrıştırılır; fiyat sütunları tekrar dönüştürülmeden kullanılır.
+    return OHLCV.from_klines(data).to_frame()
 
 
 def calculate_points(df, rsip=1.4, macdp=1.2):
@@ -81,10 +98,10 @@ def calculate_points(df, rsip=1.4, macdp=1.2):
     """
     points = 1
 
-    open_ = df['open'].astype(float)
-    close = df['close'].astype(float)
-    high = df['high'].astype(float)
-    low = df['low'].astype(float)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
 
     # RSI
     rsi = talib.RSI(close, timeperiod=14)
@@ -116,6 +133,14 @@ symbol = 'ETHUSDT'
 interval = "1d"
 start_time = "2020-01-01 00:00:00"
 end_time = "2023-05-07 00:00:00"
+# Yerel kline deposu. Daha önce çekilen aralıklar diskten okunur, sadece eksik kısımlar API'den çekilir.
+# İnternet erişimi yoksa offline=True ile sadece depodaki veri kullanılır. Depoyu kullanmamak için None yapın.
+kline_store = KlineStore('klines', fetcher=fetch_chunked, offline=False)
+# Taban interval. Verilirse (örneğin '1h') `interval` mumları depodaki bu intervalin mumlarından yerel olarak türetilir;
+# interval değiştirmek yeni bir indirme gerektirmez. Her intervali ayrı çekmek için None yapın.
+base_interval = None
+if kline_store is not None and base_interval:
+    kline_store = ResampledStore(kline_store, base_interval)
 
 start_time_unix = int(datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
 end_time_unix = int(datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S").timestamp()) * 1000
@@ -125,16 +150,19 @@ end_time_unix = int(datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S").timestamp()
 buy_th = 1.5
 # Satım/Short işlem eşik değeri
 sell_th = 0.5
+# Vektörel puanları eski (yavaş) yöntemle doğrulamak için True yapın
+parity = False
 
 try:
-    btc_data = get_binance_data(symbol, interval, start_time_unix, end_time_unix)
-    btc_data[['open', 'high', 'low', 'close']] = btc_data[['open', 'high', 'low', 'close']].astype(float)
+    btc_data = get_binance_data(symbol, interval, start_time_unix, end_time_unix, store=kline_store)
 except Exception as e:
     print(f"Error occurred while getting data: {e}")
 
 try:
-    btc_data['Signal'] = btc_data['close'].expanding(min_periods=20).apply(
-        lambda x: calculate_points(btc_data.loc[x.index]))
+    # Puanlar tüm seri için tek geçişte hesaplanır. parity True ise eski expanding().apply sonucuyla karşılaştırılır.
+    btc_data['Signal'] = signal_engine.graph_points_series(btc_data['close'].to_numpy(dtype=float))
+    if parity:
+        signal_engine.check_parity(btc_data, btc_data['Signal'], calculate_points)
 
     btc_data['Buy'] = np.where(btc_data['Signal'] >= buy_th, btc_data['close'], np.nan)
     btc_data['Sell'] = np.where(btc_data['Signal'] <= sell_th, btc_data['close'], np.nan)
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from sweep import SweepCoordinator
+
+
+def _square(unit, context):
+    return unit * unit + context
+
+
+def _exit_once(unit, context):
+    # Birimi ilk alan işçi süreci çöker; birim başka bir işçide tamamlanmalıdır.
+    marker = os.path.join(context, f'{unit}.lost')
+    if unit == 3 and not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return unit
+
+
+def _exit_always(unit, context):
+    if unit == 3:
+        os._exit(1)
+    return unit
+
+
+def test_map():
+    with SweepCoordinator(context=1, local_workers=2) as coordinator:
+        received = {}
+        results = coordinator.map(_square, list(range(20)), timeout=60, on_result=received.__setitem__)
+    assert results == [unit * unit + 1 for unit in range(20)]
+    assert received == dict(enumerate(results))
+
+
+def test_lost_worker_unit_is_requeued(tmp_path):
+    with SweepCoordinator(context=str(tmp_path), local_workers=2) as coordinator:
+        results = coordinator.map(_exit_once, list(range(8)), timeout=60)
+        stats = coordinator.stats()
+    assert results == list(range(8))
+    assert stats['lost_workers'] == 1
+    assert stats['requeued'] == 1
+
+
+def test_unit_that_kills_workers_fails_the_job():
+    with SweepCoordinator(local_workers=3, max_attempts=3) as coordinator:
+        with pytest.raises(RuntimeError, match='kaybedildi'):
+            coordinator.map(_exit_always, list(range(8)), timeout=60)
+        stats = coordinator.stats()
+    assert stats['lost_workers'] == 3
+    assert stats['requeued'] == 2
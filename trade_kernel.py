@@ -0,0 +1,176 @@
+import numpy as np
+
+import profiling
+
+try:
+    from numba import njit
+except ImportError:  # numba kurulu değilse kernel saf Python olarak çalışır.
+    njit = None
+
+LONG = 1
+SHORT = -1
+
+
+def _simulate(close, points, long_signal, short_signal, leverage, exit_th):
+    n = len(close)
+    max_trades = n // 2 + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    side = np.empty(max_trades, dtype=np.int64)
+    pnl = np.empty(max_trades, dtype=np.float64)
+    entry_balance = np.empty(max_trades, dtype=np.float64)
+    exit_balance = np.empty(max_trades, dtype=np.float64)
+
+    n_trades = 0
+    position = 0
+    balance = 100.0
+    highest_balance = 100.0
+    max_drawdown = 0.0
+    entry_price = 0.0
+    entry_at = -1
+    margin_call = False
+    for i in range(n):
+        if position == 0:
+            if margin_call:
+                continue
+            if long_signal[i]:
+                position = LONG
+            elif short_signal[i]:
+                position = SHORT
+            else:
+                continue
+            entry_price = close[i]
+            entry_at = i
+        elif (position == LONG and points[i] < exit_th) or (position == SHORT and points[i] > exit_th):
+            exit_price = close[i]
+            if position == LONG:
+                trade_pnl = (exit_price - entry_price) / entry_price * leverage
+            else:
+                trade_pnl = (entry_price - exit_price) / entry_price * leverage
+            new_balance = balance * (1 + trade_pnl)
+
+            entry_idx[n_trades] = entry_at
+            exit_idx[n_trades] = i
+            side[n_trades] = position
+            pnl[n_trades] = trade_pnl
+            entry_balance[n_trades] = balance
+            exit_balance[n_trades] = new_balance
+            n_trades += 1
+
+            position = 0
+            balance = new_balance
+            highest_balance = max(highest_balance, balance)
+            max_drawdown = max(max_drawdown, highest_balance - balance)
+            if balance <= 0:
+                margin_call = True
+
+    return (entry_idx[:n_trades], exit_idx[:n_trades], side[:n_trades], pnl[:n_trades], entry_balance[:n_trades],
+            exit_balance[:n_trades], balance, max_drawdown)
+
+
+_simulate_jit = njit(cache=True, nogil=True)(_simulate) if njit is not None else None
+
+
+def simulate_arrays(close, points, long_signal, short_signal, leverage, exit_th=0.6):
+    """
+    simulate_trades fonksiyonunun numpy dizileri üzerinde çalışan durum makinesi. numba kuruluysa JIT ile derlenir.
+    İşlem kuralları simulate_trades ile aynıdır: pozisyon yokken long ya da short sinyalinde kapanış fiyatından girilir,
+    long pozisyondan puan exit_th altına düştüğünde, short pozisyondan puan exit_th üstüne çıktığında çıkılır. Bakiye
+    sıfır ya da altına düştüğünde yeni işleme girilmez.
+
+    Parameters
+    ----------
+    close : numpy.ndarray
+        Kapanış fiyatları.
+
+    points : numpy.ndarray
+        Her mum için puan.
+
+    long_signal, short_signal : numpy.ndarray
+        Her mum için bool sinyaller.
+
+    leverage : float
+        Kaldıraç miktarı.
+
+    exit_th : float, optional
+        Pozisyondan çıkış için puan eşiği. Varsayılan değer 0.6.
+
+    Returns
+    -------
+    dict
+        İşlem başına diziler: 'entry_idx', 'exit_idx', 'side' (1 long, -1 short), 'pnl', 'entry_balance', 'exit_balance'.
+    float
+        Simülasyon sonrası elde edilen son bakiye.
+    float
+        Simülasyon sürecinde yaşanan maksimum düşüş miktarı.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    long_signal = np.ascontiguousarray(long_signal, dtype=np.bool_)
+    short_signal = np.ascontiguousarray(short_signal, dtype=np.bool_)
+
+    with profiling.stage('simulate', rows=len(close)):
+        if _simulate_jit is not None:
+            result = _simulate_jit(close, points, long_signal, short_signal, float(leverage), float(exit_th))
+        else:
+            # Saf Python'da liste elemanlarına erişim numpy skalerlerinden çok daha hızlıdır.
+            result = _simulate(close.tolist(), points.tolist(), long_signal.tolist(), short_signal.tolist(),
+                               float(leverage), float(exit_th))
+
+    entry_idx, exit_idx, side, pnl, entry_balance, exit_balance, balance, max_drawdown = result
+    trades = {
+        'entry_idx': entry_idx,
+        'exit_idx': exit_idx,
+        'side': side,
+        'pnl': pnl,
+        'entry_balance': entry_balance,
+        'exit_balance': exit_balance,
+    }
+    return trades, balance, max_drawdown
+
+
+def simulate_trades(df, leverage):
+    """
+    DataFrame'deki sinyaller üzerinde simulate_arrays ile simülasyon yapar ve sonucu hiperparam_sim ve sim_metrics
+    modüllerindeki simulate_trades ile aynı formatta döndürür.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Sütunları 'long_signal', 'short_signal', 'close', 'close_time', ve 'points' olan bir DataFrame.
+
+    leverage : float
+        Ticaretlerde kullanılan kaldıraç miktarı.
+
+    Returns
+    -------
+    list
+        Her işlem için alış zamanı, satış zamanı, işlem tipi, alış ve satış fiyatı, kar/zarar, giriş ve çıkış bakiyesi ve
+        alış puanını içeren sözlüklerin listesi.
+    float
+        Simülasyon sonrası elde edilen son bakiye.
+    float
+        Simülasyon sürecinde yaşanan maksimum düşüş miktarı.
+    """
+    close = df['close'].to_numpy(dtype=np.float64)
+    points = df['points'].to_numpy(dtype=np.float64)
+    trades, balance, max_drawdown = simulate_arrays(close, points, df['long_signal'].to_numpy(),
+                                                    df['short_signal'].to_numpy(), leverage)
+
+    index = df.index
+    close_time = df['close_time'].to_numpy()
+    records = []
+    for i in range(len(trades['pnl'])):
+        entry, exit_ = trades['entry_idx'][i], trades['exit_idx'][i]
+        records.append({
+            "entry_time": index[entry],
+            "close_time": close_time[exit_],
+            "type": "long" if trades['side'][i] == LONG else "short",
+            "entry_price": close[entry],
+            "exit_price": close[exit_],
+            "pnl": trades['pnl'][i],
+            "entry_balance": trades['entry_balance'][i],
+            "exit_balance": trades['exit_balance'][i],
+            "entry_points": points[entry],
+        })
+    return records, balance, max_drawdown
@@ -0,0 +1,221 @@
+import numpy as np
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Kaldıraçlı işlemlerde kar/zarar -%100'e ulaşabilir; sıfırlanan bakiyenin log değeri bu sınırla tutulur.
+LOG_FLOOR = -50.0
+
+
+def columnar_trades(pnl, entry_time=None, exit_time=None, coin=None, days=None):
+    """
+    İşlem dizilerini trade_metrics fonksiyonunun beklediği sütun sözlüğüne çevirir. Verilmeyen sütunlar sözlükte
+    bulunmaz; days verilmezse ve zamanlar varsa gün sayısı zamanlardan (aşağı yuvarlanarak) hesaplanır.
+
+    Parameters
+    ----------
+    pnl : array-like
+        İşlem başına kar/zarar oranı (0.05 = %5).
+
+    entry_time, exit_time : array-like, optional
+        Milisaniye cinsinden giriş ve çıkış zamanları.
+
+    coin : array-like, optional
+        Her işlemin coini (sembol ya da tam sayı kodu).
+
+    days : array-like, optional
+        İşlem başına gün sayısı.
+
+    Returns
+    -------
+    dict
+        'pnl' (float64) ve verilen diğer sütunlar ('entry_time', 'exit_time', 'coin', 'days').
+    """
+    trades = {'pnl': np.asarray(pnl, dtype=np.float64)}
+    if entry_time is not None:
+        trades['entry_time'] = np.asarray(entry_time, dtype=np.int64)
+    if exit_time is not None:
+        trades['exit_time'] = np.asarray(exit_time, dtype=np.int64)
+    if coin is not None:
+        trades['coin'] = np.asarray(coin)
+    if days is not None:
+        trades['days'] = np.asarray(days, dtype=np.float64)
+    elif entry_time is not None and exit_time is not None:
+        trades['days'] = ((trades['exit_time'] - trades['entry_time']) // DAY_MS).astype(np.float64)
+    return trades
+
+
+def max_streaks(pnl):
+    """
+    En uzun üst üste karlı ve zararlı işlem serileri. Kar/zararı sıfır olan işlemler iki seriyi de keser.
+
+    Returns
+    -------
+    int
+        En çok üst üste karlı işlem sayısı.
+    int
+        En çok üst üste zararlı işlem sayısı.
+    """
+    sign = np.sign(pnl)
+    if not len(sign):
+        return 0, 0
+    bounds = np.concatenate(([0], np.flatnonzero(sign[1:] != sign[:-1]) + 1, [len(sign)]))
+    lengths = np.diff(bounds)
+    run_sign = sign[bounds[:-1]]
+    return int(lengths[run_sign > 0].max(initial=0)), int(lengths[run_sign < 0].max(initial=0))
+
+
+def _group_median(values, starts, counts):
+    # Gruplar ardışık ve kendi içinde sıralı olmalıdır.
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+    return (values[lo] + values[hi]) / 2
+
+
+def pnl_summary(pnl, periods_per_year=None):
+    """
+    Kar/zarar dizisinin dağılım metrikleri. trade_metrics'in sermaye eğrisi ve zaman gerektirmeyen kısmıdır; sadece
+    skor için gereken metrikler isteniyorsa (örneğin hiperparam_sim.score_trades) daha ucuzdur.
+
+    Parameters
+    ----------
+    pnl : numpy.ndarray
+        İşlem başına kar/zarar oranı. En az bir işlem olmalıdır.
+
+    periods_per_year : float, optional
+        Verilirse Sharpe ve Sortino oranları sqrt(periods_per_year) ile yıllıklandırılır.
+
+    Returns
+    -------
+    dict
+        'trades', 'win_rate', 'mean_pnl', 'median_pnl', 'min_pnl', 'max_pnl', 'sharpe' ve 'sortino'.
+    """
+    n = len(pnl)
+    # Sıralı dizi bir kez bulunur; en küçük, en büyük, medyan ve karlı işlem sayısı buradan okunur.
+    sorted_pnl = np.sort(pnl)
+    mean = np.add.reduce(pnl) / n
+    centered = pnl - mean
+    std = np.sqrt(np.dot(centered, centered) / (n - 1)) if n > 1 else 0.0
+    losses = np.minimum(pnl, 0.0)
+    downside = np.sqrt(np.dot(losses, losses) / n)
+    scale = np.sqrt(periods_per_year) if periods_per_year else 1.0
+    return {
+        'trades': n,
+        'win_rate': (n - int(np.searchsorted(sorted_pnl, 0.0, side='right'))) / n,
+        'mean_pnl': float(mean),
+        'median_pnl': float((sorted_pnl[(n - 1) // 2] + sorted_pnl[n // 2]) / 2),
+        'min_pnl': float(sorted_pnl[0]),
+        'max_pnl': float(sorted_pnl[-1]),
+        'sharpe': float(mean / std * scale) if std > 0 else np.nan,
+        'sortino': float(mean / downside * scale) if downside > 0 else (np.inf if mean > 0 else np.nan),
+    }
+
+
+def trade_metrics(trades, span=None, periods_per_year=None, per_coin=False):
+    """
+    Sütun formatındaki işlemlerin performans metriklerini vektörel olarak hesaplar. Python döngüsü ve DataFrame
+    kullanılmadığı için bir taramada her parametre seti için çağrılabilecek kadar ucuzdur.
+
+    Sermaye eğrisinde her coin eşit paylı ayrı bir bakiye ile başlar ve kendi işlemleriyle bileşik olarak büyür (her
+    işlemde coinin tüm bakiyesi kullanılır, trade_kernel ile aynı). Toplam bakiye bu bakiyelerin toplamıdır; değişimler
+    çıkış zamanı sırasıyla uygulanır. Maksimum düşüş, zirveden oransal kayıptır (0.25 = %25).
+
+    Parameters
+    ----------
+    trades : dict
+        columnar_trades formatında işlemler. 'pnl' zorunludur. 'exit_time' verilmezse işlemlerin (coin içinde ve coinler
+        arasında) kronolojik sırada olduğu varsayılır. 'coin' verilmezse tüm işlemler tek bir coine ait sayılır.
+
+    span : int, optional
+        Coin başına milisaniye cinsinden test süresi; pozisyonda geçen süre oranı (exposure) bu süreye göre hesaplanır.
+        Verilmezse ilk girişten son çıkışa kadar geçen süre kullanılır.
+
+    periods_per_year : float, optional
+        Verilirse Sharpe ve Sortino oranları sqrt(periods_per_year) ile yıllıklandırılır (örneğin yıllık işlem sayısı).
+        Verilmezse işlem başına oranlar döner.
+
+    per_coin : bool, optional
+        True ise coin bazında metrikler de hesaplanır. Varsayılan değer False.
+
+    Returns
+    -------
+    dict
+        'trades' (işlem sayısı), 'win_rate', 'mean_pnl', 'median_pnl', 'min_pnl', 'max_pnl', 'max_consecutive_wins',
+        'max_consecutive_losses', 'sharpe', 'sortino', 'avg_days' ('days' ya da zamanlar varsa), 'exposure' (zamanlar
+        varsa), 'max_drawdown' ve per_coin True ise coin -> 'trades', 'win_rate', 'mean_pnl', 'median_pnl', 'exposure',
+        'max_drawdown' sözlüğü olan 'per_coin'. Tanımsız oranlar (tek işlem, sıfır varyans) NaN, hiç zararlı işlem yoksa
+        Sortino inf olur.
+    """
+    pnl = np.asarray(trades['pnl'], dtype=np.float64)
+    n = len(pnl)
+    entry_time, exit_time = trades.get('entry_time'), trades.get('exit_time')
+    coin = trades.get('coin')
+    if coin is None:
+        labels, codes = np.zeros(1, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    else:
+        labels, codes = np.unique(coin, return_inverse=True)
+    n_coins = len(labels)
+
+    metrics = {'trades': n}
+    if not n:
+        metrics.update(dict.fromkeys(('win_rate', 'mean_pnl', 'median_pnl', 'min_pnl', 'max_pnl', 'sharpe',
+                                      'sortino'), np.nan))
+        metrics.update(max_consecutive_wins=0, max_consecutive_losses=0, max_drawdown=0.0)
+        if per_coin:
+            metrics['per_coin'] = {}
+        return metrics
+
+    # Zaman sırası: seriler ve toplam sermaye eğrisi çıkış zamanına göre.
+    order = np.argsort(exit_time, kind='stable') if exit_time is not None else np.arange(n)
+    metrics.update(pnl_summary(pnl, periods_per_year))
+    metrics['max_consecutive_wins'], metrics['max_consecutive_losses'] = max_streaks(pnl[order])
+
+    if 'days' in trades:
+        metrics['avg_days'] = float(np.mean(trades['days']))
+    durations = None
+    if entry_time is not None and exit_time is not None:
+        durations = np.asarray(exit_time, dtype=np.int64) - np.asarray(entry_time, dtype=np.int64)
+        if 'days' not in trades:
+            metrics['avg_days'] = float(np.mean(durations // DAY_MS))
+        if span is None:
+            span = int(np.max(exit_time) - np.min(entry_time))
+        metrics['exposure'] = float(durations.sum() / (span * n_coins)) if span > 0 else np.nan
+
+    # Coin bazında bileşik log bakiye: coinler ardışık, coin içinde zaman sırası.
+    if n_coins == 1:
+        by_coin, counts, starts = order, np.array([n]), np.array([0])
+    else:
+        by_coin = np.lexsort((np.argsort(order, kind='stable'), codes))
+        counts = np.bincount(codes, minlength=n_coins)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    with np.errstate(divide='ignore'):
+        log_growth = np.maximum(np.log1p(np.maximum(pnl[by_coin], -1.0)), LOG_FLOOR)
+    log_balance = np.cumsum(log_growth)
+    if n_coins > 1:
+        log_balance -= np.repeat(log_balance[starts] - log_growth[starts], counts)
+
+    # Toplam bakiye: her işlem coininin işlemden önceki bakiyesi * pnl kadar değişim yaratır.
+    change = np.empty(n)
+    change[by_coin] = np.exp(log_balance - log_growth) * pnl[by_coin] / n_coins
+    equity = 1.0 + np.cumsum(change[order])
+    peak = np.maximum(np.maximum.accumulate(equity), 1.0)
+    metrics['max_drawdown'] = float(np.max(1.0 - np.maximum(equity, 0.0) / peak))
+
+    if per_coin:
+        # Gruplara kaydırma eklenerek coin içi kümülatif maksimum tek bir accumulate ile bulunur.
+        shift = codes[by_coin] * (log_balance.max() - log_balance.min() + 1.0)
+        peak = np.maximum(np.maximum.accumulate(log_balance + shift) - shift, 0.0)
+        drawdowns = np.maximum.reduceat(1.0 - np.exp(log_balance - peak), starts)
+        medians = _group_median(pnl[np.lexsort((pnl, codes))], starts, counts)
+        win_counts = np.bincount(codes, weights=pnl > 0, minlength=n_coins)
+        means = np.bincount(codes, weights=pnl, minlength=n_coins) / counts
+        if durations is not None and span:
+            exposures = np.bincount(codes, weights=durations, minlength=n_coins) / span
+        else:
+            exposures = np.full(n_coins, np.nan)
+        metrics['per_coin'] = {
+            label: {'trades': int(count), 'win_rate': float(win / count), 'mean_pnl': float(mean_),
+                    'median_pnl': float(median_), 'exposure': float(exposure), 'max_drawdown': float(drawdown)}
+            for label, count, win, mean_, median_, exposure, drawdown
+            in zip(labels.tolist(), counts, win_counts, means, medians, exposures, drawdowns)
+        }
+    return metrics
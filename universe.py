@@ -0,0 +1,250 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from async_fetch import fetch_many
+from kline_fetch import interval_to_ms
+from kline_store import missing_ranges
+
+_exchange_info_cache = {}
+
+
+def cached_exchange_info(client, ttl=3600, cache_file=None):
+    """
+    client.futures_exchange_info() sonucunu `ttl` saniye boyunca önbellekte tutar. cache_file verilirse sonuç diske de
+    yazılır, böylece aynı gün içinde tekrar çalıştırılan taramalar bu isteği hiç atmaz.
+
+    Parameters
+    ----------
+    client : binance.client.Client
+        Binance istemcisi.
+
+    ttl : float, optional
+        Önbelleğin geçerlilik süresi, saniye cinsinden. Varsayılan değer 3600.
+
+    cache_file : str, optional
+        Disk önbelleği için JSON dosyası. Varsayılan değer None.
+
+    Returns
+    -------
+    dict
+        futures_exchange_info yanıtı.
+    """
+    now = time.time()
+    cached = _exchange_info_cache.get('futures')
+    if cached is None and cache_file and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cached = json.load(f)
+    if cached is not None and now - cached['time'] < ttl:
+        _exchange_info_cache['futures'] = cached
+        return cached['data']
+
+    cached = {'time': now, 'data': client.futures_exchange_info()}
+    _exchange_info_cache['futures'] = cached
+    if cache_file:
+        with open(cache_file, 'w') as f:
+            json.dump(cached, f)
+    return cached['data']
+
+
+def perpetual_symbols(exchange_info, quote_asset='USDT'):
+    """
+    Exchange info içinden karşı varlığı (quoteAsset) tam olarak quote_asset olan ve kontrat türü PERPETUAL olan
+    sembolleri seçer.
+
+    Returns
+    -------
+    list
+        Sembol adları.
+    """
+    return [s['symbol'] for s in exchange_info['symbols']
+            if s['quoteAsset'] == quote_asset and s['contractType'] == 'PERPETUAL']
+
+
+def store_volumes(store, symbols, interval='1d', days=30, end_time=None, market='futures', concurrency=20):
+    """
+    Yerel kline deposundaki günlük mumlardan son `days` kapanmış mumun toplam quote hacmini hesaplar. Aralık mum
+    sınırlarına hizalanır; depoda eksik olan kısımlar (genellikle sadece son kapanan mum) tüm semboller için önceden
+    bulunur ve tek bir fetch_many çağrısıyla ortak bağlantı havuzu üzerinden eşzamanlı çekilir. Depo güncelse hiç istek
+    atılmaz; hacimler diskteki sütunlardan toplanır.
+
+    Parameters
+    ----------
+    store : kline_store.KlineStore
+        Vadeli işlem mumlarını tutan depo.
+
+    symbols : iterable
+        Semboller.
+
+    interval : str, optional
+        Depodaki interval. Varsayılan değer '1d'.
+
+    days : int, optional
+        Toplanacak mum sayısı. Varsayılan değer 30.
+
+    end_time : int, optional
+        Milisaniye cinsinden bitiş zamanı. Verilmezse şimdiki zaman kullanılır; bu andan önce kapanan son mum dahildir.
+
+    market : str, optional
+        Eksik mumların çekileceği piyasa. Varsayılan değer 'futures'.
+
+    concurrency : int, optional
+        Aynı anda açık olabilecek maksimum istek sayısı. Varsayılan değer 20.
+
+    Returns
+    -------
+    dict
+        Sembol -> son `days` mumun toplam quote hacmi.
+    """
+    symbols = list(symbols)
+    step = interval_to_ms(interval)
+    end_time = end_time or int(time.time() * 1000)
+    # Son kapanmış mumun kapanışı ve `days` mum öncesinin açılışı.
+    end_time = end_time - end_time % step - 1
+    start_time = end_time + 1 - days * step
+
+    missing = {}
+    for symbol in symbols:
+        gaps = missing_ranges(store.covered_ranges(symbol, interval), start_time, end_time)
+        if gaps:
+            missing[symbol] = gaps
+    if missing and not store.offline:
+        # Her sembol ilk boşluğundan itibaren çekilir; aradaki saklı mumlar birleştirmede tekrar eklenmez.
+        starts = {symbol: gaps[0][0] for symbol, gaps in missing.items()}
+        klines = fetch_many(list(missing), interval, starts, end_time, market=market, concurrency=concurrency)
+        for symbol, rows in klines.items():
+            store.add_klines(symbol, interval, rows, [[starts[symbol], end_time]])
+
+    volumes = {}
+    for symbol in symbols:
+        arrays = store.read_partition(symbol, interval)
+        lo, hi = np.searchsorted(arrays['open_time'], [start_time, end_time])
+        volumes[symbol] = float(np.sum(arrays['quote_asset_volume'][lo:hi]))
+    return volumes
+
+
+def _top_indices(values, candidates, limit):
+    """
+    candidates içinden values değeri en büyük `limit` indeksi büyükten küçüğe sıralı döndürür. Önce argpartition ile
+    O(n) seçim yapılır, sadece seçilen `limit` eleman sıralanır.
+    """
+    if limit < len(candidates):
+        candidates = candidates[np.argpartition(-values[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def top_by_volume(volumes, limit):
+    """
+    Hacmi en yüksek `limit` sembolü büyükten küçüğe sıralı döndürür.
+
+    Parameters
+    ----------
+    volumes : dict
+        Sembol -> hacim.
+
+    limit : int
+        Döndürülecek sembol sayısı.
+
+    Returns
+    -------
+    list
+        Sembol adları.
+    """
+    symbols = list(volumes)
+    values = np.fromiter(volumes.values(), dtype=np.float64, count=len(symbols))
+    return [symbols[i] for i in _top_indices(values, np.arange(len(symbols)), limit)]
+
+
+class TickerIndex:
+    """
+    Toplu ticker yanıtı üzerine kurulan indeks. Semboller bir sözlükle O(1) sürede bulunur, hacimler numpy dizilerinde
+    tutulur. Karşı varlık (quote asset) filtresi kesindir: 'USDTTRY' gibi sadece 'USDT' içeren semboller USDT çifti
+    sayılmaz.
+
+    Parameters
+    ----------
+    tickers : list
+        client.get_ticker() ya da client.futures_ticker() yanıtı.
+
+    exchange_info : dict, optional
+        Exchange info yanıtı. Verilirse karşı varlık 'quoteAsset' alanından, listelenme zamanı 'onboardDate' alanından
+        (vadeli işlemlerde bulunur) alınır. Verilmezse karşı varlık sembolün sonekinden belirlenir.
+
+    listing_times : dict, optional
+        Sembol -> milisaniye cinsinden listelenme zamanı. exchange_info içinde olmayan semboller için kullanılır.
+    """
+
+    def __init__(self, tickers, exchange_info=None, listing_times=None):
+        self.tickers = list(tickers)
+        self.symbols = np.array([t['symbol'] for t in self.tickers], dtype=object)
+        self.position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.volume = np.array([float(t['volume']) for t in self.tickers], dtype=np.float64)
+        self.quote_volume = np.array([float(t['quoteVolume']) for t in self.tickers], dtype=np.float64)
+
+        infos = {s['symbol']: s for s in exchange_info['symbols']} if exchange_info else {}
+        listing_times = dict(listing_times or {})
+        for symbol, info in infos.items():
+            if 'onboardDate' in info:
+                listing_times[symbol] = info['onboardDate']
+        self.quote_asset = np.array([infos[s]['quoteAsset'] if s in infos else None for s in self.symbols],
+                                    dtype=object)
+        self.listed_at = np.array([listing_times.get(s, np.nan) for s in self.symbols], dtype=np.float64)
+
+    def get(self, symbol):
+        """Bir sembolün ticker satırını O(1) sürede döndürür."""
+        return self.tickers[self.position[symbol]]
+
+    def _quote_mask(self, quote_asset):
+        known = np.array([asset is not None for asset in self.quote_asset], dtype=bool)
+        by_info = known & (self.quote_asset == quote_asset)
+        by_suffix = ~known & np.array([s.endswith(quote_asset) and len(s) > len(quote_asset) for s in self.symbols],
+                                      dtype=bool)
+        return by_info | by_suffix
+
+    def top(self, limit, quote_asset='USDT', by='quoteVolume', min_volume=0, min_age_days=None, symbols=None,
+            now=None):
+        """
+        Filtrelerden geçen semboller arasından hacmi en yüksek `limit` sembolü döndürür.
+
+        Parameters
+        ----------
+        limit : int
+            Döndürülecek sembol sayısı.
+
+        quote_asset : str, optional
+            Karşı varlık. Varsayılan değer 'USDT'.
+
+        by : str, optional
+            Sıralama ölçütü: 'volume' (baz varlık hacmi) ya da 'quoteVolume'. Varsayılan değer 'quoteVolume'.
+
+        min_volume : float, optional
+            Sıralama ölçütü için minimum hacim. Varsayılan değer 0.
+
+        min_age_days : float, optional
+            Minimum listelenme süresi, gün cinsinden. Listelenme zamanı bilinmeyen semboller bu filtreden geçmez.
+            Varsayılan değer None (filtre yok).
+
+        symbols : iterable, optional
+            Sadece bu semboller arasından seçim yapılır. Örneğin PERPETUAL kontratlar.
+
+        now : int, optional
+            Milisaniye cinsinden şimdiki zaman. Verilmezse sistem saati kullanılır.
+
+        Returns
+        -------
+        list
+            Büyükten küçüğe sıralı sembol adları.
+        """
+        values = self.quote_volume if by == 'quoteVolume' else self.volume
+        mask = self._quote_mask(quote_asset) & (values >= min_volume)
+        if symbols is not None:
+            allowed = np.zeros(len(self.symbols), dtype=bool)
+            allowed[[self.position[s] for s in symbols if s in self.position]] = True
+            mask &= allowed
+        if min_age_days is not None:
+            now = now or int(time.time() * 1000)
+            mask &= (now - self.listed_at) >= min_age_days * 24 * 60 * 60 * 1000
+
+        return self.symbols[_top_indices(values, np.flatnonzero(mask), limit)].tolist()
@@ -0,0 +1,250 @@
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+
+import profiling
+import signal_engine
+import trade_kernel
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def fold_windows(start_time, end_time, train_ms, test_ms, step_ms=None):
+    """
+    [start_time, end_time) aralığını kayan eğitim/test pencerelerine böler. k. katın test penceresi eğitim penceresinin
+    hemen ardından gelir; pencereler her katta step_ms kadar ileri kayar.
+
+    Parameters
+    ----------
+    start_time, end_time : int
+        Milisaniye cinsinden başlangıç ve bitiş zamanı.
+
+    train_ms, test_ms : int
+        Eğitim ve test pencerelerinin milisaniye cinsinden uzunluğu.
+
+    step_ms : int, optional
+        Katlar arasındaki kayma miktarı. Verilmezse test_ms kullanılır (test pencereleri birbirini izler).
+
+    Returns
+    -------
+    list
+        (train_start, train_end, test_start, test_end) tuple'ları. Bitiş zamanları hariçtir.
+    """
+    step_ms = step_ms or test_ms
+    folds = []
+    train_start = start_time
+    while train_start + train_ms + test_ms <= end_time:
+        train_end = train_start + train_ms
+        folds.append((train_start, train_end, train_end, train_end + test_ms))
+        train_start += step_ms
+    return folds
+
+
+def precompute_points(data, param_list, interval=None):
+    """
+    Her coin için parametre ızgarasındaki tüm (rsip, macdp) çiftlerinin puanlarını tüm seri üzerinde bir kez hesaplar
+    ve paylaşılan klasöre `wf_points.npy` olarak yazar. İndikatörler nedensel olduğu için herhangi bir penceredeki puanlar
+    bu serinin dilimidir; katlar indikatörleri yeniden hesaplamaz, dosyayı memory-map ile açar.
+
+    Parameters
+    ----------
+    data : shared_data.SharedOHLCV
+        Paylaşılan coin verileri.
+
+    param_list : list
+        (higher_than, rsip, macdp) tuple'larından oluşan liste.
+
+    interval : str, optional
+        İndikatör önbelleği anahtarı için interval.
+
+    Returns
+    -------
+    numpy.ndarray
+        Her kombinasyonun wf_points.npy içindeki satır indeksi.
+    """
+    params = np.array(param_list, dtype=float).reshape(-1, 3)
+    pairs, inverse = np.unique(params[:, 1:], axis=0, return_inverse=True)
+    for coin in data.coins:
+        indicators = signal_engine.compute_indicators(data.attach(coin)['close'], symbol=coin, interval=interval)
+        points = signal_engine.window_points(signal_engine.bar_points(indicators, rsip=pairs[:, :1],
+                                                                      macdp=pairs[:, 1:]))
+        np.save(os.path.join(data.folder, coin, 'wf_points.npy'), points)
+    return inverse.reshape(-1)
+
+
+def _window_results(data, param_list, rows, start_time, end_time, leverage, short_th):
+    """
+    Tüm kombinasyonları [start_time, end_time) penceresinde simüle eder.
+
+    Returns
+    -------
+    list
+        Her kombinasyon için (kar/zarar, gün sayısı) tuple'larının listesi.
+    list
+        Her kombinasyon için coin başına işlem sayısı listesi.
+    dict
+        Coin -> her kombinasyonun pencere sonundaki bakiyesi.
+    """
+    all_results = [[] for _ in param_list]
+    num_trades_per_coin = [[] for _ in param_list]
+    balances = {}
+    for coin in data.coins:
+        arrays = data.attach(coin)
+        points = np.load(os.path.join(data.folder, coin, 'wf_points.npy'), mmap_mode='r')
+        lo, hi = np.searchsorted(arrays['open_time'], [start_time, end_time])
+        close = arrays['close'][lo:hi]
+        balances[coin] = []
+        for k, (higher_than, rsip, macdp) in enumerate(param_list):
+            window = points[rows[k], lo:hi]
+            trades, final_balance, max_drawdown = trade_kernel.simulate_arrays(
+                close, window, window > higher_than, window < short_th, leverage)
+            days = (arrays['close_time'][lo:hi][trades['exit_idx']] - arrays['open_time'][lo:hi][trades['entry_idx']]) \
+                // DAY_MS
+            num_trades_per_coin[k].append(len(trades['pnl']))
+            all_results[k].extend(zip(trades['pnl'].tolist(), days.tolist()))
+            balances[coin].append(final_balance)
+    return all_results, num_trades_per_coin, balances
+
+
+def run_fold(fold, data, param_list, rows, score_fn, leverage=1, short_th=0.5):
+    """
+    Tek bir katı çalıştırır: eğitim penceresinde tüm kombinasyonları skorlayıp en iyisini seçer, seçilen parametreleri
+    test penceresinde (örneklem dışı) simüle eder.
+
+    Parameters
+    ----------
+    fold : tuple
+        fold_windows çıktısındaki (train_start, train_end, test_start, test_end) tuple'ı.
+
+    data : shared_data.SharedOHLCV
+        Paylaşılan coin verileri. precompute_points ile puanlar önceden yazılmış olmalıdır.
+
+    param_list : list
+        (higher_than, rsip, macdp) tuple'larından oluşan liste.
+
+    rows : numpy.ndarray
+        precompute_points çıktısı.
+
+    score_fn : callable
+        score_fn(params, all_results, num_trades_per_coin) şeklinde çağrılıp ilk elemanı skor olan bir tuple ya da None
+        döndüren fonksiyon. Örneğin hiperparam_sim.score_trades.
+
+    leverage : float, optional
+        Kaldıraç miktarı. Varsayılan değer 1.
+
+    short_th : float, optional
+        Kısa pozisyon almak için gereken maksimum puan. Varsayılan değer 0.5.
+
+    Returns
+    -------
+    dict
+        Katın pencereleri, seçilen parametreler, eğitim skoru ve örneklem dışı sonuçlar. Eğitimde geçerli bir kombinasyon
+        bulunamazsa 'params' None olur.
+    """
+    train_start, train_end, test_start, test_end = fold
+    all_results, num_trades_per_coin, _ = _window_results(data, param_list, rows, train_start, train_end, leverage,
+                                                          short_th)
+    scored = [score_fn(p, r, n) for p, r, n in zip(param_list, all_results, num_trades_per_coin)]
+    valid = [k for k, result in enumerate(scored) if result is not None]
+    report = {'train_start': train_start, 'train_end': train_end, 'test_start': test_start, 'test_end': test_end,
+              'params': None, 'train_score': None, 'test_score': None, 'test_trades': 0, 'test_pnls': [],
+              'test_balances': {}}
+    if not valid:
+        return report
+
+    best = max(valid, key=lambda k: scored[k][0])
+    test_results, test_num_trades, test_balances = _window_results(data, [param_list[best]], rows[best:best + 1],
+                                                                   test_start, test_end, leverage, short_th)
+    test_scored = score_fn(param_list[best], test_results[0], test_num_trades[0]) if test_results[0] else None
+    report.update({
+        'params': tuple(param_list[best]),
+        'train_score': scored[best][0],
+        'test_score': test_scored[0] if test_scored is not None else None,
+        'test_trades': len(test_results[0]),
+        'test_pnls': [pnl for pnl, days in test_results[0]],
+        'test_balances': {coin: balance[0] for coin, balance in test_balances.items()},
+    })
+    return report
+
+
+def summarize(reports):
+    """
+    Katların örneklem dışı sonuçlarını birleştirir.
+
+    Returns
+    -------
+    dict
+        Kat sayısı, parametre bulunan kat sayısı, toplam işlem sayısı, karlı işlem oranı, ortalama ve medyan kar/zarar,
+        coin başına test pencerelerinin birleşik (bileşik) getirisi ve ortalama örneklem dışı skor.
+    """
+    pnls = np.array([pnl for report in reports for pnl in report['test_pnls']], dtype=float)
+    coins = sorted({coin for report in reports for coin in report['test_balances']})
+    compounded = {coin: float(np.prod([report['test_balances'][coin] / 100.0 for report in reports
+                                       if coin in report['test_balances']])) for coin in coins}
+    test_scores = [report['test_score'] for report in reports if report['test_score'] is not None]
+    return {
+        'folds': len(reports),
+        'folds_with_params': sum(report['params'] is not None for report in reports),
+        'trades': len(pnls),
+        'profitable_ratio': float(np.mean(pnls > 0)) if len(pnls) else 0.0,
+        'mean_pnl': float(np.mean(pnls)) if len(pnls) else 0.0,
+        'median_pnl': float(np.median(pnls)) if len(pnls) else 0.0,
+        'compounded_return': compounded,
+        'mean_test_score': float(np.mean(test_scores)) if test_scores else None,
+    }
+
+
+def walk_forward(data, param_list, folds, score_fn, leverage=1, short_th=0.5, n_jobs=-1, interval=None):
+    """
+    Walk-forward doğrulama: her katta eğitim penceresinde en iyi parametreler seçilir ve bir sonraki (test) penceresinde
+    örneklem dışı olarak denenir. Katlar joblib ile paralel süreçlerde çalışır; veriler ve puanlar paylaşılan klasörden
+    memory-map ile okunduğu için işçilere kopyalanmaz.
+
+    Parameters
+    ----------
+    data : shared_data.SharedOHLCV
+        Paylaşılan coin verileri.
+
+    param_list : list
+        (higher_than, rsip, macdp) tuple'larından oluşan liste.
+
+    folds : list
+        fold_windows çıktısı.
+
+    score_fn : callable
+        run_fold ile aynı.
+
+    leverage : float, optional
+        Kaldıraç miktarı. Varsayılan değer 1.
+
+    short_th : float, optional
+        Kısa pozisyon almak için gereken maksimum puan. Varsayılan değer 0.5.
+
+    n_jobs : int, optional
+        Paralel süreç sayısı. Varsayılan değer -1 (tüm çekirdekler).
+
+    interval : str, optional
+        İndikatör önbelleği anahtarı için interval.
+
+    Returns
+    -------
+    list
+        Her kat için run_fold raporu.
+    dict
+        summarize çıktısı.
+    """
+    rows = precompute_points(data, param_list, interval=interval)
+    if profiling.enabled:
+        # İşçilerde toplanan ölçümler raporlarla birlikte ana sürece döner.
+        profiled = Parallel(n_jobs=n_jobs)(delayed(profiling.profiled_call)(run_fold, fold, data, param_list, rows,
+                                                                            score_fn, leverage, short_th)
+                                           for fold in folds)
+        reports = []
+        for report, records in profiled:
+            reports.append(report)
+            profiling.merge(records)
+    else:
+        reports = Parallel(n_jobs=n_jobs)(delayed(run_fold)(fold, data, param_list, rows, score_fn, leverage, short_th)
+                                          for fold in folds)
+    return reports, summarize(reports)